@@ -21,8 +21,8 @@ Usage:
 Required Environment Variables:
     AZURE_SEARCH_ENDPOINT: URL for Azure AI Search service
     AZURE_SEARCH_KEY: API key for Azure AI Search
-    COSMOS_ENDPOINT: URL for Cosmos DB account
-    COSMOS_KEY: Key for Cosmos DB account
+    COSMOS_ENDPOINT: URL for Cosmos DB account (only when REPOSITORY_BACKEND=cosmos)
+    COSMOS_KEY: Key for Cosmos DB account (only when REPOSITORY_BACKEND=cosmos)
 """
 
 from dataclasses import dataclass
@@ -43,12 +43,26 @@ class Settings:
     search_key: str = os.environ["AZURE_SEARCH_KEY"]  # Required: Admin API key
 
     # Cosmos DB settings
-    cosmos_endpoint: str = os.environ["COSMOS_ENDPOINT"]  # Required: Full URL to Cosmos DB account
-    cosmos_key: str = os.environ["COSMOS_KEY"]  # Required: Primary or secondary key
+    cosmos_endpoint: str = os.environ.get("COSMOS_ENDPOINT", "")  # Required when REPOSITORY_BACKEND=cosmos: Full URL to Cosmos DB account
+    cosmos_key: str = os.environ.get("COSMOS_KEY", "")  # Required when REPOSITORY_BACKEND=cosmos: Primary or secondary key
     cosmos_db: str = os.environ.get("COSMOS_DB", "blogs")  # Database name
     cosmos_articles: str = os.environ.get("COSMOS_ARTICLES", "articles")  # Articles container
     cosmos_users: str = os.environ.get("COSMOS_USERS", "users")  # Users container
 
+    cosmos_fast_start: bool = _get_bool("COSMOS_FAST_START", False)  # Bind to existing db/containers instead of provisioning on startup
+    cosmos_preferred_regions: str = os.environ.get("COSMOS_PREFERRED_REGIONS", "")  # Comma-separated, e.g. "Southeast Asia,East Asia"
+    cosmos_connection_limit: int = int(os.environ.get("COSMOS_CONNECTION_LIMIT", 100))  # Max pooled HTTP connections
+    cosmos_connection_timeout: int = int(os.environ.get("COSMOS_CONNECTION_TIMEOUT", 10))  # Seconds
+    cosmos_retry_total: int = int(os.environ.get("COSMOS_RETRY_TOTAL", 9))  # Max retries on throttling (429)
+    cosmos_retry_backoff_max: int = int(os.environ.get("COSMOS_RETRY_BACKOFF_MAX", 30))  # Max cumulative wait on throttling, seconds
+    cosmos_retry_fixed_interval_ms: int = int(os.environ.get("COSMOS_RETRY_FIXED_INTERVAL_MS", 0))  # 0 = honour the server's retry-after
+
+    cosmos_results_partition: str = os.environ.get("COSMOS_RESULTS_PARTITION", "id").lower()  # "id", "user" or "user_qa" (hierarchical)
+
+    # Repository backend for QA / QA results
+    repository_backend: str = os.environ.get("REPOSITORY_BACKEND", "cosmos").lower()  # "cosmos", "sqlite" or "memory"
+    sqlite_path: str = os.environ.get("SQLITE_PATH", "technology_news.db")  # Database file when REPOSITORY_BACKEND=sqlite
+
     # Embeddings configuration
     embedding_provider: str = os.environ.get("EMBEDDING_PROVIDER", "openai").lower()  # "openai" or "hf"
     embedding_model: str = os.environ.get("EMBEDDING_MODEL", "text-embedding-3-small")  # OpenAI model name
@@ -64,10 +78,21 @@ class Settings:
     # Azure OpenAI specific settings for indexer skills
     azure_openai_endpoint: str = os.environ.get("AZURE_OPENAI_ENDPOINT", "")  # Azure OpenAI resource endpoint
     azure_openai_key: str = os.environ.get("AZURE_OPENAI_API_KEY", "")  # Azure OpenAI API key
-    azure_openai_deployment: str = os.environ.get("AZURE_OPENAI_DEPLOYMENT", "2024-12-01-preview")  # Deployment name
     azure_openai_model_name: str = os.environ.get("AZURE_OPENAI_MODELNAME", "text-embedding-3-small")  # Model name for skillsets
     azure_openai_api_version: str = os.environ.get("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")  # API version for skillsets
     
+    # LLM gateway (chat completions for article generation, QA generation and news paraphrasing)
+    llm_backend: str = os.environ.get("LLM_BACKEND", "azure").lower()  # "azure" or "fake" (canned offline responses)
+    llm_deployment: str = os.environ.get("AZURE_OPENAI_DEPLOYMENT_NAME") or os.environ.get("AZURE_OPENAI_DEPLOYMENT") or "gpt-4o-mini"  # Chat deployment
+    llm_timeout_seconds: float = float(os.environ.get("LLM_TIMEOUT_SECONDS", 120))  # Deadline per call, retries included
+    llm_stream_idle_seconds: float = float(os.environ.get("LLM_STREAM_IDLE_SECONDS", 30))  # Max wait for the next streamed chunk
+    llm_max_retries: int = int(os.environ.get("LLM_MAX_RETRIES", 3))  # Retries on 408/409/429/5xx, timeouts and connection errors
+    llm_retry_base_seconds: float = float(os.environ.get("LLM_RETRY_BASE_SECONDS", 0.5))  # Backoff base (full jitter, doubled per attempt)
+    llm_retry_max_seconds: float = float(os.environ.get("LLM_RETRY_MAX_SECONDS", 20))  # Longest single wait, Retry-After included
+    llm_breaker_failures: int = int(os.environ.get("LLM_BREAKER_FAILURES", 5))  # Consecutive failed calls that open the circuit
+    llm_breaker_reset_seconds: float = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", 30))  # Open time before one trial call
+    llm_max_connections: int = int(os.environ.get("LLM_MAX_CONNECTIONS", 50))  # Pooled HTTP connections to the endpoint
+
     # Score weights for articles search (must sum to 1.0)
     w_semantic: float = float(os.environ.get("WEIGHT_SEMANTIC", 0.5))  # Semantic search weight
     w_bm25: float = float(os.environ.get("WEIGHT_BM25", 0.3))  # Keyword matching weight
@@ -91,6 +116,8 @@ class Settings:
     # Cache functionality removed for simplicity
 
     newsapi_key: str = os.environ.get("NEWS_API_KEY", "")  # News API key
+    news_ingest_qa: bool = _get_bool("NEWS_INGEST_QA", False)  # Write a QA set in the same LLM call that translates each article
+    news_ingest_qa_questions: int = int(os.environ.get("NEWS_INGEST_QA_QUESTIONS", 5))  # Questions per ingested article
 
     # Redis configuration
     redis_url: str = os.environ.get("REDIS_URL") 
@@ -98,18 +125,76 @@ class Settings:
     redis_db: int = int(os.environ.get("REDIS_DB", 0)) 
     redis_password: str = os.environ.get("REDIS_PASSWORD", "")
 
+    # QA generation cache
+    qa_generation_cache: str = os.environ.get("QA_GENERATION_CACHE", "redis").lower()  # redis | disk | off
+    qa_generation_cache_dir: str = os.environ.get("QA_GENERATION_CACHE_DIR", ".cache/generation")
+    qa_generation_cache_ttl_seconds: float = float(os.environ.get("QA_GENERATION_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    # Article generation / suggestions responses (same backend as QA_GENERATION_CACHE), keyed by normalized query + options
+    article_generation_cache_ttl_seconds: float = float(os.environ.get("ARTICLE_GENERATION_CACHE_TTL_SECONDS", 24 * 3600))
+    article_suggestions_cache_ttl_seconds: float = float(os.environ.get("ARTICLE_SUGGESTIONS_CACHE_TTL_SECONDS", 3600))  # Served as fresh
+    article_suggestions_cache_stale_seconds: float = float(os.environ.get("ARTICLE_SUGGESTIONS_CACHE_STALE_SECONDS", 7 * 24 * 3600))  # Then served stale while refreshed in the background
+
+    # Batch QA generation jobs
+    qa_generation_batch_concurrency: int = int(os.environ.get("QA_GENERATION_BATCH_CONCURRENCY", 4))  # Concurrent LLM calls per job
+    qa_generation_batch_max_articles: int = int(os.environ.get("QA_GENERATION_BATCH_MAX_ARTICLES", 500))
+
+    # Background jobs (long LLM endpoints)
+    jobs_max_concurrency: int = int(os.environ.get("JOBS_MAX_CONCURRENCY", 4))  # Jobs running at once per process
+    jobs_retention_seconds: int = int(os.environ.get("JOBS_RETENTION_SECONDS", 24 * 3600))  # How long job records (and dedupe) are kept
+    jobs_stale_seconds: float = float(os.environ.get("JOBS_STALE_SECONDS", 90))  # Unfinished job without heartbeat for this long is not reused
+    jobs_events_poll_seconds: float = float(os.environ.get("JOBS_EVENTS_POLL_SECONDS", 0.5))  # SSE status poll interval
+
+    # Near-duplicate questions across an article's QA sets
+    qa_dedupe_mode: str = os.environ.get("QA_DEDUPE_MODE", "flag").lower()  # flag | drop | off (every saved set is screened; off leaves matches in place)
+    qa_dedupe_similarity: float = float(os.environ.get("QA_DEDUPE_SIMILARITY", 0.7))  # Estimated Jaccard of 5-gram shingles
+    qa_dedupe_index_cache_size: int = int(os.environ.get("QA_DEDUPE_INDEX_CACHE_SIZE", 500))  # Article indexes kept per process
+    qa_dedupe_index_ttl_seconds: float = float(os.environ.get("QA_DEDUPE_INDEX_TTL_SECONDS", 300))  # Bounds staleness across workers
+
+    # QA grading
+    answer_key_cache_size: int = int(os.environ.get("ANSWER_KEY_CACHE_SIZE", 1000))  # Compiled answer keys kept per process
+    answer_key_cache_ttl_seconds: float = float(os.environ.get("ANSWER_KEY_CACHE_TTL_SECONDS", 300))  # Recompile at least this often, even when the QA is unchanged
+    results_batch_max_attempts: int = int(os.environ.get("RESULTS_BATCH_MAX_ATTEMPTS", 500))  # Max attempts per batch submission
+    results_bulk_concurrency: int = int(os.environ.get("RESULTS_BULK_CONCURRENCY", 16))  # Concurrent creates during batch persistence
+    results_compact_schema: bool = _get_bool("RESULTS_COMPACT_SCHEMA", True)  # Store selections + correctness bits instead of full question rows
+    results_write_behind: bool = _get_bool("RESULTS_WRITE_BEHIND", False)  # Buffer graded results in a Redis stream, flush in batches
+    results_stream_key: str = os.environ.get("RESULTS_STREAM_KEY", "qa_results:stream")
+    results_stream_batch_size: int = int(os.environ.get("RESULTS_STREAM_BATCH_SIZE", 200))  # Results flushed per batch
+    results_stream_block_ms: int = int(os.environ.get("RESULTS_STREAM_BLOCK_MS", 1000))  # Max wait for new entries
+    results_stream_claim_idle_ms: int = int(os.environ.get("RESULTS_STREAM_CLAIM_IDLE_MS", 30000))  # Re-deliver entries unacked this long
+    results_page_default_size: int = int(os.environ.get("RESULTS_PAGE_DEFAULT_SIZE", 50))  # Results listing page size
+    results_page_max_size: int = int(os.environ.get("RESULTS_PAGE_MAX_SIZE", 500))  # Upper bound for ?limit= on results listing
+
+    # QA statistics (change feed consumer)
+    qa_stats_enabled: bool = _get_bool("QA_STATS_ENABLED", True)  # Run the stats processor in this process
+    qa_stats_poll_seconds: float = float(os.environ.get("QA_STATS_POLL_SECONDS", 5))  # Idle wait between feed reads
+    qa_stats_batch_size: int = int(os.environ.get("QA_STATS_BATCH_SIZE", 500))  # Max results applied per checkpoint
+    qa_stats_lease_ttl_seconds: float = float(os.environ.get("QA_STATS_LEASE_TTL_SECONDS", 30))  # Takeover delay if the owner dies
+
+    # Observability
+    debug_metrics: bool = _get_bool("DEBUG_METRICS", False)  # Attach per-request Cosmos RU totals as response headers, allow DELETE /metrics
+
 SETTINGS = Settings()
 
 # Print configuration on module load (only once)
 print("⚙️ Configuration loaded:")
 print(f"   🔍 Search: {SETTINGS.search_endpoint}")
 print(f"   🌌 Cosmos: {SETTINGS.cosmos_db}/{SETTINGS.cosmos_articles}, {SETTINGS.cosmos_db}/{SETTINGS.cosmos_users}")
+print(f"   🗄️ Repository backend: {SETTINGS.repository_backend}")
+print(f"   ⚡ Cosmos fast start: {SETTINGS.cosmos_fast_start}, regions={SETTINGS.cosmos_preferred_regions or 'default'}, pool={SETTINGS.cosmos_connection_limit}, retries={SETTINGS.cosmos_retry_total}, results partition={SETTINGS.cosmos_results_partition}")
 print(f"   🧮 Embeddings: {SETTINGS.embedding_provider} ({SETTINGS.embedding_model if SETTINGS.embedding_provider == 'openai' else SETTINGS.hf_model_name})")
 print(f"   📊 Article weights: sem={SETTINGS.w_semantic}, bm25={SETTINGS.w_bm25}, vec={SETTINGS.w_vector}, biz={SETTINGS.w_business}")
 print(f"   👤 Author weights: sem={SETTINGS.aw_semantic}, bm25={SETTINGS.aw_bm25}, vec={SETTINGS.aw_vector}, biz={SETTINGS.aw_business}")
 print(f"   📅 Freshness: half-life={SETTINGS.freshness_halflife_days} days, window={SETTINGS.freshness_window_days} days")
 print(f"   🎯 Score filtering: threshold={SETTINGS.score_threshold}, enabled={SETTINGS.enable_score_filtering}")
-print(f"   � News API: {'configured' if SETTINGS.newsapi_key else 'not configured'}")
+print(f"   � News API: {'configured' if SETTINGS.newsapi_key else 'not configured'}, QA at ingest: {SETTINGS.news_ingest_qa_questions if SETTINGS.news_ingest_qa else 'disabled'}")
+print(f"   🤖 LLM: {SETTINGS.llm_backend} ({SETTINGS.llm_deployment}), timeout={SETTINGS.llm_timeout_seconds:.0f}s, retries={SETTINGS.llm_max_retries}, breaker={SETTINGS.llm_breaker_failures} failures/{SETTINGS.llm_breaker_reset_seconds:.0f}s, pool={SETTINGS.llm_max_connections}")
 print(f"   🔴 Redis: {SETTINGS.redis_url}:{SETTINGS.redis_port}/{SETTINGS.redis_db}")
+print(f"   🧠 QA generation cache: {SETTINGS.qa_generation_cache} (ttl={SETTINGS.qa_generation_cache_ttl_seconds:.0f}s)")
+print(f"   📝 Article caches: generation ttl={SETTINGS.article_generation_cache_ttl_seconds:.0f}s, suggestions ttl={SETTINGS.article_suggestions_cache_ttl_seconds:.0f}s (+{SETTINGS.article_suggestions_cache_stale_seconds:.0f}s stale)")
+print(f"   🔁 QA dedupe: {SETTINGS.qa_dedupe_mode} (similarity>={SETTINGS.qa_dedupe_similarity})")
+print(f"   🗂️ Jobs: concurrency={SETTINGS.jobs_max_concurrency}, retention={SETTINGS.jobs_retention_seconds}s")
+print(f"   ✍️ Results write-behind: {'enabled (' + SETTINGS.results_stream_key + ')' if SETTINGS.results_write_behind else 'disabled'}")
+print(f"   📊 QA stats processor: {'enabled' if SETTINGS.qa_stats_enabled else 'disabled'} (poll={SETTINGS.qa_stats_poll_seconds}s, batch={SETTINGS.qa_stats_batch_size})")
+print(f"   📈 Debug metrics headers: {'enabled' if SETTINGS.debug_metrics else 'disabled'}")
 print("   �🗂️ Cache: disabled for simplicity")
 
@@ -1,8 +1,12 @@
 import os
+import aiohttp
 from dotenv import load_dotenv
+from azure.core.pipeline.transport import AioHttpTransport
 from azure.cosmos import PartitionKey
 from azure.cosmos.aio import CosmosClient
 
+from backend.config.settings import SETTINGS
+
 load_dotenv()
 
 ENDPOINT = os.getenv("COSMOS_ENDPOINT")
@@ -10,26 +14,40 @@ KEY = os.getenv("COSMOS_KEY")
 DATABASE_NAME = os.getenv("COSMOS_DB")
 QAS_CONTAINER = os.getenv("COSMOS_QAS")
 QAS_RESULT_CONTAINER = os.getenv("COSMOS_QA_RESULT")
+QA_STATS_CONTAINER = os.getenv("COSMOS_QA_STATS", "qa_stats")
 
 # Debug: Print environment variables (remove in production)
 print(f"🔍 Cosmos Config: ENDPOINT={ENDPOINT}, DB={DATABASE_NAME}, QUESTIONS={QAS_CONTAINER}, ANSWERS={QAS_RESULT_CONTAINER}")
 
+# Partition layout of the QA result container (see COSMOS_RESULTS_PARTITION):
+#   id      -> /id (legacy; every history query is cross-partition)
+#   user    -> /user_id
+#   user_qa -> hierarchical [/user_id, /qa_id]
+RESULTS_PARTITION_MODES = ("id", "user", "user_qa")
+
+
+def results_partition_key_definition(mode: str = None) -> PartitionKey:
+    mode = mode or SETTINGS.cosmos_results_partition
+    if mode == "user":
+        return PartitionKey(path="/user_id")
+    if mode == "user_qa":
+        return PartitionKey(path=["/user_id", "/qa_id"], kind="MultiHash")
+    if mode == "id":
+        return PartitionKey(path="/id")
+    raise ValueError(f"Unknown COSMOS_RESULTS_PARTITION '{mode}' (expected one of {', '.join(RESULTS_PARTITION_MODES)})")
+
+
 # Cosmos client and container references are kept in module-level globals
 # so they can be lazily initialized and reused across requests. These are
 # asynchronous clients from azure.cosmos.aio.
 client: CosmosClient = None
 database = None
 questions = None
+answers = None
+stats = None
 
 
-async def connect_cosmos():
-    """Create the CosmosClient and container references.
-
-    This is called during app startup (see `backend.main`) and will
-    create the database and containers if they do not exist.
-    """
-    global client, database, questions, answers
-
+def validate_config():
     # Validate required environment variables
     if not all([ENDPOINT, KEY, DATABASE_NAME, QAS_CONTAINER, QAS_RESULT_CONTAINER]):
         missing = []
@@ -40,21 +58,100 @@ async def connect_cosmos():
         if not QAS_RESULT_CONTAINER: missing.append("COSMOS_QA_RESULT")
         raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
+
+def create_client() -> CosmosClient:
+    """Build the async client with the tuning options from `Settings`."""
+    preferred_regions = [r.strip() for r in SETTINGS.cosmos_preferred_regions.split(",") if r.strip()]
+    # Own the aiohttp session so the connection pool size can be bounded
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=SETTINGS.cosmos_connection_limit, ttl_dns_cache=300)
+    )
+    kwargs = {
+        "transport": AioHttpTransport(session=session, session_owner=True),
+        "retry_total": SETTINGS.cosmos_retry_total,
+        "retry_backoff_max": SETTINGS.cosmos_retry_backoff_max,
+        "connection_timeout": SETTINGS.cosmos_connection_timeout,
+    }
+    if SETTINGS.cosmos_retry_fixed_interval_ms:
+        kwargs["retry_fixed_interval"] = SETTINGS.cosmos_retry_fixed_interval_ms
+    if preferred_regions:
+        kwargs["preferred_locations"] = preferred_regions
+    return CosmosClient(ENDPOINT, credential=KEY, **kwargs)
+
+
+async def provision_cosmos():
+    """Create the database and containers if they do not exist.
+
+    Control-plane calls cost latency and RU, so in production this is run
+    once via `python -m backend.scripts.provision_cosmos` instead of on
+    every process start (see COSMOS_FAST_START).
+    """
+    global client, database, questions, answers, stats
+    validate_config()
+
     if client is None:
-        client = CosmosClient(ENDPOINT, credential=KEY)
-        database = await client.create_database_if_not_exists(DATABASE_NAME)
+        client = create_client()
+    database = await client.create_database_if_not_exists(DATABASE_NAME)
 
-        questions = await database.create_container_if_not_exists(
-            id=QAS_CONTAINER,
-            partition_key=PartitionKey(path="/id")
-        )
+    questions = await database.create_container_if_not_exists(
+        id=QAS_CONTAINER,
+        partition_key=PartitionKey(path="/id")
+    )
 
-        answers = await database.create_container_if_not_exists(
-            id=QAS_RESULT_CONTAINER,
-            partition_key=PartitionKey(path="/id")
-        )
+    answers = await database.create_container_if_not_exists(
+        id=QAS_RESULT_CONTAINER,
+        partition_key=results_partition_key_definition()
+    )
 
-        print("✅ Connected to Azure Cosmos DB")
+    # Per-QA aggregates maintained by the results change-feed consumer
+    stats = await database.create_container_if_not_exists(
+        id=QA_STATS_CONTAINER,
+        partition_key=PartitionKey(path="/id")
+    )
+
+    print("✅ Cosmos DB database and containers provisioned")
+
+
+async def connect_cosmos():
+    """Create the CosmosClient and container references.
+
+    This is called during app startup (see `backend.main`). With
+    COSMOS_FAST_START the client binds directly to the existing database
+    and containers (no network round trip); otherwise the database and
+    containers are created if they do not exist.
+    """
+    global client, database, questions, answers, stats
+    validate_config()
+
+    if client is None:
+        if SETTINGS.cosmos_fast_start:
+            client = create_client()
+            database = client.get_database_client(DATABASE_NAME)
+            questions = database.get_container_client(QAS_CONTAINER)
+            answers = database.get_container_client(QAS_RESULT_CONTAINER)
+            stats = database.get_container_client(QA_STATS_CONTAINER)
+        else:
+            await provision_cosmos()
+
+        print(f"✅ Connected to Azure Cosmos DB (fast start: {SETTINGS.cosmos_fast_start})")
+
+
+async def warm_cosmos():
+    """Open pooled connections and prime the container caches with a cheap metadata read.
+
+    Reading the container properties is a single low-RU call that also
+    fetches the partition key definition the SDK needs for every item
+    operation, so the first user request doesn't pay for it.
+    """
+    for container in (questions, answers, stats):
+        if container is None:
+            continue
+        try:
+            await container.read()
+        except Exception as e:
+            # Missing containers surface here in fast-start mode
+            print(f"⚠️ Cosmos warm-up failed for {container.id}: {e}")
+    print("🔥 Cosmos DB connection pool warmed")
 
 
 async def close_cosmos():
@@ -63,7 +160,7 @@ async def close_cosmos():
     Properly awaiting client.close() prevents unclosed aiohttp sessions
     and related warnings during application shutdown.
     """
-    global client, database, questions, answers
+    global client, database, questions, answers, stats
     try:
         if client:
             # Azure Cosmos async client exposes an async close
@@ -75,6 +172,7 @@ async def close_cosmos():
         database = None
         questions = None
         answers = None
+        stats = None
         print("🛑 Cosmos DB connection closed")
 
 
@@ -88,3 +186,16 @@ async def get_qas_result_container():
     if answers is None:
         await connect_cosmos()
     return answers
+
+
+async def get_qa_stats_container():
+    if stats is None:
+        await connect_cosmos()
+    return stats
+
+
+async def get_articles_container():
+    """Articles are owned by the news/article service; only read here, never provisioned"""
+    if database is None:
+        await connect_cosmos()
+    return database.get_container_client(SETTINGS.cosmos_articles)
@@ -0,0 +1,44 @@
+# database/redis_async.py
+# Async Redis client dùng chung cho các tính năng nằm trên đường request (leaderboard, result stream)
+# redis_article_service vẫn dùng client đồng bộ riêng của nó
+
+from typing import Optional
+
+import redis.asyncio as aioredis
+from backend.config.settings import SETTINGS
+
+client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """Shared async client, created lazily; None when REDIS_URL is not configured"""
+    global client
+    if client is None and SETTINGS.redis_url:
+        client = aioredis.from_url(
+            SETTINGS.redis_url,
+            password=SETTINGS.redis_password or None,
+            db=SETTINGS.redis_db,
+            decode_responses=True,
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            **tls_options(SETTINGS.redis_url),
+        )
+    return client
+
+
+def tls_options(redis_url: str) -> dict:
+    """Same TLS settings as redis_article_service (Azure Cache presents a cert we don't verify).
+
+    Plain redis:// connections reject SSL keyword arguments, so they only apply to rediss://.
+    """
+    if redis_url.startswith("rediss://"):
+        return {"ssl_cert_reqs": None}
+    return {}
+
+
+async def close_redis():
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
+        print("🛑 Redis connection closed")
@@ -2,18 +2,28 @@
 # File chính của ứng dụng FastAPI
 import os
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 # Import các module của ứng dụng
-from backend.database.cosmos import connect_cosmos, close_cosmos
+from backend.config.settings import SETTINGS
+from backend.repository.factory import init_repositories, close_repositories
+from backend.monitoring.cosmos_metrics import begin_request, record_route_when_done
 from backend.routes.qa_generation import qa_generation
 from backend.routes.article_generation import article_generation
 from backend.routes.qa import qas
 from backend.routes.qa_result import qas_result
 from backend.routes.news import news
+from backend.routes.metrics import metrics
+from backend.routes.leaderboard import leaderboard
+from backend.routes.jobs import jobs
 from backend.service.scheduler_service import start_scheduler, stop_scheduler
+from backend.service.qa_stats_service import start_qa_stats_processor, stop_qa_stats_processor
+from backend.service.result_stream_service import start_result_stream_consumer, stop_result_stream_consumer
+from backend.service.job_service import stop_jobs
+from backend.database.redis_async import close_redis
+from backend.service.llm_gateway import llm_gateway
 
 
 # Lifecycle manager - quản lý khởi tạo và đóng kết nối
@@ -21,7 +31,13 @@ from backend.service.scheduler_service import start_scheduler, stop_scheduler
 async def lifespan(app: FastAPI):
     # Startup: Kết nối database khi ứng dụng khởi động
     print("🚀 Starting Question App...")
-    await connect_cosmos()
+    await init_repositories()
+
+    # Start the per-QA stats change feed consumer
+    await start_qa_stats_processor()
+
+    # Start flushing write-behind results (no-op unless RESULTS_WRITE_BEHIND)
+    await start_result_stream_consumer()
     
     # Start the news scheduler
     await start_scheduler()
@@ -33,8 +49,18 @@ async def lifespan(app: FastAPI):
     
     # Stop the news scheduler
     await stop_scheduler()
+
+    await stop_jobs()
+
+    await stop_result_stream_consumer()
+
+    await stop_qa_stats_processor()
+
+    await close_redis()
+
+    await llm_gateway.close()
     
-    await close_cosmos()
+    await close_repositories()
 
 
 # Tạo FastAPI app với lifecycle manager
@@ -57,12 +83,31 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Ghi nhận chi phí Cosmos (RU) cho mỗi request, gắn vào header khi bật debug
+@app.middleware("http")
+async def cosmos_request_metrics(request: Request, call_next):
+    totals = begin_request()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", request.url.path)
+    # Recorded when the body is done: streamed responses are still querying at this point
+    response.body_iterator = record_route_when_done(response.body_iterator, f"{request.method} {route_path}", totals)
+    if SETTINGS.debug_metrics:
+        # Headers go out first, so a streamed body's cost is only partly in them
+        response.headers["X-Cosmos-Request-Charge"] = f"{totals.request_charge:.2f}"
+        response.headers["X-Cosmos-Calls"] = str(totals.calls)
+        response.headers["X-Cosmos-Client-Ms"] = f"{totals.client_ms:.1f}"
+    return response
+
 # Đăng ký routes
 app.include_router(qas)
 app.include_router(qa_generation)
 app.include_router(article_generation)
 app.include_router(qas_result)
 app.include_router(news)
+app.include_router(metrics)
+app.include_router(leaderboard)
+app.include_router(jobs)
 
 
 # Health check endpoint
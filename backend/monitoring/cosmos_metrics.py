@@ -0,0 +1,252 @@
+"""
+Cosmos DB request instrumentation
+
+Every repository call goes through `track_call` / `iter_query` so that the
+request charge (RU), server latency, client latency and item count reported
+by Cosmos are recorded instead of being thrown away.
+
+- Per-operation histograms are kept in process and exposed by `/metrics`
+- Per-HTTP-request totals are accumulated in a context variable so the
+  middleware in `backend.main` can attach them as response headers
+- Per-route totals show which endpoint is burning provisioned throughput
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# Bucket upper bounds (inclusive); the last implicit bucket is +Inf
+RU_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+ITEM_COUNT_BUCKETS = [0, 1, 5, 10, 25, 50, 100, 500, 1000]
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to update on every request"""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "avg": round(self.sum / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class OperationStats:
+    """Histograms for one repository operation (e.g. qa_result.find_by_user)"""
+
+    def __init__(self):
+        self.request_charge = Histogram(RU_BUCKETS)
+        self.server_latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.client_latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.item_count = Histogram(ITEM_COUNT_BUCKETS)
+        self.errors = 0
+        self.last_activity_id: Optional[str] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "request_charge": self.request_charge.snapshot(),
+            "server_latency_ms": self.server_latency_ms.snapshot(),
+            "client_latency_ms": self.client_latency_ms.snapshot(),
+            "item_count": self.item_count.snapshot(),
+            "errors": self.errors,
+            "last_activity_id": self.last_activity_id,
+        }
+
+
+class CosmosMetrics:
+    """In-process registry of Cosmos request metrics"""
+
+    def __init__(self):
+        self.operations: Dict[str, OperationStats] = {}
+        self.routes: Dict[str, Histogram] = {}
+
+    def record(self, operation: str, request_charge: float, server_ms: Optional[float],
+               client_ms: float, item_count: int, activity_id: Optional[str], error: bool = False):
+        stats = self.operations.get(operation)
+        if stats is None:
+            stats = self.operations[operation] = OperationStats()
+        stats.request_charge.observe(request_charge)
+        if server_ms is not None:
+            stats.server_latency_ms.observe(server_ms)
+        stats.client_latency_ms.observe(client_ms)
+        stats.item_count.observe(item_count)
+        if error:
+            stats.errors += 1
+        if activity_id:
+            stats.last_activity_id = activity_id
+
+    def record_route(self, route: str, request_charge: float):
+        histogram = self.routes.get(route)
+        if histogram is None:
+            histogram = self.routes[route] = Histogram(RU_BUCKETS)
+        histogram.observe(request_charge)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "operations": {name: stats.snapshot() for name, stats in sorted(self.operations.items())},
+            "routes": {route: hist.snapshot() for route, hist in sorted(self.routes.items())},
+        }
+
+    def reset(self):
+        self.operations.clear()
+        self.routes.clear()
+
+
+class RequestTotals:
+    """Cosmos cost accumulated while serving a single HTTP request"""
+
+    __slots__ = ("request_charge", "calls", "client_ms")
+
+    def __init__(self):
+        self.request_charge = 0.0
+        self.calls = 0
+        self.client_ms = 0.0
+
+
+cosmos_metrics = CosmosMetrics()
+_request_totals: ContextVar[Optional[RequestTotals]] = ContextVar("cosmos_request_totals", default=None)
+
+
+def begin_request() -> RequestTotals:
+    """Start accumulating Cosmos totals for the current HTTP request"""
+    totals = RequestTotals()
+    _request_totals.set(totals)
+    return totals
+
+
+async def record_route_when_done(body: AsyncIterator[Any], route: str, totals: RequestTotals) -> AsyncIterator[Any]:
+    """Pass a response body through and record the route's RU once it is fully sent.
+
+    Streamed listings keep querying Cosmos while the body is written, long
+    after the middleware got the response back from the route.
+    """
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        if totals.calls:
+            cosmos_metrics.record_route(route, totals.request_charge)
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ResponseCost:
+    """response_hook= for one Cosmos call: the cost reported in that call's own responses.
+
+    Reading `client_connection.last_response_headers` instead would race: the
+    dict is shared by every request on the client, so with concurrent traffic
+    it may already describe another call. A cross-partition query page can
+    take several backend requests; their charges are summed.
+    """
+
+    __slots__ = ("request_charge", "server_ms", "activity_id")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.request_charge = 0.0
+        self.server_ms: Optional[float] = None
+        self.activity_id: Optional[str] = None
+
+    def __call__(self, headers: Any, _result: Any = None):
+        headers = headers or {}
+        self.request_charge += _parse_float(headers.get("x-ms-request-charge")) or 0.0
+        server_ms = _parse_float(headers.get("x-ms-request-duration-ms"))
+        if server_ms is not None:
+            self.server_ms = (self.server_ms or 0.0) + server_ms
+        self.activity_id = headers.get("x-ms-activity-id") or self.activity_id
+
+
+def _record(operation: str, cost: ResponseCost, client_ms: float, item_count: int, error: bool = False):
+    cosmos_metrics.record(
+        operation,
+        request_charge=cost.request_charge,
+        server_ms=cost.server_ms,
+        client_ms=client_ms,
+        item_count=item_count,
+        activity_id=cost.activity_id,
+        error=error,
+    )
+    totals = _request_totals.get()
+    if totals is not None:
+        totals.request_charge += cost.request_charge
+        totals.calls += 1
+        totals.client_ms += client_ms
+    cost.reset()
+
+
+async def track_call(operation: str, method: Callable[..., Awaitable[Any]], **kwargs: Any) -> Any:
+    """Await a single Cosmos call (read/create/replace/delete), e.g.
+    `track_call("qa.create", container.create_item, body=qa)`, and record its cost"""
+    cost = ResponseCost()
+    start = time.perf_counter()
+    try:
+        result = await method(response_hook=cost, **kwargs)
+    except Exception as e:
+        # The hook is not called for error responses; their headers travel with the exception
+        cost(getattr(e, "headers", None))
+        _record(operation, cost, (time.perf_counter() - start) * 1000, 0, error=True)
+        raise
+    _record(operation, cost, (time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+async def iter_query_pages(operation: str, pages, cost: ResponseCost) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Iterate a Cosmos pager page by page, recording the cost of every page.
+
+    cost must be the response_hook= the query was created with. Each page is
+    fully materialized before it is yielded, so when the caller stops between
+    pages the pager's continuation_token follows the last page it received.
+    """
+    start = time.perf_counter()
+    while True:
+        try:
+            page = await pages.__anext__()
+            items = [item async for item in page]
+        except StopAsyncIteration:
+            break
+        except Exception as e:
+            cost(getattr(e, "headers", None))
+            _record(operation, cost, (time.perf_counter() - start) * 1000, 0, error=True)
+            raise
+        _record(operation, cost, (time.perf_counter() - start) * 1000, len(items))
+        yield items
+        start = time.perf_counter()
+
+
+async def iter_query(operation: str, method: Callable[..., Any], **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+    """Iterate a query (method is e.g. container.query_items) item by item, recording the cost of every page"""
+    cost = ResponseCost()
+    async for items in iter_query_pages(operation, method(response_hook=cost, **kwargs).by_page(), cost):
+        for item in items:
+            yield item
+
+
+async def query_all(operation: str, method: Callable[..., Any], **kwargs: Any) -> List[Dict[str, Any]]:
+    """Materialize an instrumented query into a list"""
+    return [item async for item in iter_query(operation, method, **kwargs)]
@@ -0,0 +1,21 @@
+# repository/article_repo.py
+# Đọc bài viết (chỉ đọc) để sinh QA theo article_id - bài viết chỉ được lưu trong Cosmos
+
+from typing import Optional
+
+from backend.config.settings import SETTINGS
+
+
+async def find_article_by_id(article_id: str) -> Optional[dict]:
+    """Title / abstract / content of an article, or None if unknown (or not on the Cosmos backend)"""
+    if SETTINGS.repository_backend != "cosmos":
+        return None
+    # Import lazily so non-Cosmos backends never touch the Cosmos module
+    from backend.database.cosmos import get_articles_container
+    from backend.monitoring.cosmos_metrics import query_all
+
+    container = await get_articles_container()
+    query = "SELECT c.id, c.title, c.abstract, c.content FROM c WHERE c.id=@id"
+    parameters = [{"name": "@id", "value": article_id}]
+    items = await query_all("article.find_by_id", container.query_items, query=query, parameters=parameters)
+    return items[0] if items else None
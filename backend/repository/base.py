@@ -0,0 +1,213 @@
+# repository/base.py
+# Interface chung cho các repository backend (cosmos / sqlite / memory)
+# Service layer chỉ làm việc qua các interface này, không phụ thuộc database cụ thể
+
+import asyncio
+import base64
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+
+class ItemExistsError(Exception):
+    """Raised by non-Cosmos backends when creating a document whose id already exists"""
+
+
+def is_item_exists(error: BaseException) -> bool:
+    """True for a duplicate-id create on any backend (Cosmos reports it as HTTP 409)"""
+    return isinstance(error, ItemExistsError) or getattr(error, "status_code", None) == 409
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(value: Any) -> str:
+    """Opaque, URL-safe pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps(value, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidCursorError("Invalid cursor")
+
+
+def decode_keyset_cursor(cursor: str) -> Tuple[str, str]:
+    """(created_at, id) of the last item of the previous page"""
+    value = decode_cursor(cursor)
+    if not (isinstance(value, list) and len(value) == 2 and all(isinstance(v, str) for v in value)):
+        raise InvalidCursorError("Invalid cursor")
+    return value[0], value[1]
+
+
+# Fields returned by the compact projection of a result listing
+RESULT_SUMMARY_FIELDS = ("id", "qa_id", "user_id", "score", "created_at")
+
+
+@dataclass(frozen=True)
+class ResultFilter:
+    """Filters for a results listing; None means unfiltered. Bounds are inclusive."""
+
+    qa_id: Optional[str] = None
+    user_id: Optional[str] = None
+    created_from: Optional[str] = None  # ISO timestamps, compared as strings like created_at
+    created_to: Optional[str] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+
+    def matches(self, document: Dict[str, Any]) -> bool:
+        created_at = document.get("created_at") or ""
+        score = document.get("score") or 0
+        return ((self.qa_id is None or document.get("qa_id") == self.qa_id)
+                and (self.user_id is None or document.get("user_id") == self.user_id)
+                and (self.created_from is None or created_at >= self.created_from)
+                and (self.created_to is None or created_at <= self.created_to)
+                and (self.min_score is None or score >= self.min_score)
+                and (self.max_score is None or score <= self.max_score))
+
+
+class ResultPage:
+    """One page of a results listing, consumed as a stream.
+
+    `next_cursor` is only known once `items` has been exhausted; it is None
+    on the last page.
+    """
+
+    def __init__(self):
+        self.items: AsyncIterator[Dict[str, Any]] = None
+        self.next_cursor: Optional[str] = None
+
+
+class QARepository(ABC):
+    """Storage for QA sets (one document per set, keyed by `id`)"""
+
+    @abstractmethod
+    async def find_all(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def find_by_id(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def create(self, qa_data: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def update(self, qa_id: str, qa_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def delete(self, qa_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def find_by_article_id(self, article_id: str) -> List[Dict[str, Any]]:
+        ...
+
+
+class QAResultRepository(ABC):
+    """Storage for submitted QA results"""
+
+    @abstractmethod
+    async def create(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the stored document, system properties (_etag, _ts) included"""
+        ...
+
+    async def create_many(self, qa_results: List[Dict[str, Any]],
+                          concurrency: int) -> List[Union[Dict[str, Any], Exception]]:
+        """Create many results with bounded concurrency.
+
+        Returns one entry per input, in order: the created document, or the
+        exception raised for that document.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def create_one(qa_result):
+            async with semaphore:
+                return await self.create(qa_result)
+
+        return await asyncio.gather(*(create_one(r) for r in qa_results), return_exceptions=True)
+
+    @abstractmethod
+    async def replace(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Overwrite an existing result in place (schema migrations)"""
+        ...
+
+    @abstractmethod
+    async def find_by_id(self, qa_result_id: str, user_id: Optional[str] = None,
+                         qa_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """`user_id` / `qa_id` are optional partition hints; backends may ignore them"""
+        ...
+
+    @abstractmethod
+    async def find_all(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def find_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def find_by_user_and_qa(self, user_id: str, qa_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def find_page(self, filters: ResultFilter, limit: int, cursor: Optional[str],
+                        compact: bool) -> ResultPage:
+        """Newest-first page of at most `limit` results matching `filters`.
+
+        `cursor` is the `next_cursor` of the previous page. With `compact`
+        only RESULT_SUMMARY_FIELDS are returned. Raises InvalidCursorError.
+        """
+        ...
+
+    @abstractmethod
+    async def read_changes(self, continuation: Optional[str],
+                           max_items: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Results written after `continuation` (None = from the beginning), oldest first.
+
+        Returns the documents and the continuation to pass on the next call.
+        """
+        ...
+
+
+class QAStatsRepository(ABC):
+    """Per-QA aggregate documents plus the lease/checkpoint of the feed consumer that maintains them"""
+
+    @abstractmethod
+    async def get_stats(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def upsert_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """Take (or renew) the named lease. Returns the lease document, which
+        carries the feed `continuation`, or None when another owner holds it."""
+        ...
+
+    @abstractmethod
+    async def save_lease(self, lease: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Persist the lease's continuation. Returns the updated lease, or None if it was lost meanwhile."""
+        ...
+
+
+class RepositoryBackend(ABC):
+    """A storage engine providing the repositories plus its lifecycle hooks"""
+
+    name: str = ""
+    qas: QARepository
+    qa_results: QAResultRepository
+    qa_stats: QAStatsRepository
+
+    async def connect(self):
+        """Open connections / create schema. Called from the app lifespan."""
+
+    async def close(self):
+        """Release connections. Called from the app lifespan."""
@@ -0,0 +1,335 @@
+# repository/cosmos_backend.py
+# Repository backend dùng Azure Cosmos DB (mặc định cho production)
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError, CosmosResourceExistsError, CosmosResourceNotFoundError
+)
+
+from backend.config.settings import SETTINGS
+from backend.database.cosmos import (
+    close_cosmos, connect_cosmos, get_qa_stats_container, get_qas_container, get_qas_result_container, warm_cosmos
+)
+from backend.monitoring.cosmos_metrics import ResponseCost, iter_query_pages, query_all, track_call
+from backend.repository.base import (
+    RESULT_SUMMARY_FIELDS, QARepository, QAResultRepository, QAStatsRepository, RepositoryBackend,
+    ResultFilter, ResultPage, decode_cursor, encode_cursor
+)
+
+
+class CosmosQARepository(QARepository):
+    async def find_all(self) -> List[Dict[str, Any]]:
+        container = await get_qas_container()
+
+        # Query tất cả documents
+        query = "SELECT * FROM c ORDER BY c.created_at DESC"
+
+        # Với async client, cross-partition query được enable tự động
+        return await query_all("qa.find_all", container.query_items, query=query)
+
+    async def find_by_id(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            container = await get_qas_container()
+
+            # Đọc document trực tiếp bằng ID và partition key
+            return await track_call("qa.find_by_id", container.read_item,
+                item=qa_id,
+                partition_key=qa_id
+            )
+
+        except CosmosResourceNotFoundError:
+            # Document không tồn tại
+            return None
+
+    async def create(self, qa_data: Dict[str, Any]) -> Dict[str, Any]:
+        container = await get_qas_container()
+
+        # Tạo document mới trong container
+        # create_item sẽ raise error nếu ID đã tồn tại
+        return await track_call("qa.create", container.create_item, body=qa_data)
+
+    async def update(self, qa_id: str, qa_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            container = await get_qas_container()
+
+            # Replace toàn bộ document với dữ liệu mới
+            return await track_call("qa.update", container.replace_item,
+                item=qa_id,
+                body=qa_data
+            )
+
+        except CosmosResourceNotFoundError:
+            # Document không tồn tại
+            return None
+
+    async def delete(self, qa_id: str) -> bool:
+        try:
+            container = await get_qas_container()
+
+            await track_call("qa.delete", container.delete_item,
+                item=qa_id,
+                partition_key=qa_id
+            )
+            return True
+
+        except CosmosResourceNotFoundError:
+            return False
+
+    async def find_by_article_id(self, article_id: str) -> List[Dict[str, Any]]:
+        container = await get_qas_container()
+        query = "SELECT * FROM c WHERE c.article_id=@article_id"
+        parameters = [
+            {"name": "@article_id", "value": article_id}
+        ]
+
+        return await query_all(
+            "qa.find_by_article", container.query_items, query=query, parameters=parameters
+        )
+
+
+class CosmosQAResultRepository(QAResultRepository):
+    """Results container partitioned per COSMOS_RESULTS_PARTITION.
+
+    With "user" / "user_qa" partitioning, history lookups are served from a
+    single logical partition (or a hierarchical prefix) instead of fanning
+    out across the whole container.
+    """
+
+    def __init__(self):
+        self.partition_mode = SETTINGS.cosmos_results_partition
+
+    def _point_partition_key(self, qa_result_id: str, user_id: Optional[str], qa_id: Optional[str]):
+        """Partition key for a point read, or None when the hints are insufficient"""
+        if self.partition_mode == "id":
+            return qa_result_id
+        if self.partition_mode == "user" and user_id:
+            return user_id
+        if self.partition_mode == "user_qa" and user_id and qa_id:
+            return [user_id, qa_id]
+        return None
+
+    def _user_partition_key(self, user_id: str):
+        if self.partition_mode == "user":
+            return user_id
+        if self.partition_mode == "user_qa":
+            # Prefix of the hierarchical key: all of this user's sub-partitions
+            return [user_id]
+        return None
+
+    async def create(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        container = await get_qas_result_container()
+        return await track_call("qa_result.create", container.create_item, body=qa_result)
+
+    async def replace(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        container = await get_qas_result_container()
+        return await track_call("qa_result.replace", container.replace_item,
+            item=qa_result["id"],
+            body=qa_result
+        )
+
+    async def find_by_id(self, qa_result_id: str, user_id: Optional[str] = None,
+                         qa_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        container = await get_qas_result_container()
+        partition_key = self._point_partition_key(qa_result_id, user_id, qa_id)
+        if partition_key is not None:
+            try:
+                return await track_call("qa_result.find_by_id", container.read_item,
+                    item=qa_result_id,
+                    partition_key=partition_key
+                )
+            except CosmosResourceNotFoundError:
+                return None
+
+        # Partition unknown: fall back to an id lookup (scoped to the user prefix when possible)
+        query = "SELECT * FROM c WHERE c.id=@id"
+        parameters = [{"name": "@id", "value": qa_result_id}]
+        kwargs = {}
+        if user_id and self.partition_mode == "user_qa":
+            kwargs["partition_key"] = [user_id]
+        items = await query_all(
+            "qa_result.find_by_id_query", container.query_items,
+            query=query, parameters=parameters, **kwargs
+        )
+        return items[0] if items else None
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        container = await get_qas_result_container()
+        query = "SELECT * FROM c ORDER BY c.created_at DESC"
+
+        return await query_all("qa_result.find_all", container.query_items, query=query)
+
+    async def find_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        container = await get_qas_result_container()
+        query = "SELECT * FROM c WHERE c.user_id=@user_id ORDER BY c.created_at DESC"
+        parameters = [
+            {"name": "@user_id", "value": user_id}
+        ]
+        kwargs = {}
+        partition_key = self._user_partition_key(user_id)
+        if partition_key is not None:
+            kwargs["partition_key"] = partition_key
+
+        return await query_all(
+            "qa_result.find_by_user", container.query_items,
+            query=query, parameters=parameters, **kwargs
+        )
+
+    async def find_by_user_and_qa(self, user_id: str, qa_id: str) -> List[Dict[str, Any]]:
+        container = await get_qas_result_container()
+        query = "SELECT * FROM c WHERE c.user_id=@user_id AND c.qa_id=@qa_id ORDER BY c.created_at DESC"
+        parameters = [
+            {"name": "@user_id", "value": user_id},
+            {"name": "@qa_id", "value": qa_id}
+        ]
+        kwargs = {}
+        if self.partition_mode == "user":
+            kwargs["partition_key"] = user_id
+        elif self.partition_mode == "user_qa":
+            kwargs["partition_key"] = [user_id, qa_id]
+
+        return await query_all(
+            "qa_result.find_by_user_and_qa", container.query_items,
+            query=query, parameters=parameters, **kwargs
+        )
+
+    async def find_page(self, filters: ResultFilter, limit: int, cursor: Optional[str],
+                        compact: bool) -> ResultPage:
+        container = await get_qas_result_container()
+        clauses, parameters = [], []
+        for name, op, value in (
+            ("qa_id", "=", filters.qa_id),
+            ("user_id", "=", filters.user_id),
+            ("created_at", ">=", filters.created_from),
+            ("created_at", "<=", filters.created_to),
+            ("score", ">=", filters.min_score),
+            ("score", "<=", filters.max_score),
+        ):
+            if value is not None:
+                parameter = f"@p{len(parameters)}"
+                clauses.append(f"c.{name} {op} {parameter}")
+                parameters.append({"name": parameter, "value": value})
+
+        projection = ", ".join(f"c.{f}" for f in RESULT_SUMMARY_FIELDS) if compact else "*"
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT {projection} FROM c{where} ORDER BY c.created_at DESC"
+
+        kwargs = {}
+        if filters.user_id:
+            if self.partition_mode == "user_qa" and filters.qa_id:
+                kwargs["partition_key"] = [filters.user_id, filters.qa_id]
+            else:
+                partition_key = self._user_partition_key(filters.user_id)
+                if partition_key is not None:
+                    kwargs["partition_key"] = partition_key
+
+        # The cursor wraps the SDK continuation token of the previous page
+        continuation = decode_cursor(cursor) if cursor else None
+        cost = ResponseCost()
+        pages = container.query_items(
+            query=query, parameters=parameters, max_item_count=limit, response_hook=cost, **kwargs
+        ).by_page(continuation)
+
+        page = ResultPage()
+
+        async def items():
+            async for batch in iter_query_pages("qa_result.find_page", pages, cost):
+                for item in batch:
+                    yield item
+                # One SDK page per listing page
+                break
+            token = pages.continuation_token
+            page.next_cursor = encode_cursor(token) if token else None
+
+        page.items = items()
+        return page
+
+    async def read_changes(self, continuation: Optional[str],
+                           max_items: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        container = await get_qas_result_container()
+        cost = ResponseCost()
+        if continuation:
+            feed = container.query_items_change_feed(continuation=continuation, max_item_count=max_items, response_hook=cost)
+        else:
+            feed = container.query_items_change_feed(start_time="Beginning", max_item_count=max_items, response_hook=cost)
+
+        items = []
+        pages = feed.by_page()
+        async for page in iter_query_pages("qa_result.change_feed", pages, cost):
+            items.extend(page)
+            if len(items) >= max_items:
+                break
+        # The page iterator captures each page's continuation as it is read; the client's
+        # last_response_headers are shared with every other concurrent request
+        return items, pages.continuation_token or continuation
+
+
+class CosmosQAStatsRepository(QAStatsRepository):
+    async def get_stats(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        container = await get_qa_stats_container()
+        try:
+            return await track_call("qa_stats.get", container.read_item,
+                item=qa_id,
+                partition_key=qa_id
+            )
+        except CosmosResourceNotFoundError:
+            return None
+
+    async def upsert_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        container = await get_qa_stats_container()
+        return await track_call("qa_stats.upsert", container.upsert_item, body=stats)
+
+    async def _replace_if_unchanged(self, container, lease: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return await track_call("qa_stats.lease", container.replace_item,
+                item=lease["id"],
+                body=lease,
+                etag=lease.get("_etag"),
+                match_condition=MatchConditions.IfNotModified
+            )
+        except (CosmosAccessConditionFailedError, CosmosResourceNotFoundError):
+            return None
+
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        container = await get_qa_stats_container()
+        lease_id = f"_lease:{name}"
+        now = time.time()
+        try:
+            lease = await track_call("qa_stats.lease", container.read_item,
+                item=lease_id,
+                partition_key=lease_id
+            )
+        except CosmosResourceNotFoundError:
+            lease = {"id": lease_id, "name": name, "owner": owner, "expires_at": now + ttl_seconds, "continuation": None}
+            try:
+                return await track_call("qa_stats.lease", container.create_item, body=lease)
+            except CosmosResourceExistsError:
+                # Another worker created it first
+                return None
+
+        if lease.get("owner") != owner and lease.get("expires_at", 0) > now:
+            return None
+        lease["owner"] = owner
+        lease["expires_at"] = now + ttl_seconds
+        return await self._replace_if_unchanged(container, lease)
+
+    async def save_lease(self, lease: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        container = await get_qa_stats_container()
+        return await self._replace_if_unchanged(container, lease)
+
+
+class CosmosBackend(RepositoryBackend):
+    name = "cosmos"
+
+    def __init__(self):
+        self.qas = CosmosQARepository()
+        self.qa_results = CosmosQAResultRepository()
+        self.qa_stats = CosmosQAStatsRepository()
+
+    async def connect(self):
+        await connect_cosmos()
+        await warm_cosmos()
+
+    async def close(self):
+        await close_cosmos()
@@ -0,0 +1,53 @@
+# repository/factory.py
+# Chọn repository backend theo cấu hình REPOSITORY_BACKEND (cosmos | sqlite | memory)
+
+from typing import Optional
+
+from backend.config.settings import SETTINGS
+from backend.repository.base import QARepository, QAResultRepository, QAStatsRepository, RepositoryBackend
+
+_backend: Optional[RepositoryBackend] = None
+
+
+def _create_backend(name: str) -> RepositoryBackend:
+    # Import lazily so non-Cosmos backends never touch the Cosmos module
+    if name == "cosmos":
+        from backend.repository.cosmos_backend import CosmosBackend
+        return CosmosBackend()
+    if name == "sqlite":
+        from backend.repository.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(SETTINGS.sqlite_path)
+    if name == "memory":
+        from backend.repository.memory_backend import MemoryBackend
+        return MemoryBackend()
+    raise ValueError(f"Unknown REPOSITORY_BACKEND '{name}' (expected cosmos, sqlite or memory)")
+
+
+def get_backend() -> RepositoryBackend:
+    global _backend
+    if _backend is None:
+        _backend = _create_backend(SETTINGS.repository_backend)
+    return _backend
+
+
+def get_qa_repository() -> QARepository:
+    return get_backend().qas
+
+
+def get_qa_result_repository() -> QAResultRepository:
+    return get_backend().qa_results
+
+
+def get_qa_stats_repository() -> QAStatsRepository:
+    return get_backend().qa_stats
+
+
+async def init_repositories():
+    """Connect the configured backend. Called during app startup."""
+    await get_backend().connect()
+
+
+async def close_repositories():
+    """Close the configured backend. Called during app shutdown."""
+    if _backend is not None:
+        await _backend.close()
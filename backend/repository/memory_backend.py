@@ -0,0 +1,161 @@
+# repository/memory_backend.py
+# Repository backend lưu trong bộ nhớ process - dùng cho local dev và load test
+# Dữ liệu mất khi restart; không chia sẻ giữa các worker
+
+import copy
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.repository.base import (
+    RESULT_SUMMARY_FIELDS, ItemExistsError, QARepository, QAResultRepository, QAStatsRepository,
+    RepositoryBackend, ResultFilter, ResultPage, decode_keyset_cursor, encode_cursor
+)
+
+
+def _stamp(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the system properties Cosmos would add on every write"""
+    document["_etag"] = f'"{uuid.uuid4().hex}"'
+    document["_ts"] = int(time.time())
+    return document
+
+
+def _newest_first(documents) -> List[Dict[str, Any]]:
+    return [copy.deepcopy(d) for d in sorted(documents, key=lambda d: d.get("created_at") or "", reverse=True)]
+
+
+class MemoryQARepository(QARepository):
+    def __init__(self):
+        self.items: Dict[str, Dict[str, Any]] = {}
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        return _newest_first(self.items.values())
+
+    async def find_by_id(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        item = self.items.get(qa_id)
+        return copy.deepcopy(item) if item else None
+
+    async def create(self, qa_data: Dict[str, Any]) -> Dict[str, Any]:
+        if qa_data["id"] in self.items:
+            raise ItemExistsError(f"QA '{qa_data['id']}' already exists")
+        self.items[qa_data["id"]] = _stamp(copy.deepcopy(qa_data))
+        return copy.deepcopy(self.items[qa_data["id"]])
+
+    async def update(self, qa_id: str, qa_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if qa_id not in self.items:
+            return None
+        self.items[qa_id] = _stamp(copy.deepcopy(qa_data))
+        return copy.deepcopy(self.items[qa_id])
+
+    async def delete(self, qa_id: str) -> bool:
+        return self.items.pop(qa_id, None) is not None
+
+    async def find_by_article_id(self, article_id: str) -> List[Dict[str, Any]]:
+        return [copy.deepcopy(d) for d in self.items.values() if d.get("article_id") == article_id]
+
+
+class MemoryQAResultRepository(QAResultRepository):
+    def __init__(self):
+        self.items: Dict[str, Dict[str, Any]] = {}
+        # Ids in write order - plays the role of the Cosmos change feed
+        self.change_log: List[str] = []
+
+    async def create(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        if qa_result["id"] in self.items:
+            raise ItemExistsError(f"QA result '{qa_result['id']}' already exists")
+        self.items[qa_result["id"]] = _stamp(copy.deepcopy(qa_result))
+        self.change_log.append(qa_result["id"])
+        return copy.deepcopy(self.items[qa_result["id"]])
+
+    async def replace(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        # Not appended to the change log: a rewrite is not a new attempt
+        self.items[qa_result["id"]] = _stamp(copy.deepcopy(qa_result))
+        return copy.deepcopy(self.items[qa_result["id"]])
+
+    async def find_by_id(self, qa_result_id: str, user_id: Optional[str] = None,
+                         qa_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        item = self.items.get(qa_result_id)
+        return copy.deepcopy(item) if item else None
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        return _newest_first(self.items.values())
+
+    async def find_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        return _newest_first(d for d in self.items.values() if d.get("user_id") == user_id)
+
+    async def find_by_user_and_qa(self, user_id: str, qa_id: str) -> List[Dict[str, Any]]:
+        return _newest_first(
+            d for d in self.items.values() if d.get("user_id") == user_id and d.get("qa_id") == qa_id
+        )
+
+    async def find_page(self, filters: ResultFilter, limit: int, cursor: Optional[str],
+                        compact: bool) -> ResultPage:
+        after = decode_keyset_cursor(cursor) if cursor else None
+        ordered = sorted(
+            (d for d in self.items.values() if filters.matches(d)),
+            key=lambda d: (d.get("created_at") or "", d["id"]), reverse=True
+        )
+        if after is not None:
+            ordered = [d for d in ordered if (d.get("created_at") or "", d["id"]) < after]
+        selected = ordered[:limit]
+
+        page = ResultPage()
+        if len(ordered) > limit:
+            last = selected[-1]
+            page.next_cursor = encode_cursor([last.get("created_at") or "", last["id"]])
+
+        async def items():
+            for d in selected:
+                yield {f: d.get(f) for f in RESULT_SUMMARY_FIELDS} if compact else copy.deepcopy(d)
+
+        page.items = items()
+        return page
+
+    async def read_changes(self, continuation: Optional[str],
+                           max_items: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        start = int(continuation or 0)
+        ids = self.change_log[start:start + max_items]
+        return [copy.deepcopy(self.items[i]) for i in ids if i in self.items], str(start + len(ids))
+
+
+class MemoryQAStatsRepository(QAStatsRepository):
+    def __init__(self):
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.leases: Dict[str, Dict[str, Any]] = {}
+
+    async def get_stats(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        item = self.items.get(qa_id)
+        return copy.deepcopy(item) if item else None
+
+    async def upsert_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        self.items[stats["id"]] = _stamp(copy.deepcopy(stats))
+        return copy.deepcopy(self.items[stats["id"]])
+
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        lease = self.leases.get(name)
+        now = time.time()
+        if lease and lease["owner"] != owner and lease["expires_at"] > now:
+            return None
+        lease = dict(lease or {"id": f"_lease:{name}", "name": name, "continuation": None})
+        lease.update(owner=owner, expires_at=now + ttl_seconds)
+        self.leases[name] = lease
+        return dict(lease)
+
+    async def save_lease(self, lease: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        current = self.leases.get(lease["name"])
+        if current is None or current["owner"] != lease["owner"]:
+            return None
+        self.leases[lease["name"]] = dict(lease)
+        return dict(lease)
+
+
+class MemoryBackend(RepositoryBackend):
+    name = "memory"
+
+    def __init__(self):
+        self.qas = MemoryQARepository()
+        self.qa_results = MemoryQAResultRepository()
+        self.qa_stats = MemoryQAStatsRepository()
+
+    async def connect(self):
+        print("✅ Using in-memory repository backend (data is not persisted)")
@@ -1,60 +1,29 @@
-import uuid
-
-from backend.database.cosmos import get_qas_result_container
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from backend.repository.factory import get_qa_result_repository
 
 
 async def create_qa_result(qa_result: dict) -> dict:
-    container = await get_qas_result_container()
-    await container.create_item(body=qa_result)
-    return qa_result
-
-
-async def find_qa_result_by_id(qa_result_id: str) -> dict:
-    try:
-        container = await get_qas_result_container()
-        
-        item = await container.read_item(
-            item=qa_result_id,
-            partition_key=qa_result_id
-        )
-        return item
-        
-    except CosmosResourceNotFoundError:
-        return None
-async def find_all_qa_results() -> list:
-    container = await get_qas_result_container()
-    query = "SELECT * FROM c ORDER BY c.created_at DESC"
+    return await get_qa_result_repository().create(qa_result)
 
-    items = []
-    async for item in container.query_items(query=query):
-        items.append(item)
-        
-    return items   
 
-async def find_all_qa_results_by_user(user_id: str) -> list:
-    container = await get_qas_result_container()
-    query = "SELECT * FROM c WHERE c.user_id=@user_id ORDER BY c.created_at DESC"
-    parameters = [
-        {"name": "@user_id", "value": user_id}
-    ]
+async def create_qa_results(qa_results: list, concurrency: int) -> list:
+    return await get_qa_result_repository().create_many(qa_results, concurrency)
+
+
+async def replace_qa_result(qa_result: dict) -> dict:
+    return await get_qa_result_repository().replace(qa_result)
 
-    items = []
-    async for item in container.query_items(query=query, parameters=parameters):
-        items.append(item)
 
-    return items
+async def find_qa_result_by_id(qa_result_id: str, user_id: str = None, qa_id: str = None) -> dict:
+    return await get_qa_result_repository().find_by_id(qa_result_id, user_id=user_id, qa_id=qa_id)
+
+async def find_qa_results_page(filters, limit: int, cursor: str = None, compact: bool = False):
+    return await get_qa_result_repository().find_page(filters, limit, cursor, compact)
+
+async def find_all_qa_results() -> list:
+    return await get_qa_result_repository().find_all()
+
+async def find_all_qa_results_by_user(user_id: str) -> list:
+    return await get_qa_result_repository().find_by_user(user_id)
 
 async def find_all_qa_results_by_user_and_qa(user_id: str, qa_id: str) -> list:
-    container = await get_qas_result_container()
-    query = "SELECT * FROM c WHERE c.user_id=@user_id AND c.qa_id=@qa_id ORDER BY c.created_at DESC"
-    parameters = [
-        {"name": "@user_id", "value": user_id},
-        {"name": "@qa_id", "value": qa_id}
-    ]
-
-    items = []
-    async for item in container.query_items(query=query, parameters=parameters):
-        items.append(item)
-
-    return items
+    return await get_qa_result_repository().find_by_user_and_qa(user_id, qa_id)
@@ -0,0 +1,336 @@
+# repository/sqlite_backend.py
+# Repository backend dùng SQLite nhúng (WAL mode) - baseline tái lập được cho benchmark local
+# Mỗi document được lưu nguyên dạng JSON, các field dùng để lọc/sắp xếp được tách ra cột có index
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from backend.repository.base import (
+    RESULT_SUMMARY_FIELDS, ItemExistsError, QARepository, QAResultRepository, QAStatsRepository,
+    RepositoryBackend, ResultFilter, ResultPage, decode_keyset_cursor, encode_cursor
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS qas (
+    id TEXT PRIMARY KEY,
+    article_id TEXT,
+    created_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_qas_article_id ON qas (article_id);
+CREATE INDEX IF NOT EXISTS idx_qas_created_at ON qas (created_at);
+
+CREATE TABLE IF NOT EXISTS qa_results (
+    id TEXT PRIMARY KEY,
+    qa_id TEXT,
+    user_id TEXT,
+    created_at TEXT,
+    seq INTEGER,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_qa_results_user_id ON qa_results (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_qa_results_user_qa ON qa_results (user_id, qa_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_qa_results_qa_id ON qa_results (qa_id);
+CREATE INDEX IF NOT EXISTS idx_qa_results_created_at_id ON qa_results (created_at, id);
+
+CREATE TABLE IF NOT EXISTS qa_stats (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    continuation TEXT
+);
+"""
+
+# Applied after SCHEMA; columns added to tables that may predate them
+MIGRATIONS = [
+    ("qa_results", "seq", "ALTER TABLE qa_results ADD COLUMN seq INTEGER"),
+]
+
+
+class SQLiteDatabase:
+    """One shared connection; statements run in a worker thread so the event loop never blocks"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        if self.connection is not None:
+            return
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        for table, column, statement in MIGRATIONS:
+            columns = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self.connection.execute(statement)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_qa_results_seq ON qa_results (seq)")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    async def run(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        def locked():
+            with self._lock:
+                if self.connection is None:
+                    self.open()
+                return func(self.connection)
+        return await asyncio.to_thread(locked)
+
+
+def _stamp(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the system properties Cosmos would add on every write"""
+    document = dict(document)
+    document["_etag"] = f'"{uuid.uuid4().hex}"'
+    document["_ts"] = int(time.time())
+    return document
+
+
+def _load_all(rows) -> List[Dict[str, Any]]:
+    return [json.loads(row[0]) for row in rows]
+
+
+class SQLiteQARepository(QARepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        return await self.db.run(lambda conn: _load_all(
+            conn.execute("SELECT doc FROM qas ORDER BY created_at DESC")
+        ))
+
+    async def find_by_id(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(lambda conn: conn.execute("SELECT doc FROM qas WHERE id = ?", (qa_id,)).fetchone())
+        return json.loads(row[0]) if row else None
+
+    async def create(self, qa_data: Dict[str, Any]) -> Dict[str, Any]:
+        document = _stamp(qa_data)
+
+        def insert(conn):
+            try:
+                conn.execute(
+                    "INSERT INTO qas (id, article_id, created_at, doc) VALUES (?, ?, ?, ?)",
+                    (document["id"], document.get("article_id"), document.get("created_at"), json.dumps(document))
+                )
+            except sqlite3.IntegrityError:
+                raise ItemExistsError(f"QA '{document['id']}' already exists")
+
+        await self.db.run(insert)
+        return document
+
+    async def update(self, qa_id: str, qa_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        document = _stamp(qa_data)
+        updated = await self.db.run(lambda conn: conn.execute(
+            "UPDATE qas SET article_id = ?, created_at = ?, doc = ? WHERE id = ?",
+            (document.get("article_id"), document.get("created_at"), json.dumps(document), qa_id)
+        ).rowcount)
+        return document if updated else None
+
+    async def delete(self, qa_id: str) -> bool:
+        deleted = await self.db.run(lambda conn: conn.execute("DELETE FROM qas WHERE id = ?", (qa_id,)).rowcount)
+        return deleted > 0
+
+    async def find_by_article_id(self, article_id: str) -> List[Dict[str, Any]]:
+        return await self.db.run(lambda conn: _load_all(
+            conn.execute("SELECT doc FROM qas WHERE article_id = ?", (article_id,))
+        ))
+
+
+class SQLiteQAResultRepository(QAResultRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def create(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        document = _stamp(qa_result)
+
+        def insert(conn):
+            try:
+                conn.execute(
+                    "INSERT INTO qa_results (id, qa_id, user_id, created_at, seq, doc) "
+                    "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM qa_results), ?)",
+                    (document["id"], document.get("qa_id"), document.get("user_id"),
+                     document.get("created_at"), json.dumps(document))
+                )
+            except sqlite3.IntegrityError:
+                raise ItemExistsError(f"QA result '{document['id']}' already exists")
+
+        await self.db.run(insert)
+        return document
+
+    async def create_many(self, qa_results: List[Dict[str, Any]],
+                          concurrency: int) -> List[Union[Dict[str, Any], Exception]]:
+        # A single transaction is far cheaper than one commit per row in SQLite
+        documents = [_stamp(r) for r in qa_results]
+
+        def insert_all(conn):
+            outcomes = []
+            conn.execute("BEGIN")
+            try:
+                for document in documents:
+                    try:
+                        conn.execute(
+                            "INSERT INTO qa_results (id, qa_id, user_id, created_at, seq, doc) "
+                            "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM qa_results), ?)",
+                            (document["id"], document.get("qa_id"), document.get("user_id"),
+                             document.get("created_at"), json.dumps(document))
+                        )
+                        outcomes.append(document)
+                    except sqlite3.IntegrityError:
+                        outcomes.append(ItemExistsError(f"QA result '{document['id']}' already exists"))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return outcomes
+
+        return await self.db.run(insert_all)
+
+    async def replace(self, qa_result: Dict[str, Any]) -> Dict[str, Any]:
+        document = _stamp(qa_result)
+        # seq is left unchanged so the rewrite does not reappear in read_changes
+        await self.db.run(lambda conn: conn.execute(
+            "UPDATE qa_results SET doc = ? WHERE id = ?", (json.dumps(document), document["id"])
+        ))
+        return document
+
+    async def find_by_id(self, qa_result_id: str, user_id: Optional[str] = None,
+                         qa_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(lambda conn: conn.execute(
+            "SELECT doc FROM qa_results WHERE id = ?", (qa_result_id,)
+        ).fetchone())
+        return json.loads(row[0]) if row else None
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        return await self.db.run(lambda conn: _load_all(
+            conn.execute("SELECT doc FROM qa_results ORDER BY created_at DESC")
+        ))
+
+    async def find_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        return await self.db.run(lambda conn: _load_all(conn.execute(
+            "SELECT doc FROM qa_results WHERE user_id = ? ORDER BY created_at DESC", (user_id,)
+        )))
+
+    async def find_by_user_and_qa(self, user_id: str, qa_id: str) -> List[Dict[str, Any]]:
+        return await self.db.run(lambda conn: _load_all(conn.execute(
+            "SELECT doc FROM qa_results WHERE user_id = ? AND qa_id = ? ORDER BY created_at DESC", (user_id, qa_id)
+        )))
+
+    async def find_page(self, filters: ResultFilter, limit: int, cursor: Optional[str],
+                        compact: bool) -> ResultPage:
+        clauses, params = [], []
+        for column, op, value in (
+            ("qa_id", "=", filters.qa_id),
+            ("user_id", "=", filters.user_id),
+            ("created_at", ">=", filters.created_from),
+            ("created_at", "<=", filters.created_to),
+            ("json_extract(doc, '$.score')", ">=", filters.min_score),
+            ("json_extract(doc, '$.score')", "<=", filters.max_score),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        if cursor:
+            created_at, last_id = decode_keyset_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, last_id])
+
+        columns = "id, qa_id, user_id, json_extract(doc, '$.score'), created_at" if compact else "doc, created_at, id"
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # One extra row tells whether another page exists
+        sql = f"SELECT {columns} FROM qa_results {where} ORDER BY created_at DESC, id DESC LIMIT ?"
+        rows = await self.db.run(lambda conn: conn.execute(sql, (*params, limit + 1)).fetchall())
+
+        page = ResultPage()
+        rows, has_more = rows[:limit], len(rows) > limit
+        if has_more:
+            last = dict(zip(RESULT_SUMMARY_FIELDS, rows[-1])) if compact else {"created_at": rows[-1][1], "id": rows[-1][2]}
+            page.next_cursor = encode_cursor([last["created_at"] or "", last["id"]])
+
+        async def items():
+            for row in rows:
+                yield dict(zip(RESULT_SUMMARY_FIELDS, row)) if compact else json.loads(row[0])
+
+        page.items = items()
+        return page
+
+    async def read_changes(self, continuation: Optional[str],
+                           max_items: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        after = int(continuation or 0)
+        rows = await self.db.run(lambda conn: conn.execute(
+            "SELECT seq, doc FROM qa_results WHERE seq > ? ORDER BY seq LIMIT ?", (after, max_items)
+        ).fetchall())
+        if not rows:
+            return [], str(after)
+        return [json.loads(row[1]) for row in rows], str(rows[-1][0])
+
+
+class SQLiteQAStatsRepository(QAStatsRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def get_stats(self, qa_id: str) -> Optional[Dict[str, Any]]:
+        row = await self.db.run(lambda conn: conn.execute("SELECT doc FROM qa_stats WHERE id = ?", (qa_id,)).fetchone())
+        return json.loads(row[0]) if row else None
+
+    async def upsert_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        document = _stamp(stats)
+        await self.db.run(lambda conn: conn.execute(
+            "INSERT INTO qa_stats (id, doc) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET doc = excluded.doc",
+            (document["id"], json.dumps(document))
+        ))
+        return document
+
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        def acquire(conn):
+            now = time.time()
+            # Single statement: insert, or take over when we own it or it has expired
+            conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (name, owner, now + ttl_seconds, now)
+            )
+            row = conn.execute("SELECT owner, expires_at, continuation FROM leases WHERE name = ?", (name,)).fetchone()
+            if row is None or row[0] != owner:
+                return None
+            return {"name": name, "owner": row[0], "expires_at": row[1], "continuation": row[2]}
+        return await self.db.run(acquire)
+
+    async def save_lease(self, lease: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        updated = await self.db.run(lambda conn: conn.execute(
+            "UPDATE leases SET continuation = ?, expires_at = ? WHERE name = ? AND owner = ?",
+            (lease.get("continuation"), lease["expires_at"], lease["name"], lease["owner"])
+        ).rowcount)
+        return dict(lease) if updated else None
+
+
+class SQLiteBackend(RepositoryBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.db = SQLiteDatabase(path)
+        self.qas = SQLiteQARepository(self.db)
+        self.qa_results = SQLiteQAResultRepository(self.db)
+        self.qa_stats = SQLiteQAStatsRepository(self.db)
+
+    async def connect(self):
+        await asyncio.to_thread(self.db.open)
+        print(f"✅ Using SQLite repository backend at {self.db.path} (WAL)")
+
+    async def close(self):
+        await asyncio.to_thread(self.db.close)
+        print("🛑 SQLite connection closed")
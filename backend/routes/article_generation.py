@@ -1,15 +1,18 @@
 # routes/article_generation.py
 # Router for article generation endpoints
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional
 from pydantic import BaseModel
 
 # Import service functions
 from backend.service.article_generation_service import (
     generate_article_from_input,
-    get_article_suggestions_from_query
+    get_article_suggestions_from_query,
+    stream_article_from_input
 )
+from backend.service.job_service import job_manager
+from backend.routes.jobs import sse_event
 
 class ArticleGenerationRequest(BaseModel):
     query: str
@@ -18,6 +21,7 @@ class ArticleGenerationRequest(BaseModel):
     length: Optional[str] = "medium"
     tone: Optional[str] = "professional"
     output_format: Optional[str] = "markdown"
+    bypass_cache: bool = False  # Always call the LLM, even for a topic + options generated before
 
 class ArticleSuggestionsRequest(BaseModel):
     query: str
@@ -35,7 +39,8 @@ async def generate_article(request: ArticleGenerationRequest):
             article_type=request.article_type,
             length=request.length,
             tone=request.tone,
-            output_format=request.output_format
+            output_format=request.output_format,
+            bypass_cache=request.bypass_cache
         )
         
         if result["success"]:
@@ -46,7 +51,8 @@ async def generate_article(request: ArticleGenerationRequest):
                     "title": result["title"],
                     "abstract": result["abstract"],
                     "content": result["content"],
-                    "tags": result["tags"]
+                    "tags": result["tags"],
+                    "cached": result.get("cached", False)
                 },
                 "message": result.get("message", "Article generated successfully")
             }
@@ -61,6 +67,37 @@ async def generate_article(request: ArticleGenerationRequest):
             content={"success": False, "message": "Internal server error", "error": str(e)}
         )
 
+@article_generation.post("/stream")
+async def stream_article(request: ArticleGenerationRequest):
+    """
+    Generate an article as server-sent events
+
+    "delta" events carry {field, text} for title, abstract and content as they
+    are written (content already LaTeX-processed), "field" events mark a
+    finished field (with its value for tags), and the final "done" event holds
+    the validated article plus tokens_used ("error" if the response could not
+    be parsed). The "done" article is authoritative.
+    """
+    async def body():
+        try:
+            async for event in stream_article_from_input(**request.dict()):
+                yield sse_event(event["event"], event["data"])
+        except Exception as e:
+            print(f"❌ Article generation stream error: {e}")
+            yield sse_event("error", {"error": "Article generation failed", "message": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@article_generation.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_article_generation_job(request: ArticleGenerationRequest):
+    """Generate an article in the background; poll GET /api/jobs/{job_id} or subscribe to its events"""
+    job = await job_manager.submit("article_generation", request.dict())
+    return {"success": True, "data": job}
+
 @article_generation.post("/suggestions")
 async def get_article_suggestions(request: ArticleSuggestionsRequest):
     """Get article topic suggestions based on a query"""
@@ -68,7 +105,7 @@ async def get_article_suggestions(request: ArticleSuggestionsRequest):
         result = await get_article_suggestions_from_query(request.query)
         
         if result["success"]:
-            return {"success": True, "data": result["data"]}
+            return {"success": True, "data": result["data"], "cached": result.get("cached", False)}
         else:
             return JSONResponse(
                 status_code=400,
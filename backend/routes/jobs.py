@@ -0,0 +1,62 @@
+# routes/jobs.py
+# Router for background job status: polling and server-sent events
+import asyncio
+import json
+import time
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from backend.config.settings import SETTINGS
+from backend.service.job_service import FINAL_STATUSES, job_manager
+
+jobs = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+KEEPALIVE_SECONDS = 15
+
+
+def sse_event(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+@jobs.get("/{job_id}")
+async def get_job(job_id: str):
+    """Current status, progress and (once completed) result of a job"""
+    job = await job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "data": job}
+
+
+@jobs.get("/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-sent events for a job: one event (named after the job status) each
+    time the record changes, ending after completed / failed / interrupted
+    """
+    if not await job_manager.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def body():
+        last_update, last_sent = None, time.monotonic()
+        while True:
+            job = await job_manager.get(job_id)
+            if job is None:
+                yield sse_event("expired", {"id": job_id})
+                return
+            if job.get("updated_at") != last_update:
+                last_update, last_sent = job.get("updated_at"), time.monotonic()
+                yield sse_event(job["status"], job)
+                if job["status"] in FINAL_STATUSES:
+                    return
+            elif time.monotonic() - last_sent > KEEPALIVE_SECONDS:
+                # Comment line keeps proxies from closing an idle stream
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(SETTINGS.jobs_events_poll_seconds)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,67 @@
+# routes/leaderboard.py
+# Router cho bảng xếp hạng điểm QA (Redis sorted sets)
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from backend.service.leaderboard_service import leaderboard_service
+
+leaderboard = APIRouter(prefix="/api/leaderboard", tags=["Leaderboard"])
+
+@leaderboard.get("/global")
+async def get_global_leaderboard(
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(20, ge=1, le=100, description="Number of users per page")
+):
+    """Users ranked by the sum of their best scores across all QA sets"""
+    try:
+        return {"success": True, "data": await leaderboard_service.get_global_leaderboard(page, limit)}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
+
+@leaderboard.get("/global/users/{user_id}")
+async def get_global_rank(user_id: str):
+    try:
+        rank = await leaderboard_service.get_global_rank(user_id)
+        if rank is None:
+            raise HTTPException(status_code=404, detail="User has no ranked results")
+        return {"success": True, "data": rank}
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
+
+@leaderboard.get("/qa/{qa_id}")
+async def get_qa_leaderboard(
+    qa_id: str,
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(20, ge=1, le=100, description="Number of users per page")
+):
+    """Users ranked by their best score on one QA set"""
+    try:
+        return {"success": True, "data": await leaderboard_service.get_qa_leaderboard(qa_id, page, limit)}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
+
+@leaderboard.get("/qa/{qa_id}/users/{user_id}")
+async def get_qa_rank(qa_id: str, user_id: str):
+    try:
+        rank = await leaderboard_service.get_qa_rank(qa_id, user_id)
+        if rank is None:
+            raise HTTPException(status_code=404, detail="User has no result for this QA")
+        return {"success": True, "data": rank}
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
@@ -0,0 +1,54 @@
+# routes/metrics.py
+# Router exposing in-process performance metrics
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from backend.monitoring.cosmos_metrics import cosmos_metrics
+from backend.config.settings import SETTINGS
+from backend.service.answer_key_service import answer_key_cache
+from backend.service.article_generation_service import article_generation_service
+from backend.service.job_service import job_manager
+from backend.service.llm_gateway import llm_gateway
+from backend.service.prompt_registry import prompt_registry
+from backend.service.qa_generation_service import qa_generation_service
+from backend.service.question_similarity import question_index_cache
+from backend.service.result_stream_service import result_stream_consumer
+
+metrics = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@metrics.get("")
+async def get_metrics():
+    """Cosmos request charge / latency / item count histograms per repository operation and per route,
+    cache statistics, LLM prompt token usage (cached vs uncached) per prompt template version, and LLM
+    gateway calls / retries / failures / circuit breaker state"""
+    try:
+        data = {
+            "cosmos": cosmos_metrics.snapshot(),
+            "answer_key_cache": answer_key_cache.stats(),
+            "qa_generation_cache": qa_generation_service.cache.stats(),
+            "article_generation_cache": article_generation_service.generation_cache.stats(),
+            "article_suggestions_cache": article_generation_service.suggestions_cache.stats(),
+            "jobs": job_manager.stats(),
+            "question_index_cache": question_index_cache.stats(),
+            "prompts": prompt_registry.stats(),
+            "llm_gateway": llm_gateway.stats(),
+        }
+        if SETTINGS.results_write_behind:
+            data["results_stream"] = await result_stream_consumer.stats()
+        return {"success": True, "data": data}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
+
+@metrics.delete("")
+async def reset_metrics():
+    """Reset all collected metrics (useful between load-test runs); only with DEBUG_METRICS enabled"""
+    if not SETTINGS.debug_metrics:
+        # The API has no admin role: production counters must not be resettable by anyone
+        raise HTTPException(status_code=404, detail="Not found")
+    cosmos_metrics.reset()
+    prompt_registry.reset()
+    llm_gateway.reset()
+    return {"success": True, "data": {"reset": True}}
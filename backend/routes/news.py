@@ -1,13 +1,22 @@
 
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Query
+import time
+import uuid
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel
+from backend.service.job_service import job_manager
 from backend.service.news_service import fetch_and_process_news
+from backend.service.qa_service import create_question
 from backend.service.redis_article_service import redis_article_service
 from typing import Optional
 from datetime import datetime
 
 news = APIRouter(prefix="/api/news", tags=["News"])
 
+
+class PendingQARequest(BaseModel):
+    article_id: str  # Id of the published article
+
 @news.get("")
 async def get_news():
     """Fetch and process new articles from news sources"""
@@ -15,6 +24,12 @@ async def get_news():
     redis_article_service.save_pending_articles(news)
     return news
 
+@news.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_news_job():
+    """Fetch and process news in the background; a fetch already running is shared"""
+    job = await job_manager.submit("news_fetch", {})
+    return {"success": True, "data": job}
+
 @news.get("/pending")
 async def get_pending_articles(
     page: int = Query(1, ge=1, description="Page number"),
@@ -62,6 +77,25 @@ async def get_pending_articles(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get pending articles: {str(e)}")
     
+@news.post("/{id}/qa")
+async def save_pending_article_qa(id: str, request: PendingQARequest):
+    """Save the QA set written at ingestion (NEWS_INGEST_QA) for the published article - no LLM call"""
+    pending = redis_article_service.get_pending_article(id)
+    if not pending:
+        raise HTTPException(status_code=404, detail="Article not found")
+    if not (pending.get("qa") or {}).get("questions"):
+        raise HTTPException(status_code=404, detail="No QA set was generated for this article")
+    try:
+        qa = await create_question({
+            # Same id scheme the editor uses when saving a generated set
+            "id": f"qa_{request.article_id}_{int(time.time() * 1000)}_{uuid.uuid4().hex[:9]}",
+            "article_id": request.article_id,
+            "questions": [dict(q) for q in pending["qa"]["questions"]],
+        })
+        return {"success": True, "data": qa}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save QA set: {str(e)}")
+
 @news.delete("/{id}")
 async def delete_pending_article(id: str):
     print(f"🗑️ Backend: Received delete request for article ID: {id}")
@@ -1,6 +1,6 @@
 # routes/qa.py
 # Router xử lý các endpoint liên quan đến questions
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 from typing import List, Optional
 from pydantic import BaseModel
@@ -12,8 +12,10 @@ from backend.service.qa_service import (
     get_qa_by_id as service_get_qa_by_id,
     create_question as service_create_qa,
     update_qa as service_update_qa,
-    delete_qa as service_delete_qa
+    delete_qa as service_delete_qa,
+    dedupe_article_qas
 )
+from backend.service.qa_stats_service import get_qa_stats_service
 
 class question(BaseModel):
     question_id: Optional[str] = None
@@ -59,6 +61,18 @@ async def get_qa_by_id(qa_id: str):
             content={"success": False, "message": "Internal server error", "error": str(e)}
         )
 
+@qas.get("/{qa_id}/stats")
+async def get_qa_stats(qa_id: str):
+    try:
+        # Single point read of the aggregate kept up to date by the change feed processor
+        stats = await get_qa_stats_service(qa_id)
+        return {"success": True, "data": stats}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500, 
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
+
 @qas.post("/")
 async def create_qa(qa_data: qa_request):
     try:
@@ -112,6 +126,18 @@ async def get_qa_by_article_id(article_id: str):
             content={"success": False, "message": "Internal server error", "error": str(e)}
         )    
 
+@qas.post("/article/{article_id}/dedupe")
+async def dedupe_qas_by_article_id(article_id: str, dry_run: bool = Query(True, description="Only report duplicates, do not modify sets")):
+    try:
+        # Oldest set wins; later sets lose questions that repeat an earlier one
+        result = await dedupe_article_qas(article_id, dry_run=dry_run)
+        return {"success": True, "data": result}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500, 
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
+
 # @qas.post("/{qa_id}/grade")
 # async def grade(qa_id: str, qa: dict):
 #     try:
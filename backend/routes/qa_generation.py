@@ -4,11 +4,14 @@ Handles creation of QA tests from article content using AI
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
 from pydantic import BaseModel, Field 
 
+from backend.config.settings import SETTINGS
+from backend.routes.jobs import sse_event
 from backend.service.qa_generation_service import qa_generation_service
+from backend.service.qa_generation_job_service import get_generation_job, start_generation_job, start_qa_generation_job
 # from backend.utils import get_current_user
 # from backend.enum.roles import Role
 
@@ -19,7 +22,25 @@ class QAGenerationRequest(BaseModel):
     title: Optional[str] = Field(None, description="Article title")
     abstract: Optional[str] = Field(None, description="Article abstract/summary")
     content: Optional[str] = Field(None, description="Full article content")
-    num_questions: Optional[int] = Field(5, ge=3, le=10, description="Number of questions to generate (3-10)")
+    num_questions: Optional[int] = Field(5, ge=3, le=100, description="Number of questions to generate (3-100)")
+    bypass_cache: bool = Field(False, description="Regenerate with the LLM even if identical input was generated before")
+    sectioned: Optional[bool] = Field(None, description="Generate per article section and merge; default: only for long articles or many questions")
+
+class QAGenerationBatchArticle(BaseModel):
+    """One article of a batch; give the content, or only article_id to load it from the articles store"""
+    article_id: str = Field(..., description="Unique identifier for the article")
+    title: Optional[str] = None
+    abstract: Optional[str] = None
+    content: Optional[str] = None
+    num_questions: Optional[int] = Field(None, ge=3, le=100, description="Overrides the batch num_questions")
+
+class QAGenerationBatchRequest(BaseModel):
+    """Request model for batch QA generation"""
+    articles: List[QAGenerationBatchArticle] = Field(default_factory=list, description="Article payloads")
+    article_ids: List[str] = Field(default_factory=list, description="Articles to load by id")
+    num_questions: int = Field(5, ge=3, le=100, description="Number of questions per article (3-100)")
+    bypass_cache: bool = Field(False, description="Regenerate with the LLM even for previously generated input")
+    sectioned: Optional[bool] = Field(None, description="Generate per article section and merge; default: automatic")
 
 # Router setup
 qa_generation = APIRouter(prefix="/api/qa-generation", tags=["QA Generation"])
@@ -69,7 +90,9 @@ async def generate_qa_test(
             title=request.title or "",
             abstract=request.abstract or "",
             content=request.content or "",
-            num_questions=request.num_questions
+            num_questions=request.num_questions,
+            bypass_cache=request.bypass_cache,
+            sectioned=request.sectioned
         )
         
         if result.get('success'):
@@ -102,6 +125,93 @@ async def generate_qa_test(
                 "data": None
             }
         )
-        
-        
-        
\ No newline at end of file
+
+
+@qa_generation.post("/stream")
+async def stream_qa_test(request: QAGenerationRequest):
+    """
+    Generate a QA test as server-sent events
+
+    Emits a "question" event for each question as soon as it is generated,
+    then a "done" event with questions_count, method_used, tokens_used and
+    any warning (an "error" event if generation could not start).
+    """
+    if not any([request.title, request.abstract, request.content]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one of title, abstract, or content must be provided"
+        )
+
+    async def body():
+        try:
+            async for event in qa_generation_service.stream_qa_test(
+                article_id=request.article_id,
+                title=request.title or "",
+                abstract=request.abstract or "",
+                content=request.content or "",
+                num_questions=request.num_questions,
+                bypass_cache=request.bypass_cache,
+                sectioned=request.sectioned
+            ):
+                yield sse_event(event["event"], event["data"])
+        except Exception as e:
+            print(f"❌ QA Generation stream error: {e}")
+            yield sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@qa_generation.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_qa_generation_job(request: QAGenerationRequest):
+    """
+    Same as POST /api/qa-generation/ but returns a job immediately
+
+    Poll GET /api/jobs/{job_id} or subscribe to GET /api/jobs/{job_id}/events;
+    the completed job's result holds what the synchronous endpoint returns.
+    """
+    if not any([request.title, request.abstract, request.content]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one of title, abstract, or content must be provided"
+        )
+    article = request.dict(exclude={"num_questions", "bypass_cache"})
+    job = await start_qa_generation_job(article, request.num_questions, request.bypass_cache)
+    return {"success": True, "data": job}
+
+@qa_generation.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+async def generate_qa_batch(request: QAGenerationBatchRequest):
+    """
+    Schedule QA generation for many articles
+
+    Returns a job immediately; each generated set is saved as a new QA.
+    Poll GET /api/qa-generation/jobs/{job_id} for progress.
+    """
+    articles = [a.dict() for a in request.articles] + [{"article_id": article_id} for article_id in request.article_ids]
+    if not articles:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No articles or article_ids given")
+    if len(articles) > SETTINGS.qa_generation_batch_max_articles:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {SETTINGS.qa_generation_batch_max_articles} articles per batch"
+        )
+    try:
+        job = await start_generation_job(articles, request.num_questions, request.bypass_cache, request.sectioned)
+        print(f"🗂️ QA Generation batch job {job['id']} scheduled for {len(articles)} articles")
+        return {"success": True, "data": job}
+    except Exception as e:
+        print(f"❌ QA Generation batch API error: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"success": False, "error": f"Internal server error: {str(e)}", "data": None}
+        )
+
+@qa_generation.get("/jobs/{job_id}")
+async def get_qa_generation_job(job_id: str, include_items: bool = True):
+    """Progress of a batch job: done, failed, tokens used and per-article outcome"""
+    job = await get_generation_job(job_id, include_items)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return {"success": True, "data": job}
@@ -1,11 +1,15 @@
 
 
-from typing import List
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
-from backend.service.qa_result_service import create_qa_result_service, get_all_qa_results_by_user_and_qa_service, get_all_qa_results_by_user_service, get_all_qa_results_service, get_qa_result_by_id_service
+from backend.config.settings import SETTINGS
+from backend.repository.base import InvalidCursorError, ResultFilter
+from backend.service.qa_result_service import create_qa_result_service, create_qa_results_batch_service, get_all_qa_results_by_user_and_qa_service, get_all_qa_results_by_user_service, get_qa_result_by_id_service, list_qa_results_service
 
 
 class qa_result_request(BaseModel):
@@ -13,6 +17,9 @@ class qa_result_request(BaseModel):
     user_id: str
     qa: dict  # Changed from List[dict] to dict to match frontend structure
 
+class qa_result_batch_request(BaseModel):
+    attempts: List[qa_result_request]
+
 qas_result = APIRouter( prefix="/api/qas-results", tags=["QA-Results"])
 
 @qas_result.post("/")
@@ -30,17 +37,81 @@ async def submit_qa_result(qa_result_data: qa_result_request):
             content={"success": False, "message": "Internal server error", "error": str(e)}
         )
     
+@qas_result.post("/batch")
+async def submit_qa_results_batch(batch: qa_result_batch_request):
+    if len(batch.attempts) > SETTINGS.results_batch_max_attempts:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "message": f"At most {SETTINGS.results_batch_max_attempts} attempts per batch"}
+        )
+    try:
+        outcomes = await create_qa_results_batch_service([attempt.dict() for attempt in batch.attempts])
+        return {
+            "success": True,
+            "data": outcomes,
+            "submitted": sum(1 for o in outcomes if o["success"]),
+            "failed": sum(1 for o in outcomes if not o["success"])
+        }
+    except Exception as e:
+        return JSONResponse(
+            status_code=500, 
+            content={"success": False, "message": "Internal server error", "error": str(e)}
+        )
+
+def _as_stored_timestamp(value: Optional[datetime]) -> Optional[str]:
+    # created_at is stored as a naive UTC ISO string; compare in the same form
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
 @qas_result.get("/")
-async def get_all_qa_results():
+async def list_qa_results(
+    qa_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(None, description="Inclusive upper bound on created_at"),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    max_score: Optional[float] = Query(None, ge=0, le=100),
+    limit: int = Query(SETTINGS.results_page_default_size, ge=1, le=SETTINGS.results_page_max_size),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    compact: bool = Query(False, description="Only id, qa_id, user_id, score and created_at")
+):
+    """Newest-first page of results. The body is streamed item by item;
+    `next_cursor` (null on the last page) comes after `data`."""
+    filters = ResultFilter(
+        qa_id=qa_id,
+        user_id=user_id,
+        created_from=_as_stored_timestamp(created_from),
+        created_to=_as_stored_timestamp(created_to),
+        min_score=min_score,
+        max_score=max_score,
+    )
     try:
-        qa_results = await get_all_qa_results_service()
-        return {"success": True, "data": qa_results}
+        page = await list_qa_results_service(filters, limit, cursor, compact)
+        # Pull the first item before responding so query errors still produce a proper status code
+        first = await page.items.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except InvalidCursorError as e:
+        return JSONResponse(status_code=400, content={"success": False, "message": str(e)})
     except Exception as e:
         return JSONResponse(
             status_code=500, 
             content={"success": False, "message": "Internal server error", "error": str(e)}
         )
 
+    async def body():
+        yield '{"success":true,"data":['
+        if first is not None:
+            yield json.dumps(first, default=str)
+            async for item in page.items:
+                yield "," + json.dumps(item, default=str)
+        yield f'],"limit":{limit},"next_cursor":{json.dumps(page.next_cursor)}}}'
+
+    return StreamingResponse(body(), media_type="application/json")
+
 # @qas_result.get("/user/{user_id}")
 # async def get_all_qa_results_by_user(user_id: str):
 #     try:
@@ -63,9 +134,11 @@ async def get_all_qa_results_by_user_and_qa(user_id: str, qa_id: str):
         )     
 
 @qas_result.get("/{qa_result_id}")
-async def get_qa_result_by_id(qa_result_id: str):
+async def get_qa_result_by_id(qa_result_id: str, user_id: Optional[str] = None, qa_id: Optional[str] = None):
+    # user_id / qa_id are optional partition hints: with a user-partitioned
+    # results container they turn the lookup into a single point read
     try:
-        qa_result = await get_qa_result_by_id_service(qa_result_id)
+        qa_result = await get_qa_result_by_id_service(qa_result_id, user_id=user_id, qa_id=qa_id)
         if not qa_result:
             return JSONResponse(
                 status_code=404, 
@@ -0,0 +1,121 @@
+"""
+Backfill QA results into a user-partitioned container
+
+Copies every document from the legacy results container (partitioned on
+/id) into a container partitioned per COSMOS_RESULTS_PARTITION ("user" ->
+/user_id, "user_qa" -> hierarchical [/user_id, /qa_id]).
+
+The copy is resumable: after each page the query continuation token is
+written to a checkpoint file, and documents are upserted so a page that
+is replayed after a crash is harmless.
+
+Cut-over:
+    1. python -m backend.scripts.backfill_results_partition --source qa_results --target qa_results_by_user --create-target
+    2. point COSMOS_QA_RESULT at the target and set COSMOS_RESULTS_PARTITION
+    3. re-run step 1 to copy anything written to the source in between
+
+Usage:
+    python -m backend.scripts.backfill_results_partition --source OLD --target NEW [--checkpoint FILE] [--page-size 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from backend.config.settings import SETTINGS
+from backend.database.cosmos import (
+    DATABASE_NAME, RESULTS_PARTITION_MODES, create_client, validate_config, results_partition_key_definition
+)
+from backend.monitoring.cosmos_metrics import cosmos_metrics, track_call
+
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "_ts", "_lsn")
+
+
+def load_checkpoint(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"continuation": None, "copied": 0, "skipped": 0}
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # Write-then-rename so an interrupted write never corrupts the checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+async def backfill(source_name: str, target_name: str, mode: str, checkpoint_path: str,
+                   page_size: int, concurrency: int, create_target: bool):
+    validate_config()
+    client = create_client()
+    try:
+        database = client.get_database_client(DATABASE_NAME)
+        source = database.get_container_client(source_name)
+        if create_target:
+            target = await database.create_container_if_not_exists(
+                id=target_name, partition_key=results_partition_key_definition(mode)
+            )
+        else:
+            target = database.get_container_client(target_name)
+
+        checkpoint = load_checkpoint(checkpoint_path)
+        if checkpoint["continuation"]:
+            print(f"↩️ Resuming from checkpoint ({checkpoint['copied']} documents already copied)")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upsert(document):
+            async with semaphore:
+                body = {k: v for k, v in document.items() if k not in SYSTEM_PROPERTIES}
+                await track_call("backfill.upsert", target.upsert_item, body=body)
+
+        pager = source.query_items(query="SELECT * FROM c", max_item_count=page_size)
+        pages = pager.by_page(checkpoint["continuation"])
+        started = time.perf_counter()
+        async for page in pages:
+            documents = [doc async for doc in page]
+            # Documents without a user_id cannot be placed in a user partition
+            valid = [d for d in documents if d.get("user_id") and (mode != "user_qa" or d.get("qa_id"))]
+            await asyncio.gather(*(upsert(d) for d in valid))
+
+            checkpoint["copied"] += len(valid)
+            checkpoint["skipped"] += len(documents) - len(valid)
+            checkpoint["continuation"] = pages.continuation_token
+            save_checkpoint(checkpoint_path, checkpoint)
+            rate = checkpoint["copied"] / max(time.perf_counter() - started, 1e-6)
+            print(f"   📦 copied={checkpoint['copied']} skipped={checkpoint['skipped']} ({rate:.0f} docs/s)")
+
+            if not pages.continuation_token:
+                break
+
+        charge = cosmos_metrics.operations.get("backfill.upsert")
+        total_ru = charge.request_charge.sum if charge else 0.0
+        print(f"✅ Backfill complete: {checkpoint['copied']} copied, {checkpoint['skipped']} skipped, {total_ru:.0f} RU")
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill QA results into a user-partitioned container")
+    parser.add_argument("--source", required=True, help="Legacy results container (partitioned on /id)")
+    parser.add_argument("--target", required=True, help="New results container")
+    default_mode = SETTINGS.cosmos_results_partition if SETTINGS.cosmos_results_partition != "id" else "user"
+    parser.add_argument("--mode", default=default_mode, choices=[m for m in RESULTS_PARTITION_MODES if m != "id"])
+    parser.add_argument("--checkpoint", default="backfill_results_partition.checkpoint.json")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--create-target", action="store_true", help="Create the target container if it does not exist")
+    args = parser.parse_args()
+
+    asyncio.run(backfill(
+        args.source, args.target, args.mode, args.checkpoint,
+        args.page_size, args.concurrency, args.create_target
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: article content post-processing, per-call regex chain vs ContentProcessor
+
+Runs the original `_process_latex_in_content` (regexes compiled per call,
+two prints per math span) and `process_content` over long generated articles
+and reports throughput and what each does to the text:
+
+- prose fractions: "3/4 người dùng" written between two $$ blocks, which the
+  old $...$ pass treated as math and turned into \\frac
+- display blocks: $$...$$ spans still delimited by $$ in the output
+- unsafe markup left: <script>, <iframe>, on*= handlers and javascript: URLs
+
+Corpus, in order of preference:
+- --corpus DIR: every *.html / *.htm / *.md / *.txt file under DIR
+- --cosmos: `content` of the latest --limit documents in the articles container
+- otherwise synthetic generated articles (HTML and Markdown, math, code
+  blocks, links and some injected unsafe markup)
+
+Usage:
+    python -m backend.scripts.bench_content_processor [--corpus DIR | --cosmos] [--limit 200] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import re
+import time
+
+from backend.service.content_processor import process_content
+
+PROSE_FRACTION = "3/4 người dùng"
+_DISPLAY = re.compile(r"\$\$[^$]+\$\$")
+_UNSAFE = re.compile(r"<script|<iframe|\son\w+\s*=|javascript:", re.I)
+
+
+def legacy_process(content: str) -> str:
+    """ArticleGenerationService._process_latex_in_content before the shared processor"""
+    if not content or not isinstance(content, str):
+        return content
+
+    def convert_simple_to_latex(match):
+        math_content = match.group(1)
+        print(f"🔧 Processing math content: {math_content}")
+        math_content = re.sub(r'\(([^)]+)\)/\(([^)]+)\)', r'\\frac{\1}{\2}', math_content)
+        math_content = re.sub(r'(\d+)/(\d+)', r'\\frac{\1}{\2}', math_content)
+        math_content = math_content.replace('∫', '\\int')
+        math_content = math_content.replace('→', '\\to')
+        return match.group(0).replace(match.group(1), math_content)
+
+    content = re.sub(r'\$([^$]+)\$', convert_simple_to_latex, content)
+    content = re.sub(r'\$\$([^$]+)\$\$', convert_simple_to_latex, content)
+    return content
+
+
+SENTENCES = [
+    "Trí tuệ nhân tạo đang thay đổi cách các doanh nghiệp vận hành.",
+    f"Khảo sát cho thấy {PROSE_FRACTION} đã thử các công cụ mới.",
+    "Độ phức tạp là $O(n \\log n)$ và tỉ lệ lỗi khoảng $1/8$.",
+    "Giá gói cơ bản là $5 và gói nâng cao là $20 mỗi tháng.",
+    "Các kỹ sư dùng <strong>Kubernetes</strong> và <em>CI/CD</em> để triển khai.",
+    "Xem <a href=\"https://example.com/docs\" target=\"_blank\">tài liệu</a> để biết chi tiết.",
+]
+DISPLAY = ["$$\\int_0^1 x^2 dx = 1/3$$", "$$(a+b)/(c+d) → 0$$", "$$\\sum_{i=1}^{n} i = n(n+1)/2$$"]
+UNSAFE = [
+    "<script>fetch('/api')</script>",
+    "<img src=x onerror=\"alert(1)\">",
+    "<a href=\"javascript:alert(1)\">bấm</a>",
+    "<iframe src=\"https://evil.example\"></iframe>",
+]
+HTML_CODE = "<pre><code class=\"language-python\">ratio = hits / total  # 1/2 of $budget\nif a < b:\n    print(ratio)</code></pre>"
+MD_CODE = "```python\nratio = hits / total  # 1/2 of $budget\n```"
+
+
+def make_article(paragraphs: int, markdown: bool) -> str:
+    parts = []
+    for i in range(paragraphs):
+        if i % 6 == 0:
+            parts.append(f"## Phần {i // 6}" if markdown else f"<h2>Phần {i // 6}</h2>")
+        if i % 4 == 1:
+            parts.append(random.choice(DISPLAY))
+        if i % 9 == 4:
+            parts.append(MD_CODE if markdown else HTML_CODE)
+        if i % 15 == 7:
+            parts.append(random.choice(UNSAFE))
+        text = " ".join(random.choice(SENTENCES) for _ in range(random.randint(3, 6)))
+        parts.append(text if markdown else f"<p>{text}</p>")
+    return "\n\n".join(parts)
+
+
+def load_corpus_dir(directory: str) -> list:
+    documents = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith((".html", ".htm", ".md", ".txt")):
+                with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                    documents.append(f.read())
+    return documents
+
+
+async def load_cosmos(limit: int) -> list:
+    from backend.database.cosmos import close_cosmos, connect_cosmos, get_articles_container
+
+    await connect_cosmos()
+    try:
+        container = await get_articles_container()
+        query = f"SELECT TOP {int(limit)} c.content FROM c WHERE IS_STRING(c.content) ORDER BY c._ts DESC"
+        return [item["content"] async for item in container.query_items(query=query)]
+    finally:
+        await close_cosmos()
+
+
+def run(label: str, process, documents: list, rounds: int) -> list:
+    total_bytes = sum(len(d.encode()) for d in documents)
+    best = float("inf")
+    outputs = []
+    for _ in range(rounds):
+        # Both log to stdout; the cost of formatting the messages stays in the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            outputs = [process(d) for d in documents]
+            best = min(best, time.perf_counter() - started)
+    fractions = sum(o.count(PROSE_FRACTION) for o in outputs)
+    display = sum(len(_DISPLAY.findall(o)) for o in outputs)
+    unsafe = sum(len(_UNSAFE.findall(o)) for o in outputs)
+    print(f"   {label:<18} {total_bytes / best / 1e6:>8.1f} MB/s {best * 1000 / len(documents):>8.3f} ms/doc "
+          f"{fractions:>16,} {display:>14,} {unsafe:>12,}")
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directory of .html/.md/.txt articles")
+    parser.add_argument("--cosmos", action="store_true", help="Use article content from the configured Cosmos account")
+    parser.add_argument("--limit", type=int, default=200, help="Documents (Cosmos / synthetic)")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(42)
+    if args.corpus:
+        documents, source = load_corpus_dir(args.corpus), args.corpus
+    elif args.cosmos:
+        documents, source = asyncio.run(load_cosmos(args.limit)), "cosmos articles"
+    else:
+        documents = [make_article(random.randint(20, 120), markdown=i % 2 == 1) for i in range(args.limit)]
+        source = "synthetic"
+    if not documents:
+        print("❌ Corpus is empty")
+        return
+
+    print(f"📊 Post-processing {len(documents):,} articles ({source}, "
+          f"{sum(len(d) for d in documents) / len(documents):,.0f} chars avg)")
+    print(f"   {'':<18} {'throughput':>13} {'latency':>14} {'prose fractions':>16} {'$$ blocks':>14} {'unsafe left':>12}")
+    run("regex chain", legacy_process, documents, args.rounds)
+    run("process_content", process_content, documents, args.rounds)
+    print(f"   (source: {sum(d.count(PROSE_FRACTION) for d in documents):,} prose fractions, "
+          f"{sum(len(_DISPLAY.findall(d)) for d in documents):,} $$ blocks, "
+          f"{sum(len(_UNSAFE.findall(d)) for d in documents):,} unsafe)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark: QA grading throughput
+
+Compares the original per-submission loop (walk the QA document, compare
+each question's dict fields, build each row field by field) with grading
+against a compiled answer key, for quizzes of 100 questions.
+
+Usage:
+    python -m backend.scripts.bench_grading [--questions 100] [--submissions 20000]
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from backend.service.answer_key_service import CHOICES, build_result_rows, compile_answer_key, grade
+
+
+def make_qa(num_questions: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "_etag": '"bench"',
+        "questions": [
+            {
+                "question_id": str(uuid.uuid4()),
+                "question": f"Question {i} " + "lorem ipsum " * 10,
+                "answer_a": "Option A", "answer_b": "Option B",
+                "answer_c": "Option C", "answer_d": "Option D",
+                "correct_answer": random.choice(CHOICES),
+                "explanation": "Because " + "dolor sit amet " * 8,
+            }
+            for i in range(num_questions)
+        ],
+    }
+
+
+def make_submission(qa: dict) -> dict:
+    return {q["question_id"]: random.choice(CHOICES) for q in qa["questions"]}
+
+
+def legacy_grade(existing_qa: dict, qa: dict) -> dict:
+    """The grading loop previously inlined in create_qa_result_service"""
+    correct_answers = 0
+    questions = []
+    for q in existing_qa.get('questions', []):
+        if q.get('correct_answer') == qa.get(q.get('question_id')):
+            correct_answers += 1
+            is_correct = True
+        else:
+            is_correct = False
+        questions.append({
+            "question_id": q.get('question_id'),
+            "question": q.get('question'),
+            "answer_a": q.get('answer_a'),
+            "answer_b": q.get('answer_b'),
+            "answer_c": q.get('answer_c'),
+            "answer_d": q.get('answer_d'),
+            "correct_answer": q.get('correct_answer'),
+            "selected_answer": qa.get(q.get('question_id')),
+            "is_correct": is_correct,
+            "explanation": q.get('explanation', '')
+        })
+    return {"score": correct_answers / len(existing_qa.get('questions', [])) * 100, "questions": questions}
+
+
+def compiled_grade(key, qa: dict, with_rows: bool) -> dict:
+    graded = grade(key, qa)
+    if with_rows:
+        return {"score": graded.score, "questions": build_result_rows(key, qa, graded)}
+    return {"score": graded.score}
+
+
+def run(label: str, func, submissions) -> float:
+    start = time.perf_counter()
+    for submission in submissions:
+        func(submission)
+    elapsed = time.perf_counter() - start
+    rate = len(submissions) / elapsed
+    print(f"   {label:<34} {rate:>12,.0f} submissions/s  ({elapsed * 1e6 / len(submissions):.1f} µs each)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--submissions", type=int, default=20000)
+    args = parser.parse_args()
+
+    random.seed(42)
+    qa = make_qa(args.questions)
+    submissions = [make_submission(qa) for _ in range(args.submissions)]
+    key = compile_answer_key(qa)
+
+    # Sanity check: both paths agree on every score
+    for submission in submissions[:100]:
+        assert legacy_grade(qa, submission)["score"] == compiled_grade(key, submission, False)["score"]
+
+    print(f"📊 Grading {args.submissions:,} submissions of a {args.questions}-question quiz")
+    baseline = run("legacy loop (score + rows)", lambda s: legacy_grade(qa, s), submissions)
+    run("compiled key (score + rows)", lambda s: compiled_grade(key, s, True), submissions)
+    scored = run("compiled key (score only)", lambda s: compiled_grade(key, s, False), submissions)
+    print(f"   speed-up on scoring alone: {scored / baseline:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
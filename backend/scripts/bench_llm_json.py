@@ -0,0 +1,305 @@
+"""
+Benchmark and fuzz: LLM JSON extraction, regex cleanup chain vs parse_llm_json
+
+Renders responses shaped like the ones the services parse (generated
+articles with math and code, QA sets, article suggestions, news
+paraphrases) the way models actually write them: wrapped in code fences or
+prose, with trailing commas, raw newlines, single-backslash LaTeX and
+unescaped quotes. Each parser is scored on throughput, on how many responses
+parse at all and on how many parse to exactly the intended object (a
+response that happens to be valid JSON is intended as written):
+
+- json.loads: what QA generation and news paraphrasing used
+- regex chain: the LTXCMD placeholder + `_clean_json_response` chain article
+  generation used (placeholders restored in every string, which is more than
+  the original did)
+- parse_llm_json
+
+--fuzz N also feeds N random responses in random chunks through the stream
+parsers (JsonObjectStreamParser, JsonArrayStreamParser) and checks they decode
+the same values as parse_llm_json.
+
+Corpus, in order of preference:
+- --corpus DIR: every *.json / *.txt file under DIR, one raw completion per
+  file (no intended object, so only parse rates and throughput are reported)
+- otherwise --limit synthetic responses
+
+Usage:
+    python -m backend.scripts.bench_llm_json [--corpus DIR] [--limit 500] [--rounds 5] [--fuzz 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+
+from backend.service.json_stream import JsonArrayStreamParser, JsonObjectStreamParser
+from backend.service.llm_json import parse_llm_json
+
+_PLACEHOLDER = re.compile(r'LTXCMD_([a-zA-Z]+)')
+
+
+def legacy_parse(text: str):
+    """The chain ArticleGenerationService ran before parse_llm_json"""
+    content = re.sub(r'\\([a-zA-Z]+)', r'LTXCMD_\1', text)
+    start = content.find('{')
+    if start != -1:
+        content = content[start:]
+    end = content.rfind('}')
+    if end != -1:
+        content = content[:end + 1]
+    content = re.sub(r'^```json\s*', '', content)
+    content = re.sub(r'\s*```$', '', content)
+    content = re.sub(r'^```\s*', '', content)
+    cleaned = content.replace('\n', '').replace('\r', '').replace('\t', ' ')
+    cleaned = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned)
+    cleaned = cleaned.replace('\\n', ' ').replace('\\r', ' ').replace('\\t', ' ')
+    cleaned = re.sub(r'\\([a-zA-Z]+)', r'LTXCMD_\1', cleaned)
+    return _restore(json.loads(cleaned.strip()))
+
+
+def _restore(value):
+    if isinstance(value, str):
+        return _PLACEHOLDER.sub(r'\\\1', value)
+    if isinstance(value, list):
+        return [_restore(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _restore(v) for k, v in value.items()}
+    return value
+
+
+# Escapes followed by lowercase words ("\nsecond", "\tnote") must stay escapes, next to real \nabla, \theta, \times
+SENTENCES = [
+    "Trí tuệ nhân tạo đang thay đổi cách các doanh nghiệp vận hành.",
+    "Chi phí huấn luyện giảm 40% còn khoảng $2.5 triệu, theo báo cáo \"State of AI\" mới nhất.",
+    "Độ phức tạp là $O(n \\log n)$ và sai số giảm theo $\\frac{1}{\\sqrt{n}}$.",
+    "Hàm mất mát $\\mathcal{L} = -\\sum_i y_i \\log \\hat{y}_i$ được tối ưu bằng $\\nabla \\theta$.",
+    "Hệ số $\\beta$ và $\\rho$ được chọn sao cho $\\alpha \\times \\beta \\to 0$.",
+    "Các kỹ sư dùng <strong>Kubernetes</strong> và <em>CI/CD</em> để triển khai nhanh hơn.",
+    "Ký hiệu $\\underline{x}$ và $\\text{đơn vị}$ xuất hiện trong phụ lục.",
+    "Các bước:\nbước một là thu thập dữ liệu,\nthen train the model\tnote: batch size 32.",
+    "first line\nsecond line\nfinal thoughts\tb\rreturn value",
+]
+CODE = "<pre><code class=\"language-python\">def score(items):\n    total = sum(i[\"weight\"] for i in items)\n    return total / len(items)\n</code></pre>"
+
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    parts = []
+    for i in range(count):
+        if i and i % 4 == 0:
+            parts.append(f"<h3>Phần {i // 4}</h3>")
+        if i and i % 5 == 0:
+            parts.append(CODE)
+        parts.append("<p>" + " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 5))) + "</p>")
+    return "\n".join(parts)
+
+
+def make_article(rng: random.Random) -> dict:
+    return {
+        "title": "Học máy với $\\lambda$: từ lý thuyết đến thực tế",
+        "abstract": rng.choice(SENTENCES) + " " + rng.choice(SENTENCES),
+        "content": _paragraphs(rng, rng.randint(3, 25)),
+        "tags": rng.sample(["ai", "machine-learning", "math", "python", "cloud", "devops"], 3),
+    }
+
+
+def make_qa(rng: random.Random) -> dict:
+    return {"questions": [{
+        "question_id": f"q{i}",
+        "question": f"Câu {i + 1}: " + rng.choice(SENTENCES),
+        "answer_a": "$\\frac{1}{2}$", "answer_b": "$O(n \\log n)$", "answer_c": "\"Kubernetes\" cluster", "answer_d": "Không có",
+        "correct_answer": rng.choice(["answer_a", "answer_b", "answer_c", "answer_d"]),
+        "explanation": rng.choice(SENTENCES),
+    } for i in range(rng.randint(3, 10))]}
+
+
+def make_suggestions(rng: random.Random) -> dict:
+    return {"suggestions": [{
+        "title": f"Gợi ý {i + 1}: " + rng.choice(SENTENCES)[:40],
+        "description": rng.choice(SENTENCES),
+        "article_type": rng.choice(["informative", "tutorial", "opinion", "review", "news"]),
+        "estimated_length": rng.choice(["short", "medium", "long"]),
+        "target_audience": "Kỹ sư phần mềm",
+    } for i in range(5)]}
+
+
+def make_paraphrase(rng: random.Random) -> dict:
+    article = make_article(rng)
+    del article["tags"]
+    return article
+
+
+SHAPES = [make_article, make_qa, make_suggestions, make_paraphrase]
+
+
+def render(value, rng: random.Random, defects: set) -> str:
+    """value written the way a model writes it, with the given defects"""
+    if isinstance(value, dict):
+        items = [f"\"{k}\": {render(v, rng, defects)}" for k, v in value.items()]
+        return "{\n  " + ",\n  ".join(items) + (",\n" if "commas" in defects else "\n") + "}"
+    if isinstance(value, list):
+        items = [render(v, rng, defects) for v in value]
+        return "[" + ", ".join(items) + (", " if "commas" in defects else "") + "]"
+    if not isinstance(value, str):
+        return json.dumps(value)
+    out = []
+    for i, c in enumerate(value):
+        rest = value[i + 1:]
+        if c == "\\":
+            out.append("\\" if "latex" in defects and rest[:1].isalpha() else "\\\\")
+        elif c == '"':
+            follower = rest.lstrip()[:1]
+            out.append('"' if "quotes" in defects and follower and follower not in ",:}]" else '\\"')
+        elif c in "\n\r\t":
+            out.append(c if "newlines" in defects else json.dumps(c)[1:-1])
+        else:
+            out.append(c)
+    return '"' + "".join(out) + '"'
+
+
+def wrap(text: str, defects: set) -> str:
+    if "fence" in defects:
+        text = f"```json\n{text}\n```"
+    if "prose" in defects:
+        text = f"Dưới đây là kết quả {{theo yêu cầu}}:\n{text}\nHy vọng hữu ích!"
+    return text
+
+
+DEFECTS = ("fence", "prose", "commas", "newlines", "latex", "quotes")
+
+
+def as_read(value, rng: random.Random, defects: set):
+    """value as its rendering should decode: a rendering that is valid JSON is taken as written,
+    so single-backslash \\beta or \\frac in an otherwise valid document are JSON escapes"""
+    try:
+        return json.loads(render(value, rng, defects))
+    except ValueError:
+        return value
+
+
+def make_value(rng: random.Random):
+    value = rng.choice(SHAPES)(rng)
+    defects = {d for d in DEFECTS if rng.random() < 0.5}
+    return value, defects, wrap(render(value, rng, defects), defects)
+
+
+def make_case(rng: random.Random):
+    value, defects, text = make_value(rng)
+    return as_read(value, rng, defects), text
+
+
+def load_corpus_dir(directory: str) -> list:
+    documents = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith((".json", ".txt")):
+                with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                    documents.append(f.read())
+    return documents
+
+
+def run(label: str, parse, documents: list, expected: list, rounds: int):
+    total_bytes = sum(len(d.encode()) for d in documents)
+    best = float("inf")
+    results = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        results = []
+        for document in documents:
+            try:
+                results.append(parse(document))
+            except ValueError:
+                results.append(ValueError)
+        best = min(best, time.perf_counter() - started)
+    parsed = sum(1 for r in results if r is not ValueError)
+    exact = f"{sum(1 for r, e in zip(results, expected) if r == e):>8,}" if expected else f"{'-':>8}"
+    print(f"   {label:<16} {total_bytes / best / 1e6:>8.1f} MB/s {best * 1000 / len(documents):>8.3f} ms/doc "
+          f"{parsed:>8,} {exact}")
+
+
+def stream_values(text: str, expected: dict, rng: random.Random):
+    """Values the stream parser decodes from text fed in random chunks"""
+    chunks, i = [], 0
+    while i < len(text):
+        size = rng.randint(1, 12)
+        chunks.append(text[i:i + size])
+        i += size
+    if "questions" in expected:
+        parser, items = JsonArrayStreamParser(), []
+        for chunk in chunks:
+            items.extend(parser.feed(chunk))
+        return {"questions": items} if parser.complete else None
+    parser, fields = JsonObjectStreamParser(), {}
+    for chunk in chunks:
+        for kind, field, value in parser.feed(chunk):
+            if kind == "value":
+                fields[field] = value
+    return fields if parser.complete else None
+
+
+def mismatches(rng: random.Random) -> tuple:
+    """One random response; returns (text, names of the parsers that did not decode it as intended)"""
+    value, defects, text = make_value(rng)
+    failed = []
+    try:
+        result = parse_llm_json(text)
+    except ValueError:
+        result = ValueError
+    if result != as_read(value, rng, defects):
+        failed.append("parse_llm_json")
+    # Each streamed question object is decoded on its own; streamed string fields always get the repairs
+    if "questions" in value:
+        streamed = {"questions": [as_read(q, rng, defects) for q in value["questions"]]}
+    else:
+        streamed = {k: v if isinstance(v, str) else as_read(v, rng, defects) for k, v in value.items()}
+    if stream_values(text, value, rng) != streamed:
+        failed.append("stream")
+    return text, failed
+
+
+def fuzz(cases: int, rng: random.Random):
+    failures = {"parse_llm_json": 0, "stream": 0}
+    for n in range(cases):
+        text, failed = mismatches(rng)
+        for name in failed:
+            failures[name] += 1
+            if failures[name] <= 3:
+                print(f"   ❌ case {n}: {name} mismatch\n{text[:300]}")
+    status = "✅" if not any(failures.values()) else "❌"
+    print(f"{status} Fuzz: {cases:,} responses, mismatches {failures}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directory of raw model completions (.json/.txt)")
+    parser.add_argument("--limit", type=int, default=500, help="Synthetic responses")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--fuzz", type=int, default=0, help="Random responses to check, including chunked stream parsing")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.corpus:
+        documents, expected, source = load_corpus_dir(args.corpus), [], args.corpus
+    else:
+        cases = [make_case(rng) for _ in range(args.limit)]
+        documents, expected, source = [c[1] for c in cases], [c[0] for c in cases], "synthetic"
+    if not documents:
+        print("❌ Corpus is empty")
+        return
+
+    print(f"📊 Parsing {len(documents):,} responses ({source}, "
+          f"{sum(len(d) for d in documents) / len(documents):,.0f} chars avg)")
+    print(f"   {'':<16} {'throughput':>13} {'latency':>14} {'parsed':>8} {'exact':>8}")
+    run("json.loads", json.loads, documents, expected, args.rounds)
+    run("regex chain", legacy_parse, documents, expected, args.rounds)
+    run("parse_llm_json", parse_llm_json, documents, expected, args.rounds)
+
+    if args.fuzz:
+        fuzz(args.fuzz, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Storage / write-cost comparison: legacy vs compact result documents
+
+For quizzes of several sizes, builds the result document the legacy schema
+stored (full question rows) and the compact one, and reports:
+- serialized size in bytes (storage, and the main driver of write RU)
+- indexed leaf values (Cosmos indexes every path by default; each one adds
+  to the write charge)
+
+With --cosmos the documents are also written to and deleted from the
+configured results container, and the request charge Cosmos reports for
+each create is printed.
+
+Usage:
+    python -m backend.scripts.bench_result_size [--sizes 5,10,20,50,100] [--cosmos]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from datetime import datetime
+
+from backend.scripts.bench_grading import make_qa, make_submission
+from backend.service.answer_key_service import build_result_rows, compact_result_fields, compile_answer_key, grade
+
+
+def build_documents(num_questions: int):
+    qa = make_qa(num_questions)
+    key = compile_answer_key(qa)
+    submission = make_submission(qa)
+    graded = grade(key, submission)
+    base = {
+        "qa_id": qa["id"],
+        "user_id": "bench-user",
+        "score": graded.score,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    legacy = {"id": str(uuid.uuid4()), **base, "questions": build_result_rows(key, submission, graded)}
+    compact = {"id": str(uuid.uuid4()), **base, **compact_result_fields(key, graded)}
+    return legacy, compact
+
+
+def size(document: dict) -> int:
+    return len(json.dumps(document, separators=(",", ":")).encode())
+
+
+def indexed_values(value) -> int:
+    if isinstance(value, dict):
+        return sum(indexed_values(v) for v in value.values())
+    if isinstance(value, list):
+        return sum(indexed_values(v) for v in value)
+    return 1
+
+
+async def measure_cosmos(documents) -> list:
+    """Create then delete each document; return the create request charge of each"""
+    from backend.database.cosmos import close_cosmos, connect_cosmos, get_qas_result_container
+    from backend.repository.cosmos_backend import CosmosQAResultRepository
+    from backend.monitoring.cosmos_metrics import ResponseCost
+
+    await connect_cosmos()
+    try:
+        container = await get_qas_result_container()
+        repository = CosmosQAResultRepository()
+        charges = []
+        for document in documents:
+            cost = ResponseCost()
+            await container.create_item(body=document, response_hook=cost)
+            charges.append(cost.request_charge)
+            await container.delete_item(
+                item=document["id"],
+                partition_key=repository._point_partition_key(document["id"], document["user_id"], document["qa_id"])
+            )
+        return charges
+    finally:
+        await close_cosmos()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="5,10,20,50,100", help="Comma-separated question counts")
+    parser.add_argument("--cosmos", action="store_true", help="Also measure write RU against the configured account")
+    args = parser.parse_args()
+
+    random.seed(42)
+    sizes = [int(s) for s in args.sizes.split(",")]
+    pairs = [build_documents(n) for n in sizes]
+
+    charges = None
+    if args.cosmos:
+        charges = asyncio.run(measure_cosmos([doc for pair in pairs for doc in pair]))
+
+    print("📊 Result document size, legacy vs compact")
+    header = f"   {'questions':>9} {'legacy B':>10} {'compact B':>10} {'smaller':>8} {'legacy idx':>10} {'compact idx':>11}"
+    if charges:
+        header += f" {'legacy RU':>10} {'compact RU':>10}"
+    print(header)
+    for i, (n, (legacy, compact)) in enumerate(zip(sizes, pairs)):
+        line = (f"   {n:>9} {size(legacy):>10,} {size(compact):>10,} "
+                f"{(1 - size(compact) / size(legacy)) * 100:>7.0f}% "
+                f"{indexed_values(legacy):>10} {indexed_values(compact):>11}")
+        if charges:
+            line += f" {charges[2 * i]:>10.2f} {charges[2 * i + 1]:>10.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
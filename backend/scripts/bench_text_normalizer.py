@@ -0,0 +1,136 @@
+"""
+Benchmark: LLM input normalization, regex chain vs single-pass normalizer
+
+Runs the original three-regex `_clean_text_for_qa` chain and
+`normalize_text` over a corpus of translated article HTML and reports
+throughput and what each keeps: technical characters ($ % / + = # &),
+entity residue (encoded or reduced to a bare name) and paragraph breaks.
+
+Corpus, in order of preference:
+- --corpus DIR: every *.html / *.htm / *.txt file under DIR
+- --cosmos: `content` of the latest --limit documents in the articles container
+- otherwise synthetic documents shaped like the news paraphrasing output
+  (<p>/<h3>/<strong>/<a>, math spans, code blocks, entities, Vietnamese text)
+
+Usage:
+    python -m backend.scripts.bench_text_normalizer [--corpus DIR | --cosmos] [--limit 500] [--max-length 8000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import time
+
+from backend.service.text_normalizer import PARAGRAPH_BREAK, normalize_text
+
+TECHNICAL_CHARS = "$%/+=#&"
+# Entities left encoded, or reduced to their bare name by character stripping ("&amp;" -> "amp")
+_ENTITY = re.compile(r"&#?\w+;|\b(?:amp|nbsp|ndash|mdash|quot|hellip|[lr][sd]quo)\b")
+
+
+def legacy_clean(text: str, max_length: int) -> str:
+    """The chain QAGenerationService._clean_text_for_qa ran before the shared normalizer"""
+    if not text:
+        return ""
+    clean_text = re.sub(r'<[^>]+>', ' ', text)
+    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+    clean_text = re.sub(r'[^\w\s.,!?;:()\-\'\"]+', ' ', clean_text)
+    return clean_text[:max_length]
+
+
+SENTENCES = [
+    "Trí tuệ nhân tạo đang thay đổi cách các doanh nghiệp vận hành &amp; ra quyết định.",
+    "Theo báo cáo, chi phí đào tạo mô hình đã giảm 40% trong năm 2024, còn khoảng $2.5 triệu.",
+    "Các kỹ sư sử dụng <strong>Kubernetes</strong> và <em>CI/CD</em> để triển khai nhanh hơn.",
+    "Công thức <span class='math-inline'>$E = mc^2$</span> vẫn được nhắc đến trong bài viết.",
+    "Tốc độ tăng trưởng đạt 3/4 mục tiêu &ndash; cao hơn dự kiến &#8220;đáng kể&#8221;.",
+    "Xem thêm tại <a href='https://example.com/a/b?x=1&amp;y=2'>trang nguồn</a> để biết chi tiết.",
+    "Mã nguồn mở giúp cộng đồng đóng góp #hashtag và sửa lỗi nhanh&nbsp;chóng.",
+]
+
+
+def make_document(paragraphs: int) -> str:
+    parts = []
+    for i in range(paragraphs):
+        if i and i % 5 == 0:
+            parts.append(f"<h3>Phần {i // 5}: Phân tích chi tiết</h3>")
+        if i and i % 9 == 0:
+            parts.append("<pre class='language-python'><code>total = price * 1.1 + fee / 2  # VAT</code></pre>")
+        parts.append("<p>" + " ".join(random.choice(SENTENCES) for _ in range(random.randint(3, 7))) + "</p>")
+    parts.append("<p><strong>Nguồn:</strong> <a href=\"https://example.com\" target=\"_blank\">Example News</a></p>")
+    return "\n".join(parts)
+
+
+def load_corpus_dir(directory: str) -> list:
+    documents = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith((".html", ".htm", ".txt")):
+                with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                    documents.append(f.read())
+    return documents
+
+
+async def load_cosmos(limit: int) -> list:
+    from backend.database.cosmos import close_cosmos, connect_cosmos, get_articles_container
+
+    await connect_cosmos()
+    try:
+        container = await get_articles_container()
+        query = f"SELECT TOP {int(limit)} c.content FROM c WHERE IS_STRING(c.content) ORDER BY c._ts DESC"
+        return [item["content"] async for item in container.query_items(query=query)]
+    finally:
+        await close_cosmos()
+
+
+def run(label: str, clean, documents: list, rounds: int) -> list:
+    total_bytes = sum(len(d.encode()) for d in documents)
+    best = float("inf")
+    outputs = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        outputs = [clean(d) for d in documents]
+        best = min(best, time.perf_counter() - started)
+    kept = sum(sum(o.count(c) for c in TECHNICAL_CHARS) for o in outputs)
+    entities = sum(len(_ENTITY.findall(o)) for o in outputs)
+    paragraphs = sum(o.count(PARAGRAPH_BREAK) + 1 for o in outputs if o)
+    print(f"   {label:<26} {total_bytes / best / 1e6:>8.1f} MB/s {best * 1000 / len(documents):>8.3f} ms/doc "
+          f"{kept:>10,} {entities:>14,} {paragraphs:>10,}")
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directory of .html/.txt documents")
+    parser.add_argument("--cosmos", action="store_true", help="Use article content from the configured Cosmos account")
+    parser.add_argument("--limit", type=int, default=500, help="Documents (Cosmos / synthetic)")
+    parser.add_argument("--max-length", type=int, default=8000, help="Truncation length passed to both cleaners")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(42)
+    if args.corpus:
+        documents, source = load_corpus_dir(args.corpus), args.corpus
+    elif args.cosmos:
+        documents, source = asyncio.run(load_cosmos(args.limit)), "cosmos articles"
+    else:
+        documents, source = [make_document(random.randint(5, 60)) for _ in range(args.limit)], "synthetic"
+    if not documents:
+        print("❌ Corpus is empty")
+        return
+
+    source_technical = sum(sum(d.count(c) for c in TECHNICAL_CHARS) for d in documents)
+    print(f"📊 Normalizing {len(documents):,} documents ({source}, "
+          f"{sum(len(d) for d in documents) / len(documents):,.0f} chars avg), max_length={args.max_length}")
+    print(f"   {'':<26} {'throughput':>13} {'latency':>14} {'$%/+=#& kept':>10} {'entity residue':>14} {'paragraphs':>10}")
+    run("regex chain", lambda d: legacy_clean(d, args.max_length), documents, args.rounds)
+    run("normalize_text", lambda d: normalize_text(d, args.max_length), documents, args.rounds)
+    run("regex chain (no limit)", lambda d: legacy_clean(d, 10 ** 9), documents, args.rounds)
+    run("normalize_text (no limit)", normalize_text, documents, args.rounds)
+    print(f"   ($%/+=#& in source markup and text: {source_technical:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Rewrite legacy QA results into the compact schema
+
+Legacy result documents embed every question, all four answers and the
+explanation. This rewrites them in place as compact documents (QA version,
+question ids, one character per question for selection and correctness),
+the format new results are written in when RESULTS_COMPACT_SCHEMA is on.
+
+The run is resumable: the listing cursor is saved to a checkpoint file
+after each page, and already-compact documents are skipped.
+
+Rewritten documents carry `compacted_at`, which the QA stats processor uses
+to ignore them when they reappear on the Cosmos change feed. Run this once
+the stats processor has caught up with existing results.
+
+Usage:
+    python -m backend.scripts.compact_results [--dry-run] [--checkpoint FILE] [--page-size 200]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from backend.repository.base import ResultFilter
+from backend.repository.factory import close_repositories, get_qa_result_repository, init_repositories
+from backend.scripts.backfill_results_partition import load_checkpoint, save_checkpoint
+from backend.service.answer_key_service import compact_legacy_result, get_answer_key, is_compact_result
+
+
+def document_size(document: dict) -> int:
+    return len(json.dumps(document, separators=(",", ":")).encode())
+
+
+async def compact(checkpoint_path: str, page_size: int, concurrency: int, dry_run: bool):
+    await init_repositories()
+    try:
+        results = get_qa_result_repository()
+        checkpoint = load_checkpoint(checkpoint_path)
+        checkpoint.setdefault("bytes_before", 0)
+        checkpoint.setdefault("bytes_after", 0)
+        if checkpoint["continuation"]:
+            print(f"↩️ Resuming from checkpoint ({checkpoint['copied']} documents already compacted)")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def rewrite(document):
+            async with semaphore:
+                await results.replace(document)
+
+        started = time.perf_counter()
+        while True:
+            page = await results.find_page(ResultFilter(), page_size, checkpoint["continuation"], compact=False)
+            legacy = [doc async for doc in page.items if not is_compact_result(doc) and doc.get("questions")]
+
+            rewritten = []
+            for document in legacy:
+                key = await get_answer_key(document.get("qa_id")) if document.get("qa_id") else None
+                compacted = compact_legacy_result(document, key)
+                compacted["compacted_at"] = datetime.utcnow().isoformat()
+                checkpoint["bytes_before"] += document_size(document)
+                checkpoint["bytes_after"] += document_size(compacted)
+                rewritten.append(compacted)
+            if not dry_run:
+                await asyncio.gather(*(rewrite(d) for d in rewritten))
+
+            checkpoint["copied"] += len(rewritten)
+            checkpoint["continuation"] = page.next_cursor
+            if not dry_run:
+                save_checkpoint(checkpoint_path, checkpoint)
+            rate = checkpoint["copied"] / max(time.perf_counter() - started, 1e-6)
+            print(f"   📦 compacted={checkpoint['copied']} ({rate:.0f} docs/s)")
+
+            if not page.next_cursor:
+                break
+
+        before, after = checkpoint["bytes_before"], checkpoint["bytes_after"]
+        saved = (1 - after / before) * 100 if before else 0.0
+        verb = "Would compact" if dry_run else "Compacted"
+        print(f"✅ {verb} {checkpoint['copied']} results: {before} -> {after} bytes ({saved:.0f}% smaller)")
+    finally:
+        await close_repositories()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite legacy QA results into the compact schema")
+    parser.add_argument("--checkpoint", default="compact_results.checkpoint.json")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--dry-run", action="store_true", help="Report the size reduction without writing")
+    args = parser.parse_args()
+    asyncio.run(compact(args.checkpoint, args.page_size, args.concurrency, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
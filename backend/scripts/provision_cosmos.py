@@ -0,0 +1,25 @@
+"""
+Provision Cosmos DB resources
+
+Creates the database and QA / QA result containers if they do not exist.
+Run once per environment (e.g. from the deployment pipeline) so that API
+processes can start with COSMOS_FAST_START=true and skip control-plane calls.
+
+Usage:
+    python -m backend.scripts.provision_cosmos
+"""
+
+import asyncio
+
+from backend.database.cosmos import close_cosmos, provision_cosmos
+
+
+async def main():
+    try:
+        await provision_cosmos()
+    finally:
+        await close_cosmos()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+Rebuild the Redis leaderboards from stored QA results
+
+Streams every result from the configured repository backend in batches
+(the same feed the QA stats processor reads), builds fresh sorted sets
+under a staging prefix and then swaps them in, so the live leaderboards
+stay readable for the whole run.
+
+Results submitted while the rebuild runs are written to the live sets and
+may be lost by the swap; re-run the command, or run it during a quiet
+period, if that matters.
+
+Usage:
+    python -m backend.scripts.rebuild_leaderboards [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from backend.config.settings import SETTINGS
+from backend.database.redis_async import close_redis
+from backend.repository.factory import close_repositories, get_qa_result_repository, init_repositories
+from backend.service.leaderboard_service import KEY_PREFIX, leaderboard_service
+
+
+async def rebuild(batch_size: int):
+    if not SETTINGS.redis_url:
+        raise SystemExit("❌ REDIS_URL is not configured")
+    staging_prefix = f"{KEY_PREFIX}:rebuild:{uuid.uuid4().hex[:8]}"
+    await init_repositories()
+    try:
+        results = get_qa_result_repository()
+        qa_ids = set()
+        processed = 0
+        continuation = None
+        started = time.perf_counter()
+        while True:
+            batch, continuation = await results.read_changes(continuation, batch_size)
+            if not batch:
+                break
+            await leaderboard_service.record_scores(batch, prefix=staging_prefix)
+            qa_ids.update(r["qa_id"] for r in batch if r.get("qa_id") and r.get("user_id"))
+            processed += len(batch)
+            rate = processed / max(time.perf_counter() - started, 1e-6)
+            print(f"   📦 processed={processed} qa_sets={len(qa_ids)} ({rate:.0f} results/s)")
+
+        await leaderboard_service.swap_in(staging_prefix, qa_ids)
+        print(f"✅ Leaderboards rebuilt from {processed} results across {len(qa_ids)} QA sets")
+    finally:
+        await close_redis()
+        await close_repositories()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the Redis leaderboards from stored QA results")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Compiled answer keys for QA grading
+
+A QA set is compiled once into a compact answer key:
+- `index`: question_id -> position
+- `correct`: one byte per question holding the correct choice code (0-3)
+- `rows`: the display fields shown with a graded result
+
+Keys are cached per QA id (LRU + TTL). Every update or delete bumps a
+generation counter in Redis, and a cached key is only reused while its
+generation is still current, so an edit on one worker is seen by all of them
+on the next submission. Without Redis the QA is re-read and the key reused
+only while its `_etag`/`updated_at` is unchanged. Grading costs one dict
+lookup per answer and a single C-level comparison of two byte strings.
+
+Result documents use a compact schema (`schema_version` 2): the QA version
+plus one character per question for the selection and for correctness.
+Question text is hydrated from the compiled key when a result is read.
+"""
+
+import operator
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config.settings import SETTINGS
+from backend.database.redis_async import get_redis
+from backend.repository.qa_repo import find_by_id
+
+CHOICES = ("answer_a", "answer_b", "answer_c", "answer_d")
+NO_ANSWER = 255
+
+# A selection is correct only when it equals the stored correct_answer exactly
+CHOICE_CODES: Dict[str, int] = {choice: code for code, choice in enumerate(CHOICES)}
+
+# Compact result encoding: one character per question
+SELECTION_LETTERS = "ABCD"
+UNANSWERED = "-"
+COMPACT_SCHEMA_VERSION = 2
+
+ROW_FIELDS = ("question_id", "question", "answer_a", "answer_b", "answer_c", "answer_d", "correct_answer")
+
+
+@dataclass(frozen=True)
+class CompiledAnswerKey:
+    qa_id: str
+    version: Optional[str]
+    question_ids: Tuple[str, ...]
+    index: Dict[str, int]
+    correct: bytes
+    rows: Tuple[Dict[str, Any], ...]
+    compiled_at: float
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.question_ids)
+
+
+@dataclass(frozen=True)
+class GradeResult:
+    selected: bytes
+    is_correct: Tuple[bool, ...]
+    correct_count: int
+    score: float
+
+
+def choice_code(answer: Any) -> int:
+    if not isinstance(answer, str):
+        return NO_ANSWER
+    return CHOICE_CODES.get(answer, NO_ANSWER)
+
+
+def compile_answer_key(qa: Dict[str, Any]) -> CompiledAnswerKey:
+    questions = qa.get("questions", [])
+    question_ids = tuple(q.get("question_id") for q in questions)
+    rows = []
+    for q in questions:
+        row = {field: q.get(field) for field in ROW_FIELDS}
+        row["explanation"] = q.get("explanation", "")
+        rows.append(row)
+    return CompiledAnswerKey(
+        qa_id=qa.get("id"),
+        version=qa.get("_etag") or qa.get("updated_at"),
+        question_ids=question_ids,
+        index={qid: i for i, qid in enumerate(question_ids)},
+        correct=bytes(choice_code(q.get("correct_answer")) for q in questions),
+        rows=tuple(rows),
+        compiled_at=time.monotonic(),
+    )
+
+
+def encode_answers(key: CompiledAnswerKey, answers: Dict[str, Any]) -> bytes:
+    """Map a {question_id: answer} submission onto the key's question order"""
+    selected = bytearray(b"\xff" * key.total_questions)
+    index = key.index
+    for question_id, answer in answers.items():
+        position = index.get(question_id)
+        if position is not None:
+            selected[position] = choice_code(answer)
+    return bytes(selected)
+
+
+def grade(key: CompiledAnswerKey, answers: Dict[str, Any]) -> GradeResult:
+    selected = encode_answers(key, answers)
+    # One element-wise comparison over the two byte arrays
+    is_correct = tuple(map(operator.eq, selected, key.correct))
+    # A question whose stored correct answer is invalid can never be answered correctly
+    if NO_ANSWER in key.correct:
+        is_correct = tuple(c and code != NO_ANSWER for c, code in zip(is_correct, key.correct))
+    correct_count = sum(is_correct)
+    total = key.total_questions
+    score = correct_count / total * 100 if total else 0.0
+    return GradeResult(selected=selected, is_correct=is_correct, correct_count=correct_count, score=score)
+
+
+def build_result_rows(key: CompiledAnswerKey, answers: Dict[str, Any], graded: GradeResult) -> list:
+    """Full per-question rows returned right after grading (and stored by the legacy schema)"""
+    return [
+        {**row, "selected_answer": answers.get(row["question_id"]), "is_correct": correct}
+        for row, correct in zip(key.rows, graded.is_correct)
+    ]
+
+
+def compact_result_fields(key: CompiledAnswerKey, graded: GradeResult) -> Dict[str, Any]:
+    """Fields that replace the per-question rows in a compact result document.
+
+    `question_ids` keeps hydration and per-question stats correct if the QA
+    is edited after the attempt.
+    """
+    return {
+        "schema_version": COMPACT_SCHEMA_VERSION,
+        "qa_version": key.version,
+        "question_ids": list(key.question_ids),
+        "selected": "".join(SELECTION_LETTERS[c] if c < len(SELECTION_LETTERS) else UNANSWERED
+                            for c in graded.selected),
+        "correct": "".join("1" if c else "0" for c in graded.is_correct),
+    }
+
+
+def compact_legacy_result(qa_result: Dict[str, Any], key: Optional[CompiledAnswerKey]) -> Dict[str, Any]:
+    """Convert a legacy result (full per-question rows) to the compact schema.
+
+    The QA version is only recorded when the stored rows still match the
+    current QA text; otherwise it is unknown and the result reads as changed.
+    """
+    rows = qa_result.get("questions") or []
+    compact = {k: v for k, v in qa_result.items() if k != "questions"}
+    same_text = key is not None and len(rows) == len(key.rows) and all(
+        {f: row.get(f) for f in ROW_FIELDS} == {f: current.get(f) for f in ROW_FIELDS}
+        for row, current in zip(rows, key.rows)
+    )
+    codes = [choice_code(row.get("selected_answer")) for row in rows]
+    compact.update({
+        "schema_version": COMPACT_SCHEMA_VERSION,
+        "qa_version": key.version if same_text else None,
+        "question_ids": [row.get("question_id") for row in rows],
+        "selected": "".join(SELECTION_LETTERS[c] if c < len(SELECTION_LETTERS) else UNANSWERED for c in codes),
+        "correct": "".join("1" if row.get("is_correct") else "0" for row in rows),
+    })
+    return compact
+
+
+def is_compact_result(qa_result: Dict[str, Any]) -> bool:
+    return qa_result.get("schema_version") == COMPACT_SCHEMA_VERSION
+
+
+def result_correctness(qa_result: Dict[str, Any]) -> list:
+    """(question_id, is_correct) pairs for either result schema"""
+    if is_compact_result(qa_result):
+        return list(zip(qa_result.get("question_ids") or [], (c == "1" for c in qa_result.get("correct") or "")))
+    return [(row.get("question_id"), bool(row.get("is_correct"))) for row in qa_result.get("questions") or []]
+
+
+def hydrate_result_rows(key: Optional[CompiledAnswerKey], qa_result: Dict[str, Any]) -> list:
+    """Rebuild the full per-question rows of a compact result from the QA's compiled key.
+
+    Questions no longer present in the QA keep only their id, selection and
+    correctness.
+    """
+    selected = qa_result.get("selected") or ""
+    rows = []
+    for position, (question_id, correct) in enumerate(result_correctness(qa_result)):
+        index = key.index.get(question_id) if key else None
+        row = dict(key.rows[index]) if index is not None else {"question_id": question_id}
+        letter = selected[position] if position < len(selected) else UNANSWERED
+        # Same value grading returned ("answer_b"), so the compact schema is invisible to clients
+        row["selected_answer"] = CHOICES[SELECTION_LETTERS.index(letter)] if letter in SELECTION_LETTERS else None
+        row["is_correct"] = correct
+        rows.append(row)
+    return rows
+
+
+GENERATION_KEY_PREFIX = "answer_key:gen"
+
+
+def generation_key(qa_id: str) -> str:
+    return f"{GENERATION_KEY_PREFIX}:{qa_id}"
+
+
+class AnswerKeyCache:
+    """Process-local LRU of compiled keys, each tagged with the QA generation it was compiled at"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[CompiledAnswerKey, Optional[int]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, qa_id: str, generation: Optional[int] = None) -> Optional[CompiledAnswerKey]:
+        entry = self._entries.get(qa_id)
+        if entry is None:
+            return None
+        key, compiled_generation = entry
+        if compiled_generation != generation or time.monotonic() - key.compiled_at > self.ttl_seconds:
+            return None
+        self._entries.move_to_end(qa_id)
+        return key
+
+    def put(self, key: CompiledAnswerKey, generation: Optional[int] = None):
+        self._entries[key.qa_id] = (key, generation)
+        self._entries.move_to_end(key.qa_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, qa_id: str):
+        self._entries.pop(qa_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+answer_key_cache = AnswerKeyCache(
+    max_entries=SETTINGS.answer_key_cache_size,
+    ttl_seconds=SETTINGS.answer_key_cache_ttl_seconds,
+)
+
+
+async def _current_generation(qa_id: str) -> Optional[int]:
+    """The QA's generation counter in Redis; None when Redis is not configured or unreachable"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return int(await client.get(generation_key(qa_id)) or 0)
+    except Exception as e:
+        print(f"❌ Failed to read answer key generation for {qa_id}: {e}")
+        return None
+
+
+async def get_answer_key(qa_id: str) -> Optional[CompiledAnswerKey]:
+    """Return the compiled key for a QA, loading and compiling it on a cache miss"""
+    # Read the generation before the QA: an edit in between only costs a recompile later
+    generation = await _current_generation(qa_id)
+    if generation is not None:
+        key = answer_key_cache.get(qa_id, generation)
+        if key is not None:
+            answer_key_cache.hits += 1
+            return key
+
+    qa = await find_by_id(qa_id)
+    if not qa:
+        answer_key_cache.invalidate(qa_id)
+        return None
+    if generation is None:
+        # No shared generation: reuse the compiled key only while the QA version is unchanged
+        key = answer_key_cache.get(qa_id)
+        if key is not None and key.version is not None and key.version == (qa.get("_etag") or qa.get("updated_at")):
+            answer_key_cache.hits += 1
+            return key
+    answer_key_cache.misses += 1
+    key = compile_answer_key(qa)
+    answer_key_cache.put(key, generation)
+    return key
+
+
+async def invalidate_answer_key(qa_id: str):
+    """Drop the local key and bump the QA's generation so every worker recompiles it"""
+    answer_key_cache.invalidate(qa_id)
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.incr(generation_key(qa_id))
+    except Exception as e:
+        print(f"❌ Failed to bump answer key generation for {qa_id}: {e}")
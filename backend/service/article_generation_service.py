@@ -6,12 +6,19 @@ Generates high-quality articles based on user input (query, text, or content)
 import asyncio
 import json
 import os
-import re
+import time
 import uuid
-from typing import List, Dict, Any, Optional
-from openai import AsyncAzureOpenAI
+from typing import AsyncIterator, List, Dict, Any, Optional
 
 from backend.config.settings import SETTINGS
+from backend.service.content_processor import PROCESSOR_VERSION, ContentProcessor, process_content
+from backend.service.generation_cache import content_hash, create_generation_cache, normalize_query
+from backend.service.job_service import job_manager
+from backend.service.json_stream import JsonObjectStreamParser
+from backend.service.llm_gateway import llm_gateway
+from backend.service.llm_json import parse_llm_json
+from backend.service.prompt_registry import PromptTemplate, prompt_registry
+from backend.service.text_normalizer import normalize_text
 
 # Article Generation Configuration
 ARTICLE_GENERATION_CONFIG = {
@@ -24,16 +31,14 @@ ARTICLE_GENERATION_CONFIG = {
     "tone_options": ["professional", "casual", "academic", "conversational", "technical"]
 }
 
-ARTICLE_GENERATION_PROMPT = """
-You are an expert content writer. Generate a high-quality English article based on the user's requirements.
+# Streaming
+STREAM_FIELDS = ("title", "abstract", "content")
 
-**INPUT:**
-Topic/Query: {query}
-Additional Content: {input_text}
-Article Type: {article_type}
-Length: {length}
-Tone: {tone}
-Format: {output_format}
+ARTICLE_GENERATION_PROMPT = prompt_registry.register(PromptTemplate(
+    name="article_generation",
+    system="""You are an expert content creator. Generate high-quality articles based on user input. Always return valid JSON.
+
+You are an expert content writer. Generate a high-quality English article based on the user's requirements, which are given after these instructions (topic, additional content, article type, length, tone and format).
 
 **TASK:** Create a well-structured article with the following requirements:
 
@@ -68,7 +73,7 @@ Format: {output_format}
 - Use basic LaTeX syntax with care: x^2, fractions as (a)/(b), integrals as ∫, limits as lim
 - For fractions, use parentheses: (numerator)/(denominator) 
 - Example inline: <span class='math-inline'>$f'(x) = 2x$</span>
-- Example block: <div class='math-block'>$$f'(x) = lim_{{h → 0}} (f(x+h) - f(x))/h$$</div>
+- Example block: <div class='math-block'>$$f'(x) = lim_{h → 0} (f(x+h) - f(x))/h$$</div>
 
 **EXAMPLE MATH FORMATTING:**
 Correct: <span class='math-inline'>$x^2 + y^2 = z^2$</span>
@@ -79,17 +84,17 @@ Correct: <div class='math-block'>$$∫_0^1 x^2 dx = (1)/(3)$$</div>
 - Example: <pre class='language-python'><code>import numpy as np; x = np.array([1, 2, 3]); print(x)</code></pre>
 
 **OUTPUT:** Return ONLY a valid JSON object with this exact structure:
-{{
+{
   "title": "Engaging article title",
   "abstract": "Brief 2-3 sentence summary of the article",
-  "content": "Full article content in {output_format} format with proper headings and structure with tags h2, h3, p, ul, li, etc. if format is HTML",
+  "content": "Full article content in the requested format with proper headings and structure with tags h2, h3, p, ul, li, etc. if format is HTML",
   "tags": ["relevant", "topic", "tags"]
-}}
+}
 
 **IMPORTANT:** 
 - Return ONLY valid JSON, no additional text
 - Content should be original, well-structured, and engaging
-- Use proper {{output_format}} formatting for content
+- Use proper formatting in the requested format for content
 - Include relevant headings and subheadings in the content
 - Generate 3-5 relevant tags based on the content
 - Ensure the abstract is compelling and summarizes the key points
@@ -108,22 +113,63 @@ Correct: <div class='math-block'>$$∫_0^1 x^2 dx = (1)/(3)$$</div>
 - Use HTML formatting (<br>, <p>) instead of actual newlines.
 - Ensure all quotation marks inside values are properly escaped or replaced.
 - Article must be original, structured, and engaging.
-- Use appropriate {output_format} formatting for the "content".
+- Use the requested format for the "content".
 - Abstract must be 2–3 sentences.
 - Tags should be 3–5 relevant keywords.
+""",
+    user="""**INPUT:**
+Topic/Query: {query}
+Additional Content: {input_text}
+Article Type: {article_type}
+Length: {length}
+Tone: {tone}
+Format: {output_format}
 
 Generate the article now:
-"""
+""",
+))
+
+ARTICLE_SUGGESTIONS_PROMPT = prompt_registry.register(PromptTemplate(
+    name="article_suggestions",
+    system="""You are a content strategy expert. Generate diverse article suggestions. Always return valid JSON.
+
+For the topic given after these instructions, generate 5 related article suggestions with different angles and approaches.
+
+Return ONLY a valid JSON object with this structure:
+{
+    "suggestions": [
+        {
+            "title": "Suggested Article Title",
+            "description": "Brief description of the article approach",
+            "article_type": "informative|tutorial|opinion|review|news",
+            "estimated_length": "short|medium|long",
+            "target_audience": "Brief description of target readers"
+        }
+    ]
+}
+""",
+    user='Topic: "{query}"',
+))
+
+# Change whenever a prompt changes, so responses to an older prompt are never served
+ARTICLE_PROMPT_VERSION = ARTICLE_GENERATION_PROMPT.version
+SUGGESTIONS_PROMPT_VERSION = ARTICLE_SUGGESTIONS_PROMPT.version
+
+# Suggestions are requested while the user types: a late answer is no answer
+SUGGESTIONS_TIMEOUT_SECONDS = 20
 
 class ArticleGenerationService:
     def __init__(self):
         """Initialize the Article Generation Service"""
-        self.client = AsyncAzureOpenAI(
-            api_key=SETTINGS.azure_openai_key,
-            api_version=SETTINGS.azure_openai_api_version,
-            azure_endpoint=SETTINGS.azure_openai_endpoint
+        self.deployment_name = llm_gateway.deployment
+        self.generation_cache = create_generation_cache(
+            "article_generation", SETTINGS.article_generation_cache_ttl_seconds
+        )
+        # Kept past freshness so a repeated topic is answered at once while it is refreshed
+        self.suggestions_cache = create_generation_cache(
+            "article_suggestions",
+            SETTINGS.article_suggestions_cache_ttl_seconds + SETTINGS.article_suggestions_cache_stale_seconds
         )
-        self.deployment_name = SETTINGS.azure_openai_deployment
 
     async def generate_article(
         self,
@@ -132,7 +178,8 @@ class ArticleGenerationService:
         article_type: str = "informative",
         length: str = "medium",
         tone: str = "professional",
-        output_format: str = "markdown"
+        output_format: str = "markdown",
+        bypass_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Generate an article based on the provided parameters
@@ -144,131 +191,61 @@ class ArticleGenerationService:
             length: Desired length (short, medium, long)
             tone: Writing tone (professional, casual, academic, etc.)
             output_format: Output format (markdown, html)
+            bypass_cache: Always call the LLM (the fresh article still refreshes the cache)
             
         Returns:
             Dict containing the generated article and metadata
         """
+        options = dict(query=query, input_text=input_text, article_type=article_type,
+                       length=length, tone=tone, output_format=output_format)
+        if not query or not query.strip():
+            return await self._generate_article(**options)
+        key = self._generation_cache_key(**options)
+        if bypass_cache:
+            result = await self._generate_article(**options)
+            if result["success"]:
+                await self.generation_cache.store_value(key, result)
+            return {**result, "cached": False}
+        result, source = await self.generation_cache.get_or_compute(
+            key, lambda: self._generate_article(**options), should_cache=lambda r: r["success"]
+        )
+        if source != "computed":
+            print(f"♻️ Article generation: cache hit for '{query[:50]}'")
+        return {**result, "cached": source != "computed"}
+
+    def _generation_cache_key(self, query: str, input_text: str, article_type: str, length: str,
+                              tone: str, output_format: str) -> str:
+        return content_hash(
+            normalize_query(query), normalize_query(input_text), article_type, length, tone, output_format,
+            ARTICLE_PROMPT_VERSION, PROCESSOR_VERSION, self.deployment_name
+        )
+
+    async def _generate_article(
+        self,
+        query: str,
+        input_text: str,
+        article_type: str,
+        length: str,
+        tone: str,
+        output_format: str
+    ) -> Dict[str, Any]:
+        """One LLM generation; errors are returned as {"success": False, ...}"""
         try:
-            # Validate inputs
-            if not query or len(query.strip()) == 0:
-                raise ValueError("Query/topic is required")
-                
-            if len(query) > ARTICLE_GENERATION_CONFIG["max_query_length"]:
-                query = query[:ARTICLE_GENERATION_CONFIG["max_query_length"]]
-                
-            if len(input_text) > ARTICLE_GENERATION_CONFIG["max_input_text_length"]:
-                input_text = input_text[:ARTICLE_GENERATION_CONFIG["max_input_text_length"]]
-            
-            # Validate parameters
-            if article_type not in ARTICLE_GENERATION_CONFIG["article_types"]:
-                article_type = "informative"
-            
-            if length not in ["short", "medium", "long"]:
-                length = "medium"
-                
-            if tone not in ARTICLE_GENERATION_CONFIG["tone_options"]:
-                tone = "professional"
-                
-            if output_format not in ARTICLE_GENERATION_CONFIG["output_formats"]:
-                output_format = "markdown"
-
-            print(f"🔧 Article generation parameters:")
-            print(f"🔧 Query: {query[:100]}...")
-            print(f"🔧 Input text length: {len(input_text)}")
-            print(f"🔧 Article type: {article_type}")
-            print(f"🔧 Length: {length}")
-            print(f"🔧 Tone: {tone}")
-            print(f"🔧 Output format: {output_format}")
-
-            # Prepare the prompt
-            prompt = ARTICLE_GENERATION_PROMPT.format(
-                query=query,
-                input_text=input_text,
-                article_type=article_type,
-                length=length,
-                tone=tone,
-                output_format=output_format
-            )
+            messages = self._prepare_messages(query, input_text, article_type, length, tone, output_format)
 
-            print(f"🔧 Prompt length: {len(prompt)}")
+            print(f"🔧 Prompt length: {sum(len(m['content']) for m in messages)}")
             print(f"🔧 Making API call to Azure OpenAI...")
 
             # Generate the article using Azure OpenAI
-            response = await self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert content creator. Generate high-quality articles based on user input. Always return valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=4000,
-                top_p=0.9,
-                frequency_penalty=0.3,
-                presence_penalty=0.3
+            response = await llm_gateway.complete(
+                messages, prompt=ARTICLE_GENERATION_PROMPT, **self._completion_kwargs()
             )
 
             print(f"🔧 API call successful!")
 
             # Extract and parse the response
             content = response.choices[0].message.content.strip()
-
-            # Clean LaTeX commands BEFORE JSON parsing to avoid escape sequence issues
-            content = re.sub(r'\\([a-zA-Z]+)', r'LTXCMD_\1', content)
-            
-            # Clean the response to ensure it's valid JSON
-            content = self._clean_json_response(content)
-
-            
-
-            
-            try:
-                # Parse the JSON
-                article_data = json.loads(content)
-
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON decode error: {e}")
-                print(f"❌ Error at line {e.lineno}, column {e.colno}, position {e.pos}")
-                if e.pos < len(content):
-                    start = max(0, e.pos - 50)
-                    end = min(len(content), e.pos + 50)
-                    print(f"❌ Content around error: {repr(content[start:end])}")
-                raise e
-            
-            # Validate the response structure - only essential fields
-            required_fields = ["title", "abstract", "content", "tags"]
-            for field in required_fields:
-                if field not in article_data:
-                    print(f"❌ Missing required field: {field}")
-                    raise ValueError(f"Missing required field: {field}")
-                else:
-                    print(f"✅ Found field: {field}")
-            
-            # Ensure tags is a list
-            if not isinstance(article_data["tags"], list):
-                print(f"🔧 Converting tags to list from: {type(article_data['tags'])}")
-                article_data["tags"] = []
-            
-            # Process LaTeX expressions in the content
-            processed_content = self._process_latex_in_content(article_data["content"])
-            print(f"🔧 Processed LaTeX in content")
-            
-            print(f"🔧 About to return successful response...")
-            result = {
-                "success": True,
-                "title": article_data["title"],
-                "abstract": article_data["abstract"], 
-                "content": processed_content,
-                "tags": article_data["tags"],
-                "message": "Article generated successfully"
-            }
-            print(f"🔧 Returning result with keys: {list(result.keys())}")
-            return result
+            return self._parse_article_response(content, output_format)
             
         except json.JSONDecodeError as e:
             print(f"❌ JSON decode error: {str(e)}")
@@ -288,87 +265,181 @@ class ArticleGenerationService:
                 "message": str(e)
             }
 
-    def _clean_json_response(self, content: str) -> str:
-        """Clean the AI response to ensure it's valid JSON"""
-        # Remove any text before the first {
-        start = content.find('{')
-        if start != -1:
-            content = content[start:]
-        
-        # Remove any text after the last }
-        end = content.rfind('}')
-        if end != -1:
-            content = content[:end + 1]
-        
-        # Remove any markdown code block markers
-        content = re.sub(r'^```json\s*', '', content)
-        content = re.sub(r'\s*```$', '', content)
-        content = re.sub(r'^```\s*', '', content)
-        
-        # Clean up control characters that can break JSON parsing
-        # Replace actual newlines, tabs, and carriage returns with proper JSON escape sequences
-        cleaned = content.replace('\n', '').replace('\r', '').replace('\t', ' ')
-        
-        # Remove other control characters that could cause issues
-        cleaned = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', cleaned)
-        
-        # The AI is generating \\n literally, let's replace those with actual spaces for now
-        cleaned = cleaned.replace('\\n', ' ').replace('\\r', ' ').replace('\\t', ' ')
-        
-        # Handle LaTeX commands that might cause JSON parsing issues
-        # Replace ALL backslash sequences with placeholders
-        
-        # Find all backslash sequences and replace them
-        def replace_backslash_sequences(text):
-            # Replace any sequence that starts with backslash followed by letters
-            # Use a placeholder that won't create JSON escape issues - no backslashes at all
-            return re.sub(r'\\([a-zA-Z]+)', r'LTXCMD_\1', text)
-        
-        print(f"🔧 Before backslash replacement: {cleaned[:200]}...")
-        cleaned = replace_backslash_sequences(cleaned)
-        print(f"🔧 After backslash replacement: {cleaned[:200]}...")
-        
-        return cleaned.strip()
-    
-    def _process_latex_in_content(self, content: str) -> str:
-        """Process LaTeX expressions in the content to ensure proper rendering"""
-        if not content or not isinstance(content, str):
-            return content
+    async def stream_article(
+        self,
+        query: str,
+        input_text: str = "",
+        article_type: str = "informative",
+        length: str = "medium",
+        tone: str = "professional",
+        output_format: str = "markdown",
+        bypass_cache: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streamed variant of generate_article
+
+        Yields {"event": "delta", "data": {"field", "text"}} for title, abstract
+        and content as the model writes them (decoded with the same repairs as
+        parse_llm_json), {"event": "field"} when a field
+        is complete (with its "value" for non-streamed fields such as tags),
+        then one {"event":
+        "done"} with the validated article - or {"event": "error"}. Content
+        deltas go through the same ContentProcessor as the final article (an
+        unfinished tag or math span is only sent once it is closed), so they
+        add up to its content; the final article is still what clients should
+        keep. A cached article is replayed
+        as one delta per section.
+        """
+        messages = self._prepare_messages(query, input_text, article_type, length, tone, output_format)
+        key = self._generation_cache_key(query, input_text, article_type, length, tone, output_format)
+        cached = None if bypass_cache else await self.generation_cache.load_value(key)
+        if cached is not None:
+            for field in STREAM_FIELDS:
+                yield {"event": "delta", "data": {"field": field, "text": cached[field]}}
+                yield {"event": "field", "data": {"field": field}}
+            yield {"event": "field", "data": {"field": "tags", "value": cached["tags"]}}
+            yield {"event": "done", "data": {**{k: cached[k] for k in ("title", "abstract", "content", "tags")},
+                                             "tokens_used": 0, "cached": True}}
+            return
+        stream = llm_gateway.stream(messages, prompt=ARTICLE_GENERATION_PROMPT, **self._completion_kwargs())
+        parser = JsonObjectStreamParser()
+        raw: List[str] = []
+        content_processor = ContentProcessor(output_format)  # Holds back unfinished tags and math spans
+        tokens_used = 0
+
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage:
+                tokens_used += usage.total_tokens or 0
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            text = chunk.choices[0].delta.content
+            raw.append(text)
+            for kind, field, value in parser.feed(text):
+                if kind == "value":
+                    if field == "content":
+                        tail = content_processor.close()
+                        if tail:
+                            yield self._content_delta(tail)
+                    # A streamed section's text is the sum of its deltas
+                    yield {"event": "field", "data": {"field": field} if field in STREAM_FIELDS else {"field": field, "value": value}}
+                elif field == "content":
+                    processed = content_processor.feed(value)
+                    if processed:
+                        yield self._content_delta(processed)
+                elif field in STREAM_FIELDS:
+                    yield {"event": "delta", "data": {"field": field, "text": value}}
+
+        # The final article goes through exactly the non-streaming pipeline
+        try:
+            result = self._parse_article_response("".join(raw).strip(), output_format)
+        except Exception as e:
+            print(f"❌ Article stream: final response invalid: {e}")
+            yield {"event": "error", "data": {"error": "Failed to parse AI response", "message": str(e), "tokens_used": tokens_used}}
+            return
+        await self.generation_cache.store_value(key, result)
+        yield {"event": "done", "data": {**{k: result[k] for k in ("title", "abstract", "content", "tags")},
+                                         "tokens_used": tokens_used, "cached": False}}
+
+    def _content_delta(self, text: str) -> Dict[str, Any]:
+        return {"event": "delta", "data": {"field": "content", "text": text}}
+
+    def _prepare_messages(self, query: str, input_text: str, article_type: str, length: str,
+                          tone: str, output_format: str) -> List[Dict[str, str]]:
+        """Validate and normalize the inputs, then fill the prompt template"""
+        # Validate inputs
+        if not query or len(query.strip()) == 0:
+            raise ValueError("Query/topic is required")
+            
+        # Pasted input is often HTML: strip it and cut on a sentence boundary
+        query = normalize_text(query, ARTICLE_GENERATION_CONFIG["max_query_length"], keep_paragraphs=False)
+        input_text = normalize_text(input_text, ARTICLE_GENERATION_CONFIG["max_input_text_length"])
         
-        import re
+        # Validate parameters
+        if article_type not in ARTICLE_GENERATION_CONFIG["article_types"]:
+            article_type = "informative"
         
-        def convert_simple_to_latex(match):
-            math_content = match.group(1)  # Content between $ or $$
-            
-            print(f"🔧 Processing math content: {math_content}")
-            
-            # Restore ALL backslash sequences from placeholders
-            # Use single backslash, not double!
-            math_content = re.sub(r'LTXCMD_([a-zA-Z]+)', r'\\\1', math_content)
-            
-            print(f"🔧 After restoring backslashes: {math_content}")
+        if length not in ["short", "medium", "long"]:
+            length = "medium"
             
-            # Convert parentheses-wrapped fractions to LaTeX: (a)/(b) -> \frac{a}{b}
-            math_content = re.sub(r'\(([^)]+)\)/\(([^)]+)\)', r'\\frac{\1}{\2}', math_content)
+        if tone not in ARTICLE_GENERATION_CONFIG["tone_options"]:
+            tone = "professional"
             
-            # Convert simple fractions: number/number -> \frac{number}{number}
-            math_content = re.sub(r'(\d+)/(\d+)', r'\\frac{\1}{\2}', math_content)
-            
-            # Convert integral symbol to LaTeX if not already there
-            math_content = math_content.replace('∫', '\\int')
-            
-            # Convert arrow symbol
-            math_content = math_content.replace('→', '\\to')
-            
-            return match.group(0).replace(match.group(1), math_content)
+        if output_format not in ARTICLE_GENERATION_CONFIG["output_formats"]:
+            output_format = "markdown"
+
+        print(f"🔧 Article generation parameters:")
+        print(f"🔧 Query: {query[:100]}...")
+        print(f"🔧 Input text length: {len(input_text)}")
+        print(f"🔧 Article type: {article_type}")
+        print(f"🔧 Length: {length}")
+        print(f"🔧 Tone: {tone}")
+        print(f"🔧 Output format: {output_format}")
+
+        # Static instructions first (cacheable by the provider), the request after them
+        return ARTICLE_GENERATION_PROMPT.messages(
+            query=query,
+            input_text=input_text,
+            article_type=article_type,
+            length=length,
+            tone=tone,
+            output_format=output_format
+        )
+
+    def _completion_kwargs(self) -> Dict[str, Any]:
+        return dict(
+            model=self.deployment_name,
+            temperature=0.7,
+            max_tokens=4000,
+            top_p=0.9,
+            frequency_penalty=0.3,
+            presence_penalty=0.3
+        )
+
+    def _parse_article_response(self, content: str, output_format: str) -> Dict[str, Any]:
+        """Raw completion -> validated article (raises on invalid JSON or missing fields)"""
+        try:
+            # Fences, prose, stray backslashes (LaTeX) and raw newlines are handled by the extractor
+            article_data = parse_llm_json(content)
+
+        except json.JSONDecodeError as e:
+            print(f"❌ JSON decode error: {e}")
+            print(f"❌ Error at line {e.lineno}, column {e.colno}, position {e.pos}")
+            if e.pos < len(e.doc):
+                start = max(0, e.pos - 50)
+                end = min(len(e.doc), e.pos + 50)
+                print(f"❌ Content around error: {repr(e.doc[start:end])}")
+            raise e
+        
+        # Validate the response structure - only essential fields
+        required_fields = ["title", "abstract", "content", "tags"]
+        for field in required_fields:
+            if field not in article_data:
+                print(f"❌ Missing required field: {field}")
+                raise ValueError(f"Missing required field: {field}")
+            else:
+                print(f"✅ Found field: {field}")
         
-        # Process inline math: $...$
-        content = re.sub(r'\$([^$]+)\$', convert_simple_to_latex, content)
+        # Ensure tags is a list
+        if not isinstance(article_data["tags"], list):
+            print(f"🔧 Converting tags to list from: {type(article_data['tags'])}")
+            article_data["tags"] = []
         
-        # Process display math: $$...$$
-        content = re.sub(r'\$\$([^$]+)\$\$', convert_simple_to_latex, content)
+        # Math, code and links; unsafe markup is removed
+        processed_content = process_content(article_data["content"], output_format)
+        print(f"🔧 Post-processed content")
         
-        return content
+        print(f"🔧 About to return successful response...")
+        result = {
+            "success": True,
+            "title": article_data["title"],
+            "abstract": article_data["abstract"], 
+            "content": processed_content,
+            "tags": article_data["tags"],
+            "message": "Article generated successfully"
+        }
+        print(f"🔧 Returning result with keys: {list(result.keys())}")
+        return result
 
     async def get_article_suggestions(self, query: str) -> Dict[str, Any]:
         """
@@ -380,48 +451,33 @@ class ArticleGenerationService:
         Returns:
             Dict containing suggested topics and article types
         """
+        # Hit on every keystroke pause: answer repeats from the cache, stale ones while refreshing
+        if not query or not query.strip():
+            return await self._get_article_suggestions(query)
+        key = content_hash(normalize_query(query), SUGGESTIONS_PROMPT_VERSION, self.deployment_name)
+        result, source = await self.suggestions_cache.get_or_compute(
+            key, lambda: self._get_article_suggestions(query),
+            fresh_seconds=SETTINGS.article_suggestions_cache_ttl_seconds,
+            should_cache=lambda r: r["success"]
+        )
+        return {**result, "cached": source != "computed"}
+
+    async def _get_article_suggestions(self, query: str) -> Dict[str, Any]:
         try:
             if not query or len(query.strip()) == 0:
                 raise ValueError("Query is required for suggestions")
 
-            prompt = f"""
-            Based on the topic: "{query}"
-            
-            Generate 5 related article suggestions with different angles and approaches.
-            
-            Return ONLY a valid JSON object with this structure:
-            {{
-                "suggestions": [
-                    {{
-                        "title": "Suggested Article Title",
-                        "description": "Brief description of the article approach",
-                        "article_type": "informative|tutorial|opinion|review|news",
-                        "estimated_length": "short|medium|long",
-                        "target_audience": "Brief description of target readers"
-                    }}
-                ]
-            }}
-            """
-
-            response = await self.client.chat.completions.create(
+            response = await llm_gateway.complete(
+                ARTICLE_SUGGESTIONS_PROMPT.messages(query=query),
+                prompt=ARTICLE_SUGGESTIONS_PROMPT,
+                timeout=SUGGESTIONS_TIMEOUT_SECONDS,
                 model=self.deployment_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a content strategy expert. Generate diverse article suggestions. Always return valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
                 temperature=0.8,
                 max_tokens=1000
             )
 
             content = response.choices[0].message.content.strip()
-            content = self._clean_json_response(content)
-            suggestions_data = json.loads(content)
+            suggestions_data = parse_llm_json(content)
             
             return {
                 "success": True,
@@ -448,7 +504,8 @@ async def generate_article_from_input(
     article_type: str = "informative",
     length: str = "medium",
     tone: str = "professional",
-    output_format: str = "markdown"
+    output_format: str = "markdown",
+    bypass_cache: bool = False
 ) -> Dict[str, Any]:
     """Generate an article from user input"""
     return await article_generation_service.generate_article(
@@ -457,10 +514,26 @@ async def generate_article_from_input(
         article_type=article_type,
         length=length,
         tone=tone,
-        output_format=output_format
+        output_format=output_format,
+        bypass_cache=bypass_cache
     )
 
 
+def stream_article_from_input(**kwargs) -> AsyncIterator[Dict[str, Any]]:
+    """Stream an article from user input (see ArticleGenerationService.stream_article)"""
+    return article_generation_service.stream_article(**kwargs)
+
+
 async def get_article_suggestions_from_query(query: str) -> Dict[str, Any]:
     """Get article suggestions based on a query"""
     return await article_generation_service.get_article_suggestions(query)
+
+
+async def _run_article_generation_job(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    result = await generate_article_from_input(**payload)
+    if not result["success"]:
+        raise RuntimeError(result.get("message") or result.get("error") or "Article generation failed")
+    return {k: result[k] for k in ("title", "abstract", "content", "tags")}
+
+
+job_manager.register("article_generation", _run_article_generation_job)
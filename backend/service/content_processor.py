@@ -0,0 +1,245 @@
+"""
+Post-processing for generated article content (HTML or Markdown)
+
+One pass of a precompiled tokenizer over the model output:
+- math: $...$ and $$...$$ spans get the same conversions as before ((a)/(b)
+  and 1/2 -> \\frac, ∫ -> \\int, → -> \\to). Display spans are matched as a
+  whole, inline spans follow the pandoc rule (no space inside the dollars,
+  no digit after the closing one) so prices like "$5 and $10" stay text, and
+  neither may contain a tag
+- code: Markdown fences / inline code are left to the Markdown renderer
+  (which escapes them) when the output format is markdown, and HTML-escaped
+  otherwise, since HTML output is inserted as is; inside <pre> and <code>
+  math is left alone and tags other than plain formatting tags are escaped
+  (e.g. "std::vector<int>")
+- links: only http(s), mailto, tel and relative URLs are kept (plus data:
+  images in <img src>); target="_blank" links get rel="noopener noreferrer".
+  Markdown autolinks (<https://...>) are kept
+- sanitizing: script / style / iframe / object / embed / svg ... are removed
+  with their contents, form controls and <meta>/<link>/<base> are dropped,
+  event handler and style attributes are removed, and any other tag outside
+  the allow list (e.g. "vector<int>" in prose) is escaped as text
+
+ContentProcessor is incremental: feed() returns the part of the output that
+can no longer change (an unfinished tag, math span or code span is held back,
+up to MAX_HOLD_CHARS), so streamed content is processed exactly like the
+final article. Used for article generation (including streaming) and news
+paraphrasing.
+"""
+
+import html
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+MAX_HOLD_CHARS = 2000  # A lone "$" (e.g. a price) must not hold back the rest of the article
+# Part of cache keys for processed content; bump when the output of a given input changes
+PROCESSOR_VERSION = 2
+
+ALLOWED_TAGS = frozenset({
+    "a", "abbr", "article", "aside", "b", "blockquote", "br", "caption", "cite", "code", "col",
+    "colgroup", "dd", "del", "details", "div", "dl", "dt", "em", "figcaption", "figure", "footer",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "i", "img", "ins", "kbd", "li", "main",
+    "mark", "nav", "ol", "p", "pre", "q", "s", "samp", "section", "small", "span", "strong", "sub",
+    "summary", "sup", "table", "tbody", "td", "tfoot", "th", "thead", "time", "tr", "u", "ul", "var",
+})
+# Removed together with everything up to their closing tag
+REMOVE_WITH_CONTENT = frozenset({
+    "applet", "embed", "frame", "frameset", "iframe", "noscript", "object", "script", "style", "svg", "template",
+})
+# Removed, their text kept
+REMOVE_TAG = frozenset({
+    "base", "button", "fieldset", "form", "input", "label", "link", "meta", "option", "select", "textarea",
+})
+CODE_TAGS = frozenset({"code", "pre"})
+_CODE_INNER_TAGS = CODE_TAGS | {"span"}  # Syntax highlighting markup
+
+URL_ATTRIBUTES = frozenset({"action", "background", "cite", "href", "poster", "src"})
+SAFE_SCHEMES = frozenset({"http", "https", "mailto", "tel"})
+_REMOVED_ATTRIBUTES = frozenset({"formaction", "srcdoc", "style"})
+
+_MATH_BODY = r"(?:[^$<\\]|\\.|<(?![a-zA-Z/!]))"
+# Text runs are copied as is; markup starts at one of these characters. Bare
+# lowercase tags that are always kept (<p>, </strong>, <br> ...) count as text
+_PLAIN_TAGS = sorted(ALLOWED_TAGS - CODE_TAGS, key=len, reverse=True)
+_SPECIAL = re.compile(rf"[$`]|<(?!/?(?:{'|'.join(_PLAIN_TAGS)})>)")
+_MARKUP = {
+    "<": re.compile(
+        r"(?P<comment><!--.*?-->)"
+        r"|(?P<autolink><(?:https?|mailto):[^\s<>]+>)"
+        r"|(?P<element><(?P<close>/?)(?P<tag>[a-zA-Z][a-zA-Z0-9:-]*)(?:[^<>\"']|\"[^\"]*\"|'[^']*')*>)"
+        r"|(?P<declaration><[!?][^>]*>)",
+        re.S,
+    ),
+    "$": re.compile(
+        rf"\$\$(?P<display>{_MATH_BODY}+?)\$\$"
+        rf"|\$(?P<inline>(?![\s$]){_MATH_BODY}*?(?<!\s))\$(?!\d)",
+        re.S,
+    ),
+    "`": re.compile(r"(?P<fence>```.*?```)|(?P<code>`[^`\n]+`)", re.S),
+}
+# What a lone "<", "$" or "`" at the end of a chunk may still turn into
+_UNFINISHED = {
+    "<": re.compile(r"""<(?:/?[a-zA-Z](?:[^<>"']|"[^"]*"?|'[^']*'?)*|/|!.*)?\Z""", re.S),
+    "$": re.compile(rf"\$(?:\${_MATH_BODY}*\$?|(?!\s){_MATH_BODY}*)(?:\\|<)?\Z", re.S),
+    "`": re.compile(r"```.*\Z|``?\Z|`[^`\n]*\Z", re.S),
+}
+_ELEMENT = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9:-]*)(.*)>\Z", re.S)
+_ATTRIBUTE = re.compile(r"""([^\s"'<>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'<>]*))?""")
+_URL_SCHEME = re.compile(r"([a-zA-Z][a-zA-Z0-9+.-]*):")
+_URL_IGNORED = re.compile(r"[\x00-\x20\x7f]+")
+_DATA_IMAGE = re.compile(r"data:image/(?:png|gif|jpe?g|webp);", re.I)
+_SKIP_END = {name: re.compile(rf"</{name}\b[^>]*>", re.I) for name in REMOVE_WITH_CONTENT}
+
+_PAREN_FRACTION = re.compile(r"\(([^)]+)\)/\(([^)]+)\)")
+_NUMBER_FRACTION = re.compile(r"(\d+)/(\d+)")
+_MATH_SYMBOLS = str.maketrans({"∫": "\\int", "→": "\\to"})
+
+
+def convert_math(tex: str) -> str:
+    """Plain-text math notation -> LaTeX, for the body of a $ or $$ span"""
+    # Substring checks first: most spans need none of the rewrites
+    if ")/(" in tex:
+        tex = _PAREN_FRACTION.sub(r"\\frac{\1}{\2}", tex)
+    if "/" in tex:
+        tex = _NUMBER_FRACTION.sub(r"\\frac{\1}{\2}", tex)
+    if "∫" in tex or "→" in tex:
+        tex = tex.translate(_MATH_SYMBOLS)
+    return tex
+
+
+def safe_url(url: str, tag: str = "a") -> bool:
+    """Relative URLs and http(s)/mailto/tel; data: images for <img>"""
+    # Browsers ignore whitespace and control characters in the scheme ("java\tscript:")
+    url = _URL_IGNORED.sub("", html.unescape(url))
+    scheme = _URL_SCHEME.match(url)
+    if scheme is None:
+        return True
+    if scheme.group(1).lower() in SAFE_SCHEMES:
+        return True
+    return tag == "img" and _DATA_IMAGE.match(url) is not None
+
+
+def _sanitize_attributes(tag: str, source: str) -> Tuple[str, int]:
+    attributes, removed = {}, 0
+    for match in _ATTRIBUTE.finditer(source):
+        name, value = match.group(1).lower(), match.group(2)
+        if value is not None and value[:1] in "\"'":
+            value = value[1:-1]
+        if name.startswith("on") or name in _REMOVED_ATTRIBUTES \
+                or (name in URL_ATTRIBUTES and value is not None and not safe_url(value, tag)):
+            removed += 1
+            continue
+        attributes[name] = None if value is None else html.unescape(value)
+    if tag == "a" and (attributes.get("target") or "").lower() == "_blank":
+        rel = (attributes.get("rel") or "").split()
+        attributes["rel"] = " ".join(rel + [r for r in ("noopener", "noreferrer") if r not in rel])
+    rendered = "".join(f" {name}" if value is None else f' {name}="{html.escape(value)}"'
+                       for name, value in attributes.items())
+    return rendered, removed
+
+
+@lru_cache(maxsize=4096)
+def sanitize_tag(markup: str) -> Tuple[str, bool, str, int]:
+    """(lowercased name, is closing tag, safe markup, unsafe parts removed) for one tag outside code"""
+    match = _ELEMENT.match(markup)
+    name, closing = match.group(2).lower(), bool(match.group(1))
+    if name in REMOVE_WITH_CONTENT or name in REMOVE_TAG:
+        return name, closing, "", 1
+    if name not in ALLOWED_TAGS:
+        return name, closing, html.escape(markup, quote=False), 1
+    if closing:
+        return name, closing, f"</{name}>", 0
+    attributes, removed = _sanitize_attributes(name, match.group(3))
+    return name, closing, f"<{name}{attributes}>", removed
+
+
+class ContentProcessor:
+    def __init__(self, output_format: str = "html"):
+        self.removed = 0  # Unsafe tags / attributes removed or escaped
+        self._verbatim_code = output_format == "markdown"
+        self._pending = ""
+        self._skip: Optional[str] = None  # Tag whose content is being removed
+        self._code_depth = 0
+
+    def feed(self, text: str) -> str:
+        """Add a chunk; returns the processed output that is final"""
+        return self._process(self._pending + text, final=False)
+
+    def close(self) -> str:
+        """Output for whatever is still held back"""
+        return self._process(self._pending, final=True)
+
+    def _process(self, text: str, final: bool) -> str:
+        out: List[str] = []
+        position, end = 0, len(text)
+        while position < end:
+            if self._skip:
+                close = _SKIP_END[self._skip].search(text, position)
+                if close is None:
+                    # Keep enough to recognise the closing tag in the next chunk
+                    position = end if final else max(position, end - len(self._skip) - 16)
+                    break
+                position, self._skip = close.end(), None
+                continue
+            special = _SPECIAL.search(text, position)
+            if special is None:
+                out.append(text[position:])
+                position = end
+                break
+            start = special.start()
+            if start > position:
+                out.append(text[position:start])
+            char = special.group()
+            token = _MARKUP[char].match(text, start)
+            if token is None:
+                if not final and end - start <= MAX_HOLD_CHARS and _UNFINISHED[char].match(text, start):
+                    position = start
+                    break  # May still become a tag, math span or code span
+                out.append("&lt;" if char == "<" else char)
+                position = start + 1
+                continue
+            position = token.end()
+            kind = token.lastgroup
+            if kind == "element":
+                out.append(self._render_tag(token.group()))
+            elif kind == "display" or kind == "inline":
+                if self._code_depth:
+                    out.append(token.group())
+                else:
+                    marker = "$$" if kind == "display" else "$"
+                    out.append(marker + convert_math(token.group(kind)) + marker)
+            elif kind == "fence" or kind == "code":
+                out.append(token.group() if self._verbatim_code else html.escape(token.group(), quote=False))
+            elif kind == "autolink":
+                out.append(token.group() if safe_url(token.group()[1:-1]) else self._escape(token.group()))
+            # Comments and declarations are dropped
+        self._pending = text[position:]
+        return "".join(out)
+
+    def _escape(self, markup: str) -> str:
+        self.removed += 1
+        return html.escape(markup, quote=False)
+
+    def _render_tag(self, markup: str) -> str:
+        name, closing, safe, removed = sanitize_tag(markup)
+        if self._code_depth and name not in _CODE_INNER_TAGS:
+            return self._escape(markup)
+        self.removed += removed
+        if name in REMOVE_WITH_CONTENT and not closing:
+            self._skip = name
+        elif name in CODE_TAGS:
+            self._code_depth = max(0, self._code_depth + (-1 if closing else 1))
+        return safe
+
+
+def process_content(content: Optional[str], output_format: str = "html") -> Optional[str]:
+    """Math conversion, link hardening and sanitizing of a complete article body"""
+    if not content or not isinstance(content, str):
+        return content
+    processor = ContentProcessor(output_format)
+    processor._pending = content
+    result = processor.close()
+    if processor.removed:
+        print(f"🧹 Content: removed or escaped {processor.removed} unsafe tags/attributes")
+    return result
@@ -0,0 +1,224 @@
+"""
+Content-hash cache for LLM generation results
+
+Generation output is keyed by a SHA-256 of the cleaned inputs together
+with everything else that determines the output (question count, prompt
+version, model). Identical regenerations are then answered without an LLM
+call. Free-text queries are keyed through `normalize_query`, so the same
+topic typed with different case, spacing or Unicode composition shares an
+entry.
+
+`get_or_compute` adds single-flight computation (concurrent misses for one
+key make one LLM call) and optional stale-while-revalidate: an entry older
+than `fresh_seconds` is still served while a background call refreshes it.
+
+Backends (QA_GENERATION_CACHE):
+- "redis": shared across processes, expiry handled by Redis (SET EX)
+- "disk": one JSON file per key under QA_GENERATION_CACHE_DIR, for single
+  host deployments without Redis
+- "off": caching disabled
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import unicodedata
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.config.settings import SETTINGS
+from backend.database.redis_async import get_redis
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable hash of JSON-serializable parts"""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def normalize_query(text: Optional[str]) -> str:
+    """Cache-key form of a free-text query: NFKC, case-folded, whitespace collapsed"""
+    # NFKC composes decomposed diacritics (Vietnamese IMEs emit both forms) without dropping them
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+class GenerationCache:
+    """Counts hits and misses; subclasses implement storage"""
+
+    name = "off"
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    async def _store(self, key: str, value: Dict[str, Any]):
+        pass
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = await self._load(key)
+        except Exception as e:
+            print(f"⚠️ Generation cache read failed ({self.name}): {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def put(self, key: str, value: Dict[str, Any]):
+        try:
+            await self._store(key, value)
+        except Exception as e:
+            print(f"⚠️ Generation cache write failed ({self.name}): {e}")
+
+    # ---- timestamped entries (get_or_compute) ----
+
+    async def load_value(self, key: str) -> Optional[Any]:
+        """Value stored with store_value / get_or_compute, whatever its age"""
+        entry = await self.get(key)
+        return entry["value"] if entry is not None else None
+
+    async def store_value(self, key: str, value: Any):
+        await self.put(key, {"cached_at": time.time(), "value": value})
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Any]],
+                                 should_cache: Callable[[Any], bool]) -> Any:
+        try:
+            value = await compute()
+            if should_cache(value):
+                await self.store_value(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _start(self, key: str, compute, should_cache) -> asyncio.Task:
+        self._inflight[key] = asyncio.create_task(self._compute_and_store(key, compute, should_cache))
+        return self._inflight[key]
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             fresh_seconds: Optional[float] = None,
+                             should_cache: Callable[[Any], bool] = lambda value: True) -> Tuple[Any, str]:
+        """
+        Cached value for key, else the result of compute() - shared by concurrent
+        callers. With fresh_seconds, an entry older than that is returned as is
+        and refreshed in the background (entries live ttl_seconds in total).
+        Results rejected by should_cache (e.g. failures) are returned but not stored.
+
+        Returns (value, source) with source "cache", "stale" or "computed".
+        """
+        entry = await self.get(key)
+        if entry is not None:
+            if fresh_seconds is None or time.time() - entry["cached_at"] <= fresh_seconds:
+                return entry["value"], "cache"
+            self.stale_hits += 1
+            if key not in self._inflight:
+                self.revalidations += 1
+                self._start(key, compute, should_cache).add_done_callback(_log_revalidation_error)
+            return entry["value"], "stale"
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, compute, should_cache)
+        else:
+            self.coalesced += 1
+        # A caller that goes away must not cancel the call others are waiting on
+        return await asyncio.shield(task), "computed"
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "revalidations": self.revalidations,
+            "coalesced": self.coalesced,
+        }
+
+
+def _log_revalidation_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️ Generation cache revalidation failed: {task.exception()}")
+
+
+class RedisGenerationCache(GenerationCache):
+    name = "redis"
+
+    def __init__(self, ttl_seconds: float, prefix: str):
+        super().__init__(ttl_seconds)
+        self.prefix = prefix
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        client = get_redis()
+        if client is None:
+            return None
+        value = await client.get(f"{self.prefix}:{key}")
+        return json.loads(value) if value else None
+
+    async def _store(self, key: str, value: Dict[str, Any]):
+        client = get_redis()
+        if client is not None:
+            await client.set(f"{self.prefix}:{key}", json.dumps(value), ex=int(self.ttl_seconds))
+
+
+class DiskGenerationCache(GenerationCache):
+    name = "disk"
+
+    def __init__(self, ttl_seconds: float, directory: str):
+        super().__init__(ttl_seconds)
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            os.remove(path)
+            return None
+        return entry["value"]
+
+    def _write(self, key: str, value: Dict[str, Any]):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so a concurrent reader never sees a partial file; the temp
+        # name is unique per write since identical keys can be stored concurrently
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"expires_at": time.time() + self.ttl_seconds, "value": value}, f)
+        os.replace(tmp_path, path)
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def _store(self, key: str, value: Dict[str, Any]):
+        await asyncio.to_thread(self._write, key, value)
+
+
+def create_generation_cache(prefix: str, ttl_seconds: Optional[float] = None) -> GenerationCache:
+    """Cache on the configured backend; ttl_seconds defaults to QA_GENERATION_CACHE_TTL_SECONDS"""
+    backend = SETTINGS.qa_generation_cache
+    ttl = SETTINGS.qa_generation_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+    if backend == "redis":
+        return RedisGenerationCache(ttl, prefix)
+    if backend == "disk":
+        return DiskGenerationCache(ttl, os.path.join(SETTINGS.qa_generation_cache_dir, prefix))
+    return GenerationCache(ttl)
@@ -0,0 +1,223 @@
+"""
+Background jobs for long-running LLM work
+
+Submitting a job returns its record immediately; the work runs as an
+asyncio task on this process, bounded by JOBS_MAX_CONCURRENCY, and clients
+poll GET /api/jobs/{id} or subscribe to GET /api/jobs/{id}/events (SSE).
+
+- Job records are kept in process memory and, when Redis is configured,
+  mirrored under `jobs:job:{id}` so any API worker can answer status
+  requests. Records expire after JOBS_RETENTION_SECONDS.
+- Jobs are deduplicated by a hash of (kind, input): submitting the same
+  input while a job is queued or running returns that job. Kinds
+  registered with `dedupe_completed` also return a completed job until it
+  expires; failed and interrupted jobs are never reused.
+- An unfinished job refreshes its record every JOBS_STALE_SECONDS / 3, so a job
+  whose process died is recognised as stale and not reused.
+
+Handlers are registered per kind by the services that own the work:
+
+    async def handler(payload: dict, progress) -> Any
+        await progress(done=1, total=3)   # merged into job["progress"]
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from backend.config.settings import SETTINGS
+from backend.database.redis_async import get_redis
+from backend.service.generation_cache import content_hash
+
+JOB_KEY_PREFIX = "jobs"
+ACTIVE_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("completed", "failed", "interrupted")
+
+ProgressCallback = Callable[..., Awaitable[None]]
+JobHandler = Callable[[Dict[str, Any], ProgressCallback], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class JobKind:
+    handler: JobHandler
+    dedupe_completed: bool = True
+
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_KEY_PREFIX}:job:{job_id}"
+
+
+def _dedupe_key(kind: str, input_hash: str) -> str:
+    return f"{JOB_KEY_PREFIX}:input:{kind}:{input_hash}"
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in job.items() if not k.startswith("_")}
+
+
+class JobManager:
+    def __init__(self):
+        self._kinds: Dict[str, JobKind] = {}
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._by_input: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def register(self, kind: str, handler: JobHandler, dedupe_completed: bool = True):
+        self._kinds[kind] = JobKind(handler, dedupe_completed)
+
+    # ---- persistence ----
+
+    async def _save(self, job: Dict[str, Any]):
+        job["updated_at"] = datetime.utcnow().isoformat()
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(_job_key(job["id"]), json.dumps(_public(job)), ex=SETTINGS.jobs_retention_seconds)
+        except Exception as e:
+            print(f"⚠️ Job {job['id']}: failed to mirror status to Redis: {e}")
+
+    def _prune(self):
+        cutoff = time.time() - SETTINGS.jobs_retention_seconds
+        for job_id in [j for j, job in self._jobs.items() if job["_finished_ts"] and job["_finished_ts"] < cutoff]:
+            job = self._jobs.pop(job_id)
+            self._by_input.pop(_dedupe_key(job["kind"], job["input_hash"]), None)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return _public(job)
+        # Accepted by another worker: read the mirrored record
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            stored = await client.get(_job_key(job_id))
+        except Exception as e:
+            print(f"⚠️ Job {job_id}: failed to read status from Redis: {e}")
+            return None
+        return json.loads(stored) if stored else None
+
+    # ---- deduplication ----
+
+    def _reusable(self, job: Optional[Dict[str, Any]], kind: JobKind) -> bool:
+        if not job:
+            return False
+        if job["status"] in ACTIVE_STATUSES:
+            updated = datetime.fromisoformat(job["updated_at"]).timestamp() if job.get("updated_at") else 0
+            # Naive UTC timestamps: compare against utcnow on the same basis
+            return datetime.utcnow().timestamp() - updated < SETTINGS.jobs_stale_seconds
+        return job["status"] == "completed" and kind.dedupe_completed
+
+    async def _find_duplicate(self, key: str, kind: JobKind) -> Optional[Dict[str, Any]]:
+        job_id = self._by_input.get(key)
+        if job_id is None:
+            client = get_redis()
+            if client is not None:
+                try:
+                    job_id = await client.get(key)
+                except Exception as e:
+                    print(f"⚠️ Job dedupe lookup failed: {e}")
+        job = await self.get(job_id) if job_id else None
+        return job if self._reusable(job, kind) else None
+
+    # ---- execution ----
+
+    async def submit(self, kind: str, payload: Dict[str, Any], dedupe: bool = True) -> Dict[str, Any]:
+        """Schedule a job, or return the existing job for the same input"""
+        job_kind = self._kinds[kind]
+        self._prune()
+        input_hash = content_hash(kind, payload)
+        key = _dedupe_key(kind, input_hash)
+        if dedupe:
+            existing = await self._find_duplicate(key, job_kind)
+            if existing:
+                return {**existing, "deduplicated": True}
+
+        now = datetime.utcnow().isoformat()
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "status": "queued",
+            "input_hash": input_hash,
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "_finished_ts": None,
+        }
+        self._jobs[job["id"]] = job
+        self._by_input[key] = job["id"]
+        await self._save(job)
+        client = get_redis()
+        if client is not None:
+            try:
+                await client.set(key, job["id"], ex=SETTINGS.jobs_retention_seconds)
+            except Exception as e:
+                print(f"⚠️ Job {job['id']}: failed to record input hash: {e}")
+
+        self._tasks[job["id"]] = asyncio.create_task(self._run(job, job_kind, payload))
+        print(f"🗂️ Job {job['id']} ({kind}) queued")
+        return _public(job)
+
+    async def _heartbeat(self, job: Dict[str, Any]):
+        while True:
+            await asyncio.sleep(max(1.0, SETTINGS.jobs_stale_seconds / 3))
+            await self._save(job)
+
+    async def _run(self, job: Dict[str, Any], kind: JobKind, payload: Dict[str, Any]):
+        async def progress(**values):
+            job["progress"].update(values)
+            await self._save(job)
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, SETTINGS.jobs_max_concurrency))
+        # Queued jobs heartbeat too, so waiting for a slot never looks stale
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            async with self._semaphore:
+                job["status"] = "running"
+                job["started_at"] = datetime.utcnow().isoformat()
+                await self._save(job)
+                job["result"] = await kind.handler(payload, progress)
+                job["status"] = "completed"
+        except asyncio.CancelledError:
+            job["status"] = "interrupted"
+            raise
+        except Exception as e:
+            print(f"❌ Job {job['id']} ({job['kind']}) failed: {e}")
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            heartbeat.cancel()
+            job["finished_at"] = datetime.utcnow().isoformat()
+            job["_finished_ts"] = time.time()
+            await self._save(job)
+            self._tasks.pop(job["id"], None)
+
+    async def stop(self):
+        """Cancel jobs still running in this process (called on shutdown)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"running_tasks": len(self._tasks), "by_status": counts}
+
+
+job_manager = JobManager()
+
+
+async def stop_jobs():
+    await job_manager.stop()
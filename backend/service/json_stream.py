@@ -0,0 +1,266 @@
+"""
+Incremental parsers for streamed LLM JSON responses
+
+JsonArrayStreamParser - the object array of a response. The QA prompt asks for {"questions": [{...}, {...}]}. Fed the completion
+chunk by chunk, the parser returns each object of that array as soon as its
+closing brace arrives, so callers can act on questions while the model is
+still writing the rest.
+
+- Objects are cut out by tracking brace depth and string/escape state, then
+  decoded with parse_llm_json; an object that does not decode is counted in
+  `invalid` and skipped.
+- Anything around the array (code fences, prose) is ignored; a bare
+  top-level array is accepted too.
+- `complete` is True once the array's closing bracket was seen. A truncated
+  or malformed tail only loses the unfinished object.
+
+JsonObjectStreamParser - the top-level fields of a response object, e.g.
+{"title": ..., "abstract": ..., "content": ..., "tags": [...]}. String values
+are decoded as they arrive and reported as deltas; every field is reported
+once more with its full value when it ends. Non-string values (lists,
+numbers) are only reported when complete. Strings are decoded with the
+repairs of parse_llm_json: LaTeX backslashes stay literal ("\\n", "\\t" ... only
+for the names in LATEX_COMMANDS), raw control characters are kept, and a quote
+not followed by , : } or ] is part of the text.
+"""
+
+import json
+import re
+import string
+from typing import Any, Dict, List, Tuple
+
+from backend.service.llm_json import CONTROL_ESCAPES, is_latex_command, parse_llm_json
+
+_ARRAY_START = re.compile(r'"(?P<key>[A-Za-z_]+)"\s*:\s*\[|^\s*(?:```(?:json)?\s*)?\[')
+
+_SEEK, _ARRAY, _OBJECT, _DONE = range(4)
+
+
+class JsonArrayStreamParser:
+    def __init__(self, key: str = "questions"):
+        self.key = key
+        self.complete = False
+        self.invalid = 0
+        self._buffer = ""
+        self._pos = 0
+        self._state = _SEEK
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._trimmed = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add a chunk; returns the objects completed by it"""
+        self._buffer += chunk
+        items: List[Dict[str, Any]] = []
+        if self._state == _SEEK:
+            self._seek_array()
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer) and self._state in (_ARRAY, _OBJECT):
+            c = buffer[i]
+            if self._state == _ARRAY:
+                if c == "{":
+                    self._state, self._start, self._depth = _OBJECT, i, 1
+                elif c == "]":
+                    self._state = _DONE
+                    self.complete = True
+                # Whitespace, commas and stray characters between objects are skipped
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buffer[self._start:i + 1], items)
+                    self._state = _ARRAY
+            i += 1
+
+        # Keep only the unfinished object (if any) so the buffer stays small
+        keep_from = self._start if self._state == _OBJECT else i
+        self._buffer = buffer[keep_from:]
+        self._start -= keep_from
+        self._pos = i - keep_from
+        return items
+
+    def _seek_array(self):
+        for match in _ARRAY_START.finditer(self._buffer):
+            key = match.group("key")
+            if key == self.key or (key is None and not self._trimmed):
+                self._state = _ARRAY
+                self._pos = match.end()
+                return
+        # Keep a short tail in case the key is split across chunks
+        tail = max(0, len(self._buffer) - len(self.key) - 16)
+        if tail:
+            self._buffer = self._buffer[tail:]
+            self._trimmed = True
+
+    def _emit(self, text: str, items: List[Dict[str, Any]]):
+        try:
+            item = parse_llm_json(text)
+        except ValueError:
+            self.invalid += 1
+            return
+        if isinstance(item, dict):
+            items.append(item)
+        else:
+            self.invalid += 1
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+_KEY, _IN_KEY, _COLON, _VALUE, _STRING, _RAW = range(4, 10)
+
+# ("delta", field, text) while a string value arrives, ("value", field, value) when a field ends
+FieldEvent = Tuple[str, str, Any]
+
+
+class JsonObjectStreamParser:
+    def __init__(self):
+        self.complete = False
+        self.invalid = 0
+        self._state = _SEEK
+        self._key: List[str] = []
+        self._field = ""  # Set once the first key was read
+        self._value: List[str] = []
+        self._delta_from = 0
+        self._escape = ""  # Pending escape sequence, possibly split across chunks
+        self._quote = ""  # Closing quote candidate plus the whitespace after it
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, chunk: str) -> List[FieldEvent]:
+        """Add a chunk; returns the field events it produced"""
+        events: List[FieldEvent] = []
+        for c in chunk:
+            if self._state == _STRING and self._string_char(c, events):
+                continue
+            state = self._state
+            if state == _RAW:
+                if self._in_string:
+                    if self._escape:
+                        self._escape = ""
+                    elif c == "\\":
+                        self._escape = c
+                    elif c == '"':
+                        self._in_string = False
+                elif c == '"':
+                    self._in_string = True
+                elif c in "{[":
+                    self._depth += 1
+                elif c in "}]":
+                    self._depth -= 1
+                if self._depth < 0 or (self._depth == 0 and c == "," and not self._in_string):
+                    self._end_raw(events)
+                    self._state = _KEY if c == "," else _DONE
+                    self.complete = c == "}"
+                    continue
+                self._value.append(c)
+            elif state == _SEEK:
+                if c == "{":
+                    self._state = _KEY
+            elif state == _KEY:
+                if c == '"':
+                    self._key = []
+                    self._state = _IN_KEY
+                elif c == "}":
+                    self._state = _DONE
+                    self.complete = True
+                elif not self._field and not c.isspace():
+                    self._state = _SEEK  # A brace in prose before the object, e.g. "{see below}"
+            elif state == _IN_KEY:
+                if c == '"' and not self._escape:
+                    self._field = "".join(self._key)
+                    self._state = _COLON
+                else:
+                    self._escape = "\\" if c == "\\" and not self._escape else ""
+                    self._key.append(c)
+            elif state == _COLON:
+                if c == ":":
+                    self._state = _VALUE
+            elif state == _VALUE:
+                if c == '"':
+                    self._value, self._delta_from, self._escape, self._quote = [], 0, "", ""
+                    self._state = _STRING
+                elif not c.isspace():
+                    self._value, self._depth, self._in_string = [c], 0, False
+                    self._state = _RAW
+                    if c in "{[":
+                        self._depth = 1
+            # After the closing brace everything is ignored
+
+        if self._state == _STRING and len(self._value) > self._delta_from:
+            events.append(("delta", self._field, "".join(self._value[self._delta_from:])))
+            self._delta_from = len(self._value)
+        return events
+
+    def _string_char(self, c: str, events: List[FieldEvent]) -> bool:
+        """Decode one character of a string value; False if the string already ended and c is not part of it"""
+        if self._quote:
+            if c.isspace():
+                self._quote += c
+                return True
+            if c in ",:}]":
+                self._quote = ""
+                self._end_field("".join(self._value), events)
+                return False
+            self._value.append(self._quote)  # Unescaped quote inside the text
+            self._quote = ""
+        if not self._escape:
+            if c == "\\":
+                self._escape = c
+            elif c == '"':
+                self._quote = c  # Ends the value only if , : } or ] follows
+            else:
+                self._value.append(c)
+            return True
+
+        self._escape += c
+        letter, following = self._escape[1], self._escape[2:]
+        if letter == "u":
+            if len(following) < 4 and all(h in _HEX_DIGITS for h in following):
+                return True
+        elif letter in CONTROL_ESCAPES and (not following or following[-1] in _ASCII_LETTERS):
+            return True  # The letters up to the next non-letter decide: escape or LaTeX command (\n vs \nabla)
+        self._escape = ""
+        if is_latex_command(letter, following):
+            # A literal backslash; the letters after it are ordinary text
+            self._value.append("\\")
+            for p in letter + following:
+                self._string_char(p, events)
+        elif letter == "u":
+            self._value.append(chr(int(following, 16)))
+        else:
+            self._value.append(_ESCAPES[letter])
+            for p in following:
+                self._string_char(p, events)
+        return True
+
+    def _end_field(self, value: Any, events: List[FieldEvent]):
+        if isinstance(value, str) and len(self._value) > self._delta_from:
+            events.append(("delta", self._field, "".join(self._value[self._delta_from:])))
+        events.append(("value", self._field, value))
+        self._value = []
+        self._state = _KEY
+
+    def _end_raw(self, events: List[FieldEvent]):
+        try:
+            text = "".join(self._value)
+            # Lists and objects get the LLM repairs; numbers and literals are plain JSON
+            value = parse_llm_json(text) if text[:1] in "{[" else json.loads(text)
+        except ValueError:
+            self.invalid += 1
+            self._value = []
+            return
+        self._end_field(value, events)
@@ -0,0 +1,156 @@
+"""
+Leaderboard Service
+
+QA leaderboards kept in Redis sorted sets:
+1. `leaderboard:qa:{qa_id}` - each user's best score on one QA set
+2. `leaderboard:global` - per user, the sum of their best scores across all QA sets
+
+Both are updated in the same code path that stores a QA result, so ranking
+never needs to read results back from the database. Top-N pages cost
+O(log n + N) and a single user's rank O(log n).
+
+Leaderboards are a derived view: if Redis is unavailable, result submission
+still succeeds and the sets can be repopulated with
+`python -m backend.scripts.rebuild_leaderboards`.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import redis.asyncio as aioredis
+from backend.database.redis_async import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "leaderboard"
+GLOBAL_KEY = f"{KEY_PREFIX}:global"
+
+# Keep the best score per user and move the global total by the improvement, atomically.
+# KEYS[1] = per-QA set, KEYS[2] = global set; ARGV[1] = score, ARGV[2] = user_id
+RECORD_BEST_SCORE = """
+local new = tonumber(ARGV[1])
+local old = redis.call('ZSCORE', KEYS[1], ARGV[2])
+if old and tonumber(old) >= new then
+    return 0
+end
+redis.call('ZADD', KEYS[1], new, ARGV[2])
+redis.call('ZINCRBY', KEYS[2], new - (tonumber(old) or 0), ARGV[2])
+return 1
+"""
+
+
+def qa_key(qa_id: str, prefix: str = KEY_PREFIX) -> str:
+    return f"{prefix}:qa:{qa_id}"
+
+
+class LeaderboardService:
+    def __init__(self):
+        self._record_script = None
+
+    def _client(self) -> Optional[aioredis.Redis]:
+        client = get_redis()
+        # Scripts are bound to a client; register again if the client was recreated
+        if client is not None and (self._record_script is None or self._record_script.registered_client is not client):
+            self._record_script = client.register_script(RECORD_BEST_SCORE)
+        return client
+
+    async def record_scores(self, qa_results: Iterable[Dict[str, Any]], prefix: str = KEY_PREFIX) -> int:
+        """Apply result documents to the leaderboards in one round trip.
+
+        Returns how many of them improved a user's best score.
+        """
+        client = self._client()
+        if client is None:
+            return 0
+        global_key = f"{prefix}:global"
+        pipe = client.pipeline(transaction=False)
+        queued = 0
+        for qa_result in qa_results:
+            if not qa_result.get("qa_id") or not qa_result.get("user_id"):
+                continue
+            await self._record_script(
+                keys=[qa_key(qa_result["qa_id"], prefix), global_key],
+                args=[float(qa_result.get("score") or 0.0), qa_result["user_id"]],
+                client=pipe,
+            )
+            queued += 1
+        if not queued:
+            return 0
+        return sum(await pipe.execute())
+
+    async def record_scores_safely(self, qa_results: List[Dict[str, Any]]):
+        """Leaderboard update on the submission path; never fails the submission"""
+        try:
+            await self.record_scores(qa_results)
+        except Exception as e:
+            logger.error(f"❌ Failed to update leaderboards: {e}")
+
+    async def _top(self, key: str, page: int, limit: int) -> Dict[str, Any]:
+        client = self._client()
+        if client is None:
+            return {"items": [], "total": 0, "page": page, "limit": limit, "total_pages": 0}
+        start = (page - 1) * limit
+        pipe = client.pipeline(transaction=False)
+        pipe.zrevrange(key, start, start + limit - 1, withscores=True)
+        pipe.zcard(key)
+        members, total = await pipe.execute()
+        items = [
+            {"rank": start + i + 1, "user_id": user_id, "score": score}
+            for i, (user_id, score) in enumerate(members)
+        ]
+        return {"items": items, "total": total, "page": page, "limit": limit, "total_pages": (total + limit - 1) // limit}
+
+    async def _rank(self, key: str, user_id: str) -> Optional[Dict[str, Any]]:
+        client = self._client()
+        if client is None:
+            return None
+        pipe = client.pipeline(transaction=False)
+        pipe.zrevrank(key, user_id)
+        pipe.zscore(key, user_id)
+        pipe.zcard(key)
+        rank, score, total = await pipe.execute()
+        if rank is None:
+            return None
+        return {"rank": rank + 1, "user_id": user_id, "score": score, "total": total}
+
+    async def get_qa_leaderboard(self, qa_id: str, page: int, limit: int) -> Dict[str, Any]:
+        return await self._top(qa_key(qa_id), page, limit)
+
+    async def get_global_leaderboard(self, page: int, limit: int) -> Dict[str, Any]:
+        return await self._top(GLOBAL_KEY, page, limit)
+
+    async def get_qa_rank(self, qa_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._rank(qa_key(qa_id), user_id)
+
+    async def get_global_rank(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._rank(GLOBAL_KEY, user_id)
+
+    async def swap_in(self, staging_prefix: str, qa_ids: Iterable[str]):
+        """Replace the live leaderboards with ones built under `staging_prefix`.
+
+        Each key is switched with RENAME, so readers see either the old or the
+        new set, never a partially built one. Live per-QA sets that were not
+        rebuilt (no results any more) are removed. Does nothing when Redis is
+        not configured.
+        """
+        client = self._client()
+        if client is None:
+            return
+        qa_ids = set(qa_ids)
+        pipe = client.pipeline(transaction=True)
+        for qa_id in qa_ids:
+            pipe.rename(qa_key(qa_id, staging_prefix), qa_key(qa_id))
+        if await client.exists(f"{staging_prefix}:global"):
+            pipe.rename(f"{staging_prefix}:global", GLOBAL_KEY)
+        else:
+            pipe.delete(GLOBAL_KEY)
+        await pipe.execute()
+
+        live_prefix = qa_key("")
+        stale = [key async for key in client.scan_iter(match=f"{live_prefix}*", count=500)
+                 if key[len(live_prefix):] not in qa_ids]
+        if stale:
+            await client.delete(*stale)
+
+
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,505 @@
+"""
+Single entry point for chat completions
+
+Article generation, QA generation and news paraphrasing all call the model
+through `llm_gateway`, which owns one AsyncAzureOpenAI client on a pooled
+HTTP client (LLM_MAX_CONNECTIONS) and one deployment (AZURE_OPENAI_DEPLOYMENT_NAME):
+
+- deadlines: every call has one (LLM_TIMEOUT_SECONDS unless the caller
+  passes timeout=) covering all attempts; streams also fail when no chunk
+  arrives for LLM_STREAM_IDLE_SECONDS
+- retries: 408/409/429/5xx, timeouts and connection errors are retried with
+  full-jitter exponential backoff; a Retry-After / retry-after-ms header is
+  honoured (capped at LLM_RETRY_MAX_SECONDS) and a retry that cannot finish
+  before the deadline is not attempted. A stream is only retried before its
+  first chunk
+- circuit breaker: LLM_BREAKER_FAILURES consecutive failed calls open it;
+  while open, calls raise CircuitOpenError at once, so callers fall back
+  (canned QA questions, an error response) instead of waiting on a
+  struggling endpoint. After LLM_BREAKER_RESET_SECONDS one trial call is
+  let through and closes it again on success. Other errors (400, content
+  filter) mean the endpoint answered and do not count
+- metrics: calls, retries, failures by cause, breaker state, tokens (prompt /
+  cached / completion) and latency, exposed by /metrics. With prompt= the
+  usage is also recorded per template version in the prompt registry
+
+LLM_BACKEND=fake swaps the endpoint for FakeLLMBackend: canned JSON shaped
+after the prompt's output format, with scriptable failures and latency, for
+running the services offline.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+import openai
+from openai import AsyncAzureOpenAI
+
+from backend.config.settings import SETTINGS
+from backend.monitoring.cosmos_metrics import Histogram
+from backend.service.prompt_registry import LLM_LATENCY_BUCKETS_MS, PromptTemplate, prompt_registry, usage_tokens
+
+RETRY_STATUSES = frozenset({408, 409, 429})  # Plus every 5xx
+
+
+class LLMUnavailableError(Exception):
+    """The model could not be asked: not configured, circuit open or deadline exceeded"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class DeadlineExceededError(LLMUnavailableError):
+    pass
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a failed request is worth retrying (and counts against the circuit breaker)"""
+    if isinstance(error, (asyncio.TimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status in RETRY_STATUSES or status >= 500)
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by the server (retry-after-ms, or Retry-After in seconds or as an HTTP date)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """closed -> open after `failures` consecutive failures -> half_open (one trial call) after reset_seconds"""
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.threshold = max(1, failures)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened = 0  # Times the circuit opened
+        self._opened_at = 0.0
+        self._trial = False
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self.state, self._trial = "half_open", False
+        if self.state == "half_open":
+            if self._trial:
+                return False  # One trial call at a time
+            self._trial = True
+        return True
+
+    @property
+    def is_open(self) -> bool:
+        """Calls are being rejected right now"""
+        return self.state == "open" and time.monotonic() - self._opened_at < self.reset_seconds
+
+    def release(self):
+        """A let-through call ended without reaching the endpoint"""
+        self._trial = False
+
+    def record_success(self):
+        self.state, self.consecutive_failures, self._trial = "closed", 0, False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial = False
+        if self.state == "half_open" or (self.state == "closed" and self.consecutive_failures >= self.threshold):
+            self.state, self._opened_at = "open", time.monotonic()
+            self.opened += 1
+            print(f"🔌 LLM gateway: circuit open after {self.consecutive_failures} failed calls "
+                  f"(retrying in {self.reset_seconds:g}s)")
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at)) if self.state == "open" else 0.0
+        return {"state": self.state, "consecutive_failures": self.consecutive_failures,
+                "opened": self.opened, "retry_in_seconds": round(retry_in, 1)}
+
+
+class GatewayStats:
+    def __init__(self):
+        self.calls = 0
+        self.streams = 0
+        self.succeeded = 0
+        self.retries = 0
+        self.failed: Dict[str, int] = {}  # By cause: timeout, connection, HTTP status, error class
+        self.rejected = 0  # Not sent: circuit open
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_ms = Histogram(LLM_LATENCY_BUCKETS_MS)
+
+    def record_failure(self, error: BaseException):
+        if isinstance(error, (asyncio.TimeoutError, DeadlineExceededError, openai.APITimeoutError)):
+            cause = "timeout"
+        elif isinstance(error, openai.APIConnectionError):
+            cause = "connection"
+        elif getattr(error, "status_code", None) is not None:
+            cause = str(error.status_code)
+        else:
+            cause = type(error).__name__
+        self.failed[cause] = self.failed.get(cause, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "streams": self.streams,
+            "succeeded": self.succeeded,
+            "retries": self.retries,
+            "failed": dict(self.failed),
+            "rejected_circuit_open": self.rejected,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_ms": self.latency_ms.snapshot(),
+        }
+
+
+class LLMGateway:
+    def __init__(self, backend: Any = None):
+        self._backend = backend
+        self.breaker = CircuitBreaker(SETTINGS.llm_breaker_failures, SETTINGS.llm_breaker_reset_seconds)
+        self.metrics = GatewayStats()
+
+    @property
+    def deployment(self) -> str:
+        return SETTINGS.llm_deployment
+
+    @property
+    def available(self) -> bool:
+        """Whether calls can be made at all (credentials configured, or the fake backend)"""
+        return self._backend is not None or SETTINGS.llm_backend == "fake" \
+            or bool(SETTINGS.azure_openai_key and SETTINGS.azure_openai_endpoint)
+
+    @property
+    def accepting(self) -> bool:
+        """available and the circuit is not open: a call would be attempted now"""
+        return self.available and not self.breaker.is_open
+
+    def _client(self) -> Any:
+        if self._backend is None:
+            if SETTINGS.llm_backend == "fake":
+                self._backend = FakeLLMBackend()
+            elif not self.available:
+                raise LLMUnavailableError("Azure OpenAI credentials not configured")
+            else:
+                # SDK retries are off: retries, deadlines and the breaker are handled here
+                self._backend = AsyncAzureOpenAI(
+                    api_key=SETTINGS.azure_openai_key,
+                    api_version=SETTINGS.azure_openai_api_version,
+                    azure_endpoint=SETTINGS.azure_openai_endpoint,
+                    max_retries=0,
+                    timeout=httpx.Timeout(SETTINGS.llm_timeout_seconds, connect=10.0),
+                    http_client=openai.DefaultAsyncHttpxClient(limits=httpx.Limits(
+                        max_connections=SETTINGS.llm_max_connections,
+                        max_keepalive_connections=SETTINGS.llm_max_connections,
+                    )),
+                )
+                print(f"🤖 LLM gateway: Azure OpenAI client initialized ({SETTINGS.azure_openai_endpoint}, "
+                      f"deployment {self.deployment})")
+        return self._backend
+
+    def use_backend(self, backend: Any):
+        """Replace the client (e.g. with a FakeLLMBackend in tests); resets breaker and metrics"""
+        self._backend = backend
+        self.breaker = CircuitBreaker(SETTINGS.llm_breaker_failures, SETTINGS.llm_breaker_reset_seconds)
+        self.reset()
+
+    async def complete(self, messages: List[Dict[str, str]], prompt: Optional[PromptTemplate] = None,
+                       timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        One chat completion (kwargs as for chat.completions.create; model defaults
+        to the deployment). Raises CircuitOpenError / DeadlineExceededError, or
+        the last API error once retries are exhausted.
+        """
+        self.metrics.calls += 1
+        started = time.perf_counter()
+        response = await self._request(messages, kwargs, timeout, started)
+        self.breaker.record_success()
+        self.metrics.succeeded += 1
+        self.metrics.latency_ms.observe((time.perf_counter() - started) * 1000)
+        self._record_usage(prompt, getattr(response, "usage", None), started)
+        return response
+
+    async def stream(self, messages: List[Dict[str, str]], prompt: Optional[PromptTemplate] = None,
+                     timeout: Optional[float] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Streamed chat completion: yields the chunks (the last one carries usage).
+        Opening the stream is retried like complete(); once chunks flow, a
+        stalled or broken stream raises instead, as its deltas were already used.
+        """
+        self.metrics.calls += 1
+        self.metrics.streams += 1
+        started = time.perf_counter()
+        kwargs = {**kwargs, "stream": True, "stream_options": {"include_usage": True}}
+        stream = await self._request(messages, kwargs, timeout, started)
+        self.breaker.record_success()  # The endpoint answered; a consumer may stop reading at any point
+        chunks = stream.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), SETTINGS.llm_stream_idle_seconds)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise DeadlineExceededError(f"LLM stream stalled for {SETTINGS.llm_stream_idle_seconds:g}s")
+                usage = getattr(chunk, "usage", None)
+                if usage:
+                    self._record_usage(prompt, usage, started)
+                yield chunk
+        except Exception as e:
+            self.metrics.record_failure(e)
+            if is_transient(e) or isinstance(e, DeadlineExceededError):
+                self.breaker.record_failure()
+            raise
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                await close()
+        self.metrics.succeeded += 1
+        self.metrics.latency_ms.observe((time.perf_counter() - started) * 1000)
+
+    async def _request(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any],
+                       timeout: Optional[float], started: float) -> Any:
+        """create() with the deadline, retries and breaker; returns the response (or stream)"""
+        if not self.breaker.allow():
+            self.metrics.rejected += 1
+            raise CircuitOpenError("LLM circuit open: endpoint failing, not sending the request")
+        try:
+            client = self._client()
+        except Exception:
+            self.breaker.release()
+            raise
+        try:
+            return await self._send(client, messages, kwargs, timeout, started)
+        except asyncio.CancelledError:
+            # Cancelled callers (a section task, a disconnected SSE client) must not keep the trial slot
+            self.breaker.release()
+            raise
+
+    async def _send(self, client: Any, messages: List[Dict[str, str]], kwargs: Dict[str, Any],
+                    timeout: Optional[float], started: float) -> Any:
+        """Attempts until success, a non-retryable error or the deadline; records the outcome on the breaker"""
+        request = {"model": self.deployment, **kwargs, "messages": messages}
+        budget = timeout or SETTINGS.llm_timeout_seconds
+        deadline = started + budget
+        attempt = 0
+        while True:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                return await asyncio.wait_for(client.chat.completions.create(**request), remaining)
+            except asyncio.TimeoutError:
+                error: Exception = DeadlineExceededError(f"LLM call exceeded its {budget:g}s deadline")
+            except Exception as e:
+                error = e
+            if isinstance(error, DeadlineExceededError) or not is_transient(error) \
+                    or attempt >= SETTINGS.llm_max_retries:
+                break
+            # Full jitter, unless the server said how long to wait
+            delay = retry_after_seconds(error)
+            if delay is None:
+                delay = random.uniform(0, SETTINGS.llm_retry_base_seconds * 2 ** attempt)
+            delay = min(delay, SETTINGS.llm_retry_max_seconds)
+            if time.perf_counter() + delay >= deadline:
+                break
+            attempt += 1
+            self.metrics.retries += 1
+            print(f"🔁 LLM gateway: {type(error).__name__} ({getattr(error, 'status_code', '-')}), "
+                  f"retry {attempt}/{SETTINGS.llm_max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        self.metrics.record_failure(error)
+        if is_transient(error) or isinstance(error, DeadlineExceededError):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()  # The endpoint answered (bad request, content filter ...)
+        raise error
+
+    def _record_usage(self, prompt: Optional[PromptTemplate], usage: Any, started: float):
+        tokens = usage_tokens(usage)
+        self.metrics.prompt_tokens += tokens["prompt_tokens"]
+        self.metrics.cached_prompt_tokens += tokens["cached_prompt_tokens"]
+        self.metrics.completion_tokens += tokens["completion_tokens"]
+        if prompt is not None:
+            prompt_registry.record(prompt, usage, started)
+
+    def stats(self) -> Dict[str, Any]:
+        backend = "fake" if isinstance(self._backend, FakeLLMBackend) or (
+            self._backend is None and SETTINGS.llm_backend == "fake") else "azure"
+        return {"backend": backend, "deployment": self.deployment, "available": self.available,
+                "breaker": self.breaker.snapshot(), **self.metrics.snapshot()}
+
+    def reset(self):
+        """Clear the metrics (the circuit breaker keeps its state)"""
+        self.metrics = GatewayStats()
+
+    async def close(self):
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+            print("🛑 LLM gateway client closed")
+
+
+# ---------------------------------------------------------------------------
+# Offline backend
+
+_FAKE_QUESTIONS = [
+    ("What problem does the article say the new approach solves?", "Slow manual review of every release"),
+    ("Which team first adopted the tool according to the text?", "The infrastructure group in Hanoi"),
+    ("How much did deployment time drop after the change?", "Roughly forty percent"),
+    ("Why were older clusters kept running during migration?", "Legacy billing jobs depended on them"),
+    ("What risk do the authors highlight for small startups?", "Vendor lock-in through proprietary APIs"),
+    ("Which metric improved most in the reported benchmark?", "Tail latency at the 99th percentile"),
+    ("When is the next major version expected to ship?", "Early next spring"),
+    ("Who funded the open source rewrite?", "A consortium of regional universities"),
+    ("What licence does the published dataset use?", "Creative Commons attribution"),
+    ("Which programming language powers the core engine?", "Rust, with Python bindings"),
+]
+_QUESTION_COUNT = re.compile(r"(?:exactly|QUESTIONS:)\s*(\d+)", re.I)
+
+
+def fake_response_text(messages: List[Dict[str, str]]) -> str:
+    """Deterministic JSON in the shape the system prompt asks for"""
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = next((m["content"] for m in messages if m["role"] == "user"), "")
+    if '"suggestions"' in system:
+        return json.dumps({"suggestions": [{
+            "title": f"Offline suggestion {i + 1}",
+            "description": "A canned suggestion from the fake LLM backend",
+            "article_type": ["informative", "tutorial", "opinion", "review", "news"][i],
+            "estimated_length": "medium",
+            "target_audience": "Software engineers",
+        } for i in range(5)]})
+    count = _QUESTION_COUNT.search(user)
+    questions = [{
+        "question_id": f"fake-{i + 1}",
+        "question": question,
+        "answer_a": answer,
+        "answer_b": "None of the options listed here",
+        "answer_c": "It is not discussed at all",
+        "answer_d": "Only in the appendix tables",
+        "correct_answer": "answer_a",
+        "explanation": f"The article states this directly: {answer.lower()}.",
+    } for i, (question, answer) in enumerate(_FAKE_QUESTIONS[:int(count.group(1)) if count else 5])]
+    if '"questions"' in system and '"content"' not in system:
+        return json.dumps({"questions": questions})
+    article = {
+        "title": "Offline article from the fake LLM backend",
+        "abstract": "A canned article returned while LLM_BACKEND=fake. It has the shape of a real response.",
+        "content": "<h2>Overview</h2><p>This content was produced without calling a model.</p>"
+                   "<p>It includes inline math $1/2$ and a <strong>formatted</strong> paragraph.</p>",
+        "tags": ["offline", "testing", "fake-llm"],
+    }
+    if '"questions"' in system:
+        article["questions"] = questions
+    return json.dumps(article, ensure_ascii=False)
+
+
+_STATUS_ERRORS = {
+    400: openai.BadRequestError, 401: openai.AuthenticationError, 403: openai.PermissionDeniedError,
+    404: openai.NotFoundError, 409: openai.ConflictError, 422: openai.UnprocessableEntityError,
+    429: openai.RateLimitError,
+}
+
+
+def _status_error(status: int) -> type:
+    """The exception class the SDK raises for an HTTP status"""
+    if status >= 500:
+        return openai.InternalServerError
+    return _STATUS_ERRORS.get(status, openai.APIStatusError)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeLLMBackend:
+    """
+    Stand-in for AsyncAzureOpenAI (chat.completions.create only), returning
+    responder(messages) - by default fake_response_text. Repeated system
+    prompts report cached prompt tokens like the real prompt cache (1024
+    tokens and up, in 128-token steps). fail() queues errors for the next
+    requests, latency_seconds delays each one.
+    """
+
+    def __init__(self, responder: Optional[Callable[[List[Dict[str, str]]], str]] = None,
+                 latency_seconds: float = 0.0, chunk_chars: int = 24):
+        self.responder = responder or fake_response_text
+        self.latency_seconds = latency_seconds
+        self.chunk_chars = chunk_chars
+        self.requests: List[Dict[str, Any]] = []
+        self._failures: List[BaseException] = []
+        self._seen_prefixes: set = set()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def fail(self, times: int = 1, status: int = 503, retry_after: Optional[float] = None):
+        """Make the next `times` requests fail with an HTTP status (and Retry-After header)"""
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        for _ in range(times):
+            response = httpx.Response(status, headers=headers,
+                                      request=httpx.Request("POST", "https://fake-llm.invalid/chat/completions"))
+            self._failures.append(_status_error(status)(f"Fake LLM error {status}", response=response, body=None))
+
+    def _usage(self, messages: List[Dict[str, str]], completion: str) -> SimpleNamespace:
+        prompt_tokens = sum(_estimate_tokens(m["content"]) for m in messages)
+        prefix = messages[0]["content"] if messages else ""
+        prefix_tokens = _estimate_tokens(prefix)
+        cached = prefix_tokens // 128 * 128 if prefix in self._seen_prefixes and prefix_tokens >= 1024 else 0
+        self._seen_prefixes.add(prefix)
+        completion_tokens = _estimate_tokens(completion)
+        return SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+        )
+
+    async def _create(self, messages: List[Dict[str, str]], stream: bool = False, **kwargs: Any) -> Any:
+        self.requests.append({"messages": messages, "stream": stream, **kwargs})
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self._failures:
+            raise self._failures.pop(0)
+        text = self.responder(messages)
+        usage = self._usage(messages, text)
+        if stream:
+            return self._stream(text, usage)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=text), finish_reason="stop")],
+            usage=usage,
+        )
+
+    async def _stream(self, text: str, usage: SimpleNamespace) -> AsyncIterator[Any]:
+        for i in range(0, len(text), self.chunk_chars):
+            await asyncio.sleep(0)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + self.chunk_chars]))],
+                                  usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+    async def close(self):
+        pass
+
+
+llm_gateway = LLMGateway()
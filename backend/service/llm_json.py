@@ -0,0 +1,166 @@
+"""
+Tolerant JSON extraction for LLM responses
+
+`parse_llm_json` finds the outermost JSON object (or array) in a completion,
+ignoring prose and code fences around it. A value that is valid JSON is
+decoded as written; otherwise it is repaired in one linear scan before a
+single `json.loads`:
+
+- brackets in prose before the object are skipped unless a key, value or
+  closing bracket follows them
+- raw control characters inside strings are escaped, so newlines in code
+  blocks survive as newlines
+- backslashes that do not form a JSON escape are kept as literal
+  backslashes, so LaTeX (\\alpha, \\frac, \\times ...) comes through as written.
+  "\\b", "\\f", "\\n", "\\r", "\\t" are only read as LaTeX when they start one
+  of LATEX_COMMANDS (\\beta, \\frac, \\nabla, \\rho, \\theta ...), so "\\nsecond
+  line" stays a newline; "\\u" without four hex digits is LaTeX too (\\underline)
+- a double quote inside a string that is not followed by , : } or ] is
+  escaped instead of ending the string
+- trailing and doubled commas are dropped
+
+Runs of ordinary characters are skipped with regexes, so only structural
+characters and escapes go through the Python loop. Used for every model
+response parsed as JSON: article generation and suggestions, QA generation
+(including the streamed parsers) and news paraphrasing.
+"""
+
+import json
+import re
+from typing import Any, List
+
+_STRUCTURE = re.compile(r'["{}\[\],]')
+_STRING_RUN = re.compile(r'[^"\\\x00-\x1f]+')
+_AFTER_STRING = re.compile(r'\s*(.|$)', re.S)
+_HEX4 = re.compile(r'[0-9a-fA-F]{4}')
+_LETTERS = re.compile(r'[A-Za-z]*')
+# An opening bracket that starts JSON rather than prose like "{see below}"
+_JSON_START = re.compile(r'\{\s*["}]|\[\s*["{\[\]\d-]')
+
+JSON_ESCAPES = '"\\/'
+CONTROL_ESCAPES = "bfnrt"  # Also start LaTeX commands
+# LaTeX commands that begin with a JSON control escape letter. Only these names
+# (followed by a non-letter) keep their backslash; anything else is the escape
+LATEX_COMMANDS = frozenset((
+    "backslash", "bar", "begin", "beta", "big", "bigcap", "bigcup", "binom", "bmod", "boldsymbol", "bot", "bullet",
+    "flat", "forall", "frac", "frown",
+    "nabla", "natural", "ne", "nearrow", "neg", "neq", "newline", "nexists", "ngeq", "nleq", "nmid", "noindent",
+    "nonumber", "not", "notin", "nu", "nwarrow",
+    "rangle", "rbrace", "rceil", "rfloor", "rho", "right", "rightarrow",
+    "tan", "tanh", "tau", "text", "textbf", "textit", "textrm", "texttt", "tfrac", "therefore", "theta", "tilde",
+    "times", "to", "top", "triangle",
+))
+_CONTROL_CHAR_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_STRING_END_FOLLOWERS = frozenset(',:}]')
+_DECODER = json.JSONDecoder()
+
+
+def is_latex_command(letter: str, following: str) -> bool:
+    """Whether backslash + letter + following starts a LaTeX command rather than a JSON escape.
+
+    following is what comes after the letter: for a control escape at least
+    the run of ASCII letters up to the next non-letter, for "u" four characters.
+    """
+    if letter in CONTROL_ESCAPES:
+        return letter + _LETTERS.match(following).group() in LATEX_COMMANDS
+    if letter == "u":
+        return not _HEX4.match(following)
+    return letter not in JSON_ESCAPES
+
+
+def _find_start(text: str) -> int:
+    match = _JSON_START.search(text)
+    if match:
+        return match.start()
+    obj, arr = text.find("{"), text.find("[")
+    if obj < 0:
+        return arr
+    return obj if arr < 0 or obj < arr else arr
+
+
+def repair_llm_json(text: str) -> str:
+    """The outermost JSON value of text, repaired into valid JSON (raises JSONDecodeError if there is none)"""
+    start = _find_start(text) if text else -1
+    if start < 0:
+        raise json.JSONDecodeError("No JSON object found", text or "", 0)
+    out: List[str] = []
+    depth = 0
+    pending_comma = False
+    i, end = start, len(text)
+    while i < end:
+        match = _STRUCTURE.search(text, i)
+        if match is None:
+            break
+        between = text[i:match.start()]
+        if pending_comma and between.strip():
+            # A bare value (number, true, null) follows the comma
+            out.append(",")
+            pending_comma = False
+        out.append(between)
+        c = match.group()
+        i = match.end()
+        if c == ",":
+            pending_comma = True  # Emitted only if another value follows
+            continue
+        if c in "}]":
+            pending_comma = False
+            out.append(c)
+            depth -= 1
+            if depth == 0:
+                return "".join(out)
+            continue
+        if pending_comma:
+            out.append(",")
+            pending_comma = False
+        out.append(c)
+        if c != '"':
+            depth += 1
+            continue
+        i = _scan_string(text, i, out)
+    raise json.JSONDecodeError("Unterminated JSON value", text, len(text))
+
+
+def _scan_string(text: str, i: int, out: List[str]) -> int:
+    """Copy a string body starting at i (after the opening quote); returns the index after its closing quote"""
+    end = len(text)
+    while i < end:
+        run = _STRING_RUN.match(text, i)
+        if run:
+            out.append(run.group())
+            i = run.end()
+            if i >= end:
+                break
+        c = text[i]
+        if c == '"':
+            follower = _AFTER_STRING.match(text, i + 1).group(1)
+            if follower in _STRING_END_FOLLOWERS or not follower:
+                out.append('"')
+                return i + 1
+            out.append('\\"')  # Unescaped quote inside the value
+            i += 1
+        elif c == "\\":
+            letter = text[i + 1:i + 2]
+            if not letter:
+                out.append("\\\\")
+                i += 1
+            elif is_latex_command(letter, text[i + 2:i + 6] if letter == "u" else _LETTERS.match(text, i + 2).group()):
+                out.append("\\\\")  # Literal backslash; the command letters follow as text
+                i += 1
+            else:
+                out.append("\\" + letter)
+                i += 2
+        else:
+            out.append(_CONTROL_CHAR_ESCAPES.get(c) or f"\\u{ord(c):04x}")
+            i += 1
+    return i
+
+
+def parse_llm_json(text: str) -> Any:
+    """The outermost JSON value in an LLM response, decoded strictly if it is valid JSON and repaired otherwise"""
+    start = _find_start(text) if text else -1
+    if start >= 0:
+        try:
+            return _DECODER.raw_decode(text, start)[0]
+        except ValueError:
+            pass
+    return json.loads(repair_llm_json(text))
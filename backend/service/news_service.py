@@ -5,20 +5,28 @@ This module provides functionality to:
 1. Fetch news from News API
 2. Extract full article content using newspaper3k
 3. Paraphrase content using OpenAI API
+4. Optionally (NEWS_INGEST_QA) write a QA set in the same call, so the source
+   text is read by the model once and the pending article comes with its quiz
 """
 
 import asyncio
 from email.mime import image
 import json
-import os
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
 from xml import dom
 from newsapi import NewsApiClient
 from newspaper import Article
-from openai import AsyncAzureOpenAI
 import requests
 from backend.config.settings import SETTINGS
+from backend.service.content_processor import process_content
+from backend.service.job_service import job_manager
+from backend.service.llm_gateway import llm_gateway
+from backend.service.llm_json import parse_llm_json
+from backend.service.prompt_registry import PromptTemplate, prompt_registry, usage_tokens
+from backend.service.qa_generation_service import qa_generation_service
+from backend.service.redis_article_service import redis_article_service
+from backend.service.text_normalizer import normalize_text
 
 import ssl
 
@@ -43,30 +51,90 @@ else:
 # Initialize News API client
 newsapi_client = NewsApiClient(api_key=SETTINGS.newsapi_key) if SETTINGS.newsapi_key else None
 
-# Initialize Azure OpenAI client (same as QA service)
-def _init_openai_client():
-    """Initialize Azure OpenAI client using same pattern as QA service"""
-    try:
-        if not SETTINGS.azure_openai_key or not SETTINGS.azure_openai_endpoint:
-            print("Warning: Azure OpenAI credentials not configured")
-            return None
-            
-        kwargs = {
-            "api_key": SETTINGS.azure_openai_key,
-            "api_version": SETTINGS.azure_openai_api_version,
-            "azure_deployment": "gpt-4o-mini",
-            "azure_endpoint": SETTINGS.azure_openai_endpoint
-        }
-        
-        client = AsyncAzureOpenAI(**kwargs)
-        print("Info: Azure OpenAI client initialized for news service")
-        return client
-        
-    except Exception as e:
-        print(f"Error: Failed to initialize Azure OpenAI client: {e}")
-        return None
+_PARAPHRASE_SYSTEM = """You are a professional journalist and senior editor with deep expertise in Vietnamese translation and content adaptation. Always translate completely and maintain the full length and depth of the original content. Never truncate or shorten the content. Always strictly adhere to the required JSON format. Never add markdown, comments, or any text other than standard JSON.
+
+You are a professional journalist and experienced editor. Your task is to translate and adapt the article given after these instructions for Vietnamese readers while maintaining accuracy and completeness.
 
-openai_client = _init_openai_client()
+TRANSLATION AND ADAPTATION PRINCIPLES:
+- ALWAYS translate the content into Vietnamese regardless of the input language
+- Maintain the accuracy and objectivity of the original information
+- Preserve proper names, company names, numbers, and technical terms (but provide Vietnamese context where helpful)
+- Create well-structured HTML content with appropriate formatting tags
+- Ensure the translated content is COMPLETE and maintains the same length and depth as the original
+- DO NOT TRUNCATE OR SHORTEN THE CONTENT - translate everything from the original
+- If the original content has multiple sections, translate ALL sections
+- Use natural Vietnamese writing style while preserving technical accuracy
+- Return the exact JSON format as required
+
+IMPORTANT: The Vietnamese translation must be as comprehensive and detailed as the original content. Do not summarize or shorten - translate everything.
+
+TAG GENERATION GUIDELINES:
+- NOTE THAT THE TAGS SHOULD BE ENGLISH NOT VIETNAMESE
+- Create 3-7 relevant tags that match the content topic
+- Tags are 1-3 words maximum
+- Use lowercase with hyphens between words (e.g., "machine-learning", "data-science", "ai")
+- Are relevant to the content topic
+- Complement the existing tags (avoid duplicates)
+- Are useful for article categorization
+- Follow format: single-word OR word-word OR word-word-word
+- Examples: "artificial-intelligence", "blockchain", "startup", "healthcare", "education", "fintech"
+{quiz_guidelines}
+REQUIRED JSON FORMAT (MANDATORY):
+{{
+  "title": "Concise and engaging title in Vietnamese (max 80 characters)",
+  "tags": ["tag1", "tag2", "tag3", "tag4", "tag5"],
+  "abstract": "Brief 2-3 sentence summary in Vietnamese, highlighting key points",
+  "content": "<p>Engaging opening paragraph in Vietnamese introducing the topic...</p><h3>Subheading if needed (in Vietnamese)</h3><p>Detailed content completely translated into Vietnamese, using HTML tags like <strong>, <em>, <h3> for formatting. Split into multiple <p> paragraphs for readability. ENSURE COMPLETE TRANSLATION - do not truncate or shorten the content.</p><p><strong>Nguồn:</strong> <a href=\\"SOURCE_URL\\" target=\\"_blank\\">SOURCE_NAME</a></p>"{quiz_format}
+}}
+"""
+
+# Added to the translation instructions when a QA set is written in the same pass
+INGEST_QA_GUIDELINES = """
+QUIZ GUIDELINES:
+- Also write the requested number of multiple-choice questions in Vietnamese that test comprehension of your translated article
+- Cover different aspects (main ideas, specific facts and figures, implications) and mix difficulty levels
+- Each question has exactly 4 options; only ONE is definitively correct, the others are plausible but clearly wrong to someone who read the article
+- The explanation (in Vietnamese) says why the correct answer is right, referring to the article
+- DO NOT include any hints, checkmarks or asterisks showing which answer is correct
+"""
+
+INGEST_QA_FORMAT = """,
+  "questions": [
+    {
+      "question": "Clear, specific question in Vietnamese",
+      "answer_a": "First option",
+      "answer_b": "Second option",
+      "answer_c": "Third option",
+      "answer_d": "Fourth option",
+      "correct_answer": "answer_a|answer_b|answer_c|answer_d",
+      "explanation": "Why the correct answer is right, in Vietnamese"
+    }
+  ]"""
+
+_PARAPHRASE_USER = """ORIGINAL ARTICLE:
+Title: {title}
+Abstract: {abstract}
+Content: {content}
+Original Keywords: {keywords}
+
+SOURCE_URL: {source_url}
+SOURCE_NAME: {source_name}
+"""
+
+# With and without the quiz: each variant has its own static prefix
+NEWS_PARAPHRASE_PROMPT = prompt_registry.register(PromptTemplate(
+    name="news_paraphrase",
+    system=_PARAPHRASE_SYSTEM.format(quiz_guidelines="", quiz_format=""),
+    user=_PARAPHRASE_USER,
+))
+NEWS_PARAPHRASE_QA_PROMPT = prompt_registry.register(PromptTemplate(
+    name="news_paraphrase_qa",
+    system=_PARAPHRASE_SYSTEM.format(quiz_guidelines=INGEST_QA_GUIDELINES, quiz_format=INGEST_QA_FORMAT),
+    user=_PARAPHRASE_USER + "NUMBER OF QUESTIONS: {num_questions}\n",
+))
+
+# Completion budget per question on top of the translation
+INGEST_QA_TOKENS_PER_QUESTION = 300
 
 def fetch_news_from_newsapi() -> List[Dict[str, Any]]:
     # Improved query focused on AI and IT topics
@@ -153,12 +221,17 @@ def fetch_news_from_newsapi() -> List[Dict[str, Any]]:
         return []
 
 
+def _download_and_parse(article: Article):
+    article.download()
+    article.parse()
+    article.nlp()
+
+
 async def extract_article_content(url: str) -> Optional[Dict[str, Any]]:
     try:
         article = Article(url)
-        article.download()
-        article.parse()
-        article.nlp()
+        # newspaper3k is blocking (HTTP download + NLP): keep it off the event loop
+        await asyncio.to_thread(_download_and_parse, article)
         
         extracted_data = {
             'url': url,
@@ -182,8 +255,8 @@ async def extract_article_content(url: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-async def paraphrase_article(title: str, abstract: str, content: str, keywords: List[str], source_name: str, source_url: str, max_tokens: int = 8000) -> Optional[Dict[str, Any]]:
-    if not openai_client:
+async def paraphrase_article(title: str, abstract: str, content: str, keywords: List[str], source_name: str, source_url: str, max_tokens: int = 8000, num_questions: int = 0) -> Optional[Dict[str, Any]]:
+    if not llm_gateway.available:
         print("Warning: Azure OpenAI client not configured - skipping paraphrasing")
         return None
         
@@ -197,61 +270,26 @@ async def paraphrase_article(title: str, abstract: str, content: str, keywords:
         
         # Log what we're sending to AI for debugging
 
-        prompt = f"""
-You are a professional journalist and experienced editor. Your task is to translate and adapt the given article for Vietnamese readers while maintaining accuracy and completeness.
-
-TRANSLATION AND ADAPTATION PRINCIPLES:
-- ALWAYS translate the content into Vietnamese regardless of the input language
-- Maintain the accuracy and objectivity of the original information
-- Preserve proper names, company names, numbers, and technical terms (but provide Vietnamese context where helpful)
-- Create well-structured HTML content with appropriate formatting tags
-- Ensure the translated content is COMPLETE and maintains the same length and depth as the original
-- DO NOT TRUNCATE OR SHORTEN THE CONTENT - translate everything from the original
-- If the original content has multiple sections, translate ALL sections
-- Use natural Vietnamese writing style while preserving technical accuracy
-- Return the exact JSON format as required
-
-IMPORTANT: The Vietnamese translation must be as comprehensive and detailed as the original content. Do not summarize or shorten - translate everything.
-
-ORIGINAL ARTICLE:
-Title: {title}
-Abstract: {abstract}
-Content: {content}
-Original Keywords: {keywords}
-
-TAG GENERATION GUIDELINES:
-- NOTE THAT THE TAGS SHOULD BE ENGLISH NOT VIETNAMESE
-- Create 3-7 relevant tags that match the content topic
-- Tags are 1-3 words maximum
-- Use lowercase with hyphens between words (e.g., "machine-learning", "data-science", "ai")
-- Are relevant to the content topic
-- Complement the existing tags (avoid duplicates)
-- Are useful for article categorization
-- Follow format: single-word OR word-word OR word-word-word
-- Examples: "artificial-intelligence", "blockchain", "startup", "healthcare", "education", "fintech"
+        # With num_questions, the quiz comes out of the same call: no second read of the article
+        template = NEWS_PARAPHRASE_QA_PROMPT if num_questions else NEWS_PARAPHRASE_PROMPT
+        messages = template.messages(
+            title=title, abstract=abstract, content=content, keywords=keywords,
+            source_url=source_url, source_name=source_name, num_questions=num_questions
+        )
 
-REQUIRED JSON FORMAT (MANDATORY):
-{{
-  "title": "Concise and engaging title in Vietnamese (max 80 characters)",
-  "tags": ["tag1", "tag2", "tag3", "tag4", "tag5"],
-  "abstract": "Brief 2-3 sentence summary in Vietnamese, highlighting key points",
-  "content": "<p>Engaging opening paragraph in Vietnamese introducing the topic...</p><h3>Subheading if needed (in Vietnamese)</h3><p>Detailed content completely translated into Vietnamese, using HTML tags like <strong>, <em>, <h3> for formatting. Split into multiple <p> paragraphs for readability. ENSURE COMPLETE TRANSLATION - do not truncate or shorten the content.</p><p><strong>Nguồn:</strong> <a href=\\"{source_url}\\" target=\\"_blank\\">{source_name}</a></p>"
-}}
-"""
-        
-        # Use same model as QA service
-        response = await openai_client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": "You are a professional journalist and senior editor with deep expertise in Vietnamese translation and content adaptation. Always translate completely and maintain the full length and depth of the original content. Never truncate or shorten the content. Always strictly adhere to the required JSON format. Never add markdown, comments, or any text other than standard JSON."},
-                {"role": "user", "content": prompt}
-            ],
+        response = await llm_gateway.complete(
+            messages,
+            prompt=template,
             max_tokens=max_tokens,
             temperature=0.3  # Lower temperature for more consistent output
         )
         
         paraphrased_response = response.choices[0].message.content.strip()
-        return json.loads(paraphrased_response)
+        paraphrased_data = parse_llm_json(paraphrased_response)
+        if isinstance(paraphrased_data.get("content"), str):
+            paraphrased_data["content"] = process_content(paraphrased_data["content"])
+        paraphrased_data["_usage"] = usage_tokens(getattr(response, "usage", None))
+        return paraphrased_data
 
     except Exception as e:
         print(f"Warning: Error paraphrasing content: {str(e)} - continuing without paraphrasing")
@@ -275,15 +313,17 @@ async def process_single_article(article_data: Dict[str, Any]) -> Optional[Dict[
     image = article_data.get('urlToImage')
     
     # Prepare data for paraphrasing
-    title = article_data.get('title', '')
-    abstract = extracted_content.get('summary') or article_data.get('description', '')
-    content = extracted_content.get('text', '')
+    title = normalize_text(article_data.get('title', ''), keep_paragraphs=False)
+    abstract = normalize_text(extracted_content.get('summary') or article_data.get('description', ''), keep_paragraphs=False)
+    content = normalize_text(extracted_content.get('text', ''))
     keywords = extracted_content.get('keywords', []) or []
     
     # Paraphrase the article with higher token limit for long content
     # Calculate appropriate max_tokens based on content length
     content_length = len(content.split())
     max_tokens = max(6000, min(12000, content_length * 2))  # Allow 2 tokens per word, cap at 12000
+    num_questions = SETTINGS.news_ingest_qa_questions if SETTINGS.news_ingest_qa else 0
+    max_tokens += num_questions * INGEST_QA_TOKENS_PER_QUESTION
     
     paraphrased_data = await paraphrase_article(
         title=title,
@@ -292,7 +332,8 @@ async def process_single_article(article_data: Dict[str, Any]) -> Optional[Dict[
         keywords=keywords,
         source_name=source_name,
         source_url=source_url,
-        max_tokens=max_tokens
+        max_tokens=max_tokens,
+        num_questions=num_questions
     )
 
     if paraphrased_data:
@@ -304,15 +345,34 @@ async def process_single_article(article_data: Dict[str, Any]) -> Optional[Dict[
             "content": paraphrased_data.get('content', content),
             "image": image,
         }
+        if num_questions:
+            result["qa"] = await _ingest_qa(result, paraphrased_data, num_questions)
         return result
     else:
         return None
 
  
+async def _ingest_qa(article: Dict[str, Any], paraphrased_data: Dict[str, Any], num_questions: int) -> Optional[Dict[str, Any]]:
+    """Validated questions from the translation call, kept with the pending article"""
+    questions = qa_generation_service.validate_questions(paraphrased_data.get("questions"))[:num_questions]
+    if not questions:
+        print(f"Warning: No valid questions in the translation response for '{article['title'][:50]}'")
+        return None
+    # Generating QA later for the unedited article (same defaults) is then a cache hit
+    await qa_generation_service.prime_cache(
+        article["title"], article["abstract"], article["content"], num_questions, questions
+    )
+    return {
+        "questions": questions,
+        "generated_at": datetime.utcnow().isoformat(),
+        "usage": paraphrased_data.get("_usage"),
+    }
+
+ 
 async def fetch_and_process_news() -> List[Dict[str, Any]]:
 
     try:
-        articles = fetch_news_from_newsapi()
+        articles = await asyncio.to_thread(fetch_news_from_newsapi)
         if not articles:
             print("Warning: No articles fetched from News API")
             return []
@@ -341,3 +401,11 @@ async def fetch_and_process_news() -> List[Dict[str, Any]]:
         return []
 
 
+async def _run_news_job(payload: Dict[str, Any], progress) -> List[Dict[str, Any]]:
+    articles = await fetch_and_process_news()
+    await asyncio.to_thread(redis_article_service.save_pending_articles, articles)
+    return articles
+
+
+# A completed fetch is never reused: only a fetch already in progress is shared
+job_manager.register("news_fetch", _run_news_job, dedupe_completed=False)
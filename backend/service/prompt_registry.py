@@ -0,0 +1,126 @@
+"""
+Versioned LLM prompt templates
+
+Providers cache the longest previously seen prompt prefix (Azure OpenAI /
+OpenAI from 1024 tokens, in 128-token steps) and bill cached tokens at a
+discount with lower latency. That only works if every call to a template
+starts with the same bytes, so each template is split in two messages:
+
+- system: all static instructions, examples and the output format. It is
+  never formatted, so it is byte-identical across calls (braces in it are
+  literal)
+- user: the per-call part (article text, query, counts, options), a
+  str.format template placed after the static prefix
+
+A template's version is a hash of both parts: generation caches key on it, so
+editing a prompt never serves output of the old one. Every call records its
+prompt tokens, the cached share reported by the provider, completion tokens
+and latency per name@version, exposed by /metrics to compare versions.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from backend.monitoring.cosmos_metrics import Histogram
+from backend.service.generation_cache import content_hash
+
+LLM_LATENCY_BUCKETS_MS = [250, 500, 1000, 2500, 5000, 10000, 20000, 40000, 60000, 120000]
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    system: str
+    user: str
+
+    @property
+    def version(self) -> str:
+        return content_hash(self.name, self.system, self.user)[:12]
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def messages(self, **values: Any) -> List[Dict[str, str]]:
+        """Chat messages: the static prefix as is, then the filled user template"""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user.format(**values)},
+        ]
+
+
+class PromptStats:
+    """Token and latency totals for one template version"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_ms = Histogram(LLM_LATENCY_BUCKETS_MS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "uncached_prompt_tokens": self.prompt_tokens - self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "prompt_cache_ratio": round(self.cached_prompt_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+            "latency_ms": self.latency_ms.snapshot(),
+        }
+
+
+def usage_tokens(usage: Any) -> Dict[str, int]:
+    """prompt / cached / completion tokens of an OpenAI usage object (zeros when missing)"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_prompt_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._stats: Dict[str, PromptStats] = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        if template.name in self._templates and self._templates[template.name] != template:
+            raise ValueError(f"Prompt template '{template.name}' is already registered")
+        self._templates[template.name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def record(self, template: PromptTemplate, usage: Any, started: float):
+        """Account one completion; started is the time.perf_counter() before the request"""
+        stats = self._stats.get(template.key)
+        if stats is None:
+            stats = self._stats[template.key] = PromptStats()
+        tokens = usage_tokens(usage)
+        stats.calls += 1
+        stats.prompt_tokens += tokens["prompt_tokens"]
+        stats.cached_prompt_tokens += tokens["cached_prompt_tokens"]
+        stats.completion_tokens += tokens["completion_tokens"]
+        stats.latency_ms.observe((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "version": template.version,
+                "static_prefix_chars": len(template.system),
+                "usage": {key.split("@", 1)[1]: stats.snapshot()
+                          for key, stats in self._stats.items() if key.split("@", 1)[0] == name},
+            }
+            for name, template in self._templates.items()
+        }
+
+    def reset(self):
+        self._stats.clear()
+
+
+prompt_registry = PromptRegistry()
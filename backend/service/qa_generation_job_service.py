@@ -0,0 +1,124 @@
+"""
+QA generation jobs
+
+Two job kinds on the shared job manager (see job_service):
+
+- "qa_generation": one QA set for one article; the job result is what
+  POST /api/qa-generation/ returns.
+- "qa_generation_batch": many articles (full payloads, or just ids that
+  are looked up in the articles container). Each set is generated through a
+  bounded worker pool and saved with `qa_service.create_question`, like a set
+  saved from the editor. A set that only came back as the template fallback
+  counts as failed and is not saved. Progress reports done, failed, tokens
+  used and a per-article outcome.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from backend.config.settings import SETTINGS
+from backend.repository.article_repo import find_article_by_id
+from backend.service.job_service import job_manager
+from backend.service.qa_generation_service import qa_generation_service
+from backend.service.qa_service import create_question
+
+
+async def _resolve_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill title / abstract / content from the articles container when only an id was given"""
+    if any(article.get(f) for f in ("title", "abstract", "content")):
+        return article
+    stored = await find_article_by_id(article["article_id"])
+    if not stored:
+        raise ValueError(f"Article {article['article_id']} not found")
+    return {**article, **{f: stored.get(f) or "" for f in ("title", "abstract", "content")}}
+
+
+async def _generate(article: Dict[str, Any], num_questions: int, bypass_cache: bool,
+                    sectioned: Optional[bool] = None, allow_fallback: bool = True) -> Dict[str, Any]:
+    result = await qa_generation_service.generate_qa_test(
+        article_id=article["article_id"],
+        title=article.get("title") or "",
+        abstract=article.get("abstract") or "",
+        content=article.get("content") or "",
+        num_questions=article.get("num_questions") or num_questions,
+        bypass_cache=bypass_cache,
+        sectioned=sectioned,
+    )
+    if not result.get("success"):
+        raise RuntimeError(result.get("error", "QA generation failed"))
+    # The fallback is a generic template set, only useful as a starting point in the editor
+    if not allow_fallback and result.get("method_used") == "fallback":
+        raise RuntimeError(result.get("warning") or "QA generation fell back to template questions")
+    return result
+
+
+async def _run_single(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    result = await _generate(payload, payload["num_questions"], payload["bypass_cache"], payload.get("sectioned"))
+    await progress(tokens_used=result.get("tokens_used") or 0)
+    return {k: result.get(k) for k in ("data", "questions_count", "estimated_time_minutes", "method_used", "warning")}
+
+
+async def _run_batch(payload: Dict[str, Any], progress) -> Dict[str, Any]:
+    articles = payload["articles"]
+    state = {
+        "total": len(articles),
+        "done": 0,
+        "failed": 0,
+        "tokens_used": 0,
+        "items": [{"index": i, "article_id": a["article_id"], "status": "queued"} for i, a in enumerate(articles)],
+    }
+    await progress(**state)
+    semaphore = asyncio.Semaphore(max(1, SETTINGS.qa_generation_batch_concurrency))
+
+    async def generate_one(item: Dict[str, Any], article: Dict[str, Any]):
+        async with semaphore:
+            item["status"] = "running"
+            try:
+                article = await _resolve_article(article)
+                result = await _generate(article, payload["num_questions"], payload["bypass_cache"],
+                                         payload.get("sectioned"), allow_fallback=False)
+                qa_data = result["data"]
+                # Same id scheme the editor uses when saving a generated set
+                qa_data["id"] = f"qa_{article['article_id']}_{int(time.time() * 1000)}_{uuid.uuid4().hex[:9]}"
+                created = await create_question(qa_data)
+
+                tokens = result.get("tokens_used") or 0
+                item.update(status="done", qa_id=created["id"], method_used=result.get("method_used"),
+                            tokens_used=tokens, duplicates=created.get("duplicates"))
+                state["done"] += 1
+                state["tokens_used"] += tokens
+            except Exception as e:
+                item.update(status="failed", error=str(e))
+                state["failed"] += 1
+            await progress(**state)
+
+    await asyncio.gather(*(generate_one(item, article) for item, article in zip(state["items"], articles)))
+    return {k: state[k] for k in ("total", "done", "failed", "tokens_used")}
+
+
+job_manager.register("qa_generation", _run_single)
+job_manager.register("qa_generation_batch", _run_batch)
+
+
+async def start_qa_generation_job(article: Dict[str, Any], num_questions: int,
+                                  bypass_cache: bool = False) -> Dict[str, Any]:
+    """Schedule generation of one QA set; returns the job record immediately"""
+    payload = {**article, "num_questions": num_questions, "bypass_cache": bypass_cache}
+    # bypass_cache asks for a fresh generation, so never hand back an earlier job
+    return await job_manager.submit("qa_generation", payload, dedupe=not bypass_cache)
+
+
+async def start_generation_job(articles: List[Dict[str, Any]], num_questions: int,
+                               bypass_cache: bool = False, sectioned: Optional[bool] = None) -> Dict[str, Any]:
+    """Schedule QA generation for many articles; returns the job record immediately"""
+    payload = {"articles": articles, "num_questions": num_questions, "bypass_cache": bypass_cache, "sectioned": sectioned}
+    return await job_manager.submit("qa_generation_batch", payload, dedupe=not bypass_cache)
+
+
+async def get_generation_job(job_id: str, include_items: bool = True) -> Optional[Dict[str, Any]]:
+    job = await job_manager.get(job_id)
+    if job is not None and not include_items:
+        job["progress"] = {k: v for k, v in (job.get("progress") or {}).items() if k != "items"}
+    return job
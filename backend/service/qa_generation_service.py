@@ -5,36 +5,47 @@ Generates multiple-choice questions with explanations based on article content
 
 import asyncio
 import json
-import os
+import math
 import re
 import uuid
-from typing import List, Dict, Any, Optional
-from openai import AsyncAzureOpenAI
+from itertools import zip_longest
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
 from backend.config.settings import SETTINGS
+from backend.service.generation_cache import content_hash, create_generation_cache
+from backend.service.json_stream import JsonArrayStreamParser
+from backend.service.llm_gateway import LLMUnavailableError, llm_gateway
+from backend.service.llm_json import parse_llm_json
+from backend.service.prompt_registry import PromptTemplate, prompt_registry
+from backend.service.question_similarity import Signature, signature, similarity
+from backend.service.text_normalizer import normalize_text, truncate_at_sentence
 
 # QA Generation Configuration
 QA_GENERATION_CONFIG = {
     "default_questions_count": 5,
     "min_questions_count": 3,
     "max_questions_count": 100,
-    "max_content_length": 8000,
+    "max_content_length": 8000,  # Single-call mode: content beyond this is cut
     "max_title_length": 1000,
     "max_abstract_length": 4000,
     "time_per_question_seconds": 5,
+    # Sectioned (map-reduce) mode for long articles / large question counts
+    "max_sectioned_content_length": 120000,
+    "max_questions_per_call": 15,
+    "section_max_tokens": 1500,
+    "chars_per_token": 4,  # Rough estimate for English prose
+    "min_section_chars": 1500,
+    "section_extra_ratio": 0.3,  # Over-generate per section so duplicates can be dropped
+    "section_concurrency": 8,
     "difficulty_levels": ["easy", "medium", "hard"],
     "question_types": ["factual", "conceptual", "analytical"]
 }
 
-QA_GENERATION_PROMPT = """
-You are an expert educational content creator. Generate high-quality multiple-choice questions based on the provided article content.
+QA_GENERATION_PROMPT = prompt_registry.register(PromptTemplate(
+    name="qa_generation",
+    system="""You are an expert educational content creator. Generate high-quality multiple-choice questions based on the article given after these instructions.
 
-**ARTICLE INFORMATION:**
-Title: {title}
-Abstract: {abstract}
-Content: {content}
-
-**TASK:** Create {num_questions} multiple-choice questions that test comprehension of this article.
+**TASK:** Create the requested number of multiple-choice questions that test comprehension of this article.
 
 **CHAIN OF THOUGHT APPROACH:**
 1. **Content Analysis**: Identify key concepts, main ideas, specific facts, and important details
@@ -82,9 +93,9 @@ Explanation: "The article presents evidence that user-centered design improvemen
 **OUTPUT FORMAT:**
 Return ONLY a valid JSON object with this exact structure:
 
-{{
+{
   "questions": [
-    {{
+    {
       "question_id": "uuid-string",
       "question": "Clear, specific question text",
       "answer_a": "First option",
@@ -93,12 +104,12 @@ Return ONLY a valid JSON object with this exact structure:
       "answer_d": "Fourth option",
       "correct_answer": "answer_a|answer_b|answer_c|answer_d",
       "explanation": "Clear explanation of why the correct answer is right and how it relates to the article content"
-    }}
+    }
   ]
-}}
+}
 
 **IMPORTANT:** 
-- Generate exactly {num_questions} questions
+- Generate exactly the requested number of questions
 - Ensure JSON is valid and properly formatted
 - Each question must test understanding of the article content
 - Explanations should reference specific parts of the article
@@ -106,45 +117,159 @@ Return ONLY a valid JSON object with this exact structure:
 - DO NOT include any hints, checkmarks, asterisks, or indicators showing which answer is correct
 - All answer options should appear neutral without any visual cues
 - Questions should be fair tests of knowledge without giving away the answer
-"""
+""",
+    user="""**ARTICLE INFORMATION:**
+Title: {title}
+Abstract: {abstract}
+Content: {content}
+
+Generate exactly {num_questions} questions.
+""",
+))
+
+# Changes whenever the prompt template changes, so cached output of an older prompt is never reused
+QA_PROMPT_VERSION = QA_GENERATION_PROMPT.version
 
 class QAGenerationService:
     """Service for generating QA tests from article content using Azure OpenAI"""
     
     def __init__(self):
-        self.llm_client = None
-        self._init_llm()
-    
-    def _init_llm(self):
-        """Initialize Azure OpenAI client"""
-        try:
-            kwargs = {
-                "api_key": SETTINGS.azure_openai_key,
-                "api_version": SETTINGS.azure_openai_api_version,
-                "azure_deployment": "gpt-4o-mini",
-                "azure_endpoint": SETTINGS.azure_openai_endpoint
-            }
-            print(f"🌐 QA Service: Using Azure OpenAI endpoint: {SETTINGS.azure_openai_endpoint}")
-            
-            self.llm_client = AsyncAzureOpenAI(**kwargs)
-            print("🤖 QA Service: Azure OpenAI client initialized")
-        except Exception as e:
-            print(f"⚠️ QA Service: Failed to initialize LLM client: {e}")
-            self.llm_client = None
+        self.cache = create_generation_cache("qa_generation")
     
     def _clean_text_for_qa(self, text: str, max_length: int) -> str:
-        """Clean and prepare text for QA generation"""
-        if not text:
-            return ""
+        """Clean and prepare text for QA generation (paragraphs kept, cut on a sentence boundary)"""
+        return normalize_text(text, max_length)
+    
+    def _use_sectioned(self, clean_content: str, num_questions: int, sectioned: Optional[bool]) -> bool:
+        """Explicit choice wins; otherwise section when one call would truncate the article or the answer"""
+        if sectioned is not None:
+            return sectioned
+        return (len(clean_content) > QA_GENERATION_CONFIG["max_content_length"]
+                or num_questions > QA_GENERATION_CONFIG["max_questions_per_call"])
+
+    def _split_sections(self, content: str, num_questions: int) -> List[str]:
+        """Split cleaned content into roughly equal, sentence-aligned sections within the token budget"""
+        budget_chars = QA_GENERATION_CONFIG["section_max_tokens"] * QA_GENERATION_CONFIG["chars_per_token"]
+        wanted = max(math.ceil(len(content) / budget_chars),
+                     math.ceil(num_questions / QA_GENERATION_CONFIG["max_questions_per_call"]))
+        # The budget decides the count even past num_questions; _allocate_questions
+        # then leaves some sections without questions and they are never sent
+        wanted = max(1, wanted)
+        target = max(QA_GENERATION_CONFIG["min_section_chars"], math.ceil(len(content) / wanted))
+
+        sections, current = [], ""
+        # Units are sentences; a paragraph break always ends one
+        for sentence in re.split(r'(?<=[.!?])\s+|\n\n', content):
+            # Run-on text without sentence breaks is cut hard
+            while len(sentence) > target:
+                if current:
+                    sections.append(current)
+                    current = ""
+                sections.append(sentence[:target])
+                sentence = sentence[target:]
+            if current and len(current) + 1 + len(sentence) > target:
+                sections.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}".strip()
+        if current:
+            # A short tail is folded into the previous section rather than getting its own call
+            if sections and len(current) < target // 4:
+                sections[-1] = f"{sections[-1]} {current}"
+            else:
+                sections.append(current)
+        return sections
+
+    def _allocate_questions(self, sections: List[str], num_questions: int) -> List[int]:
+        """Questions per section in proportion to section length (largest remainder); may be 0"""
+        total_length = sum(len(section) for section in sections)
+        shares = [num_questions * len(section) / total_length for section in sections]
+        quotas = [int(share) for share in shares]
+        by_remainder = sorted(range(len(sections)), key=lambda i: shares[i] - quotas[i], reverse=True)
+        for i in by_remainder[:num_questions - sum(quotas)]:
+            quotas[i] += 1
+        return quotas
+
+    def _question_signature(self, question: Dict[str, Any]) -> Optional[Signature]:
+        # Raw LLM output may name the correct answer as a bare letter
+        correct_answer = self._normalize_correct_answer(str(question.get("correct_answer") or ""))
+        return signature({**question, "correct_answer": correct_answer})
+
+    def _is_near_duplicate(self, sig: Optional[Signature], signatures: List[Signature]) -> bool:
+        """Same MinHash estimate and threshold as the cross-set screening of saved QA"""
+        threshold = SETTINGS.qa_dedupe_similarity
+        return sig is not None and any(similarity(sig, other) >= threshold for other in signatures)
+
+    def _merge_section_questions(self, per_section: List[List[Dict[str, Any]]], quotas: List[int],
+                                 num_questions: int) -> List[Dict[str, Any]]:
+        """
+        Pick questions round-robin across sections, dropping near-duplicates.
+
+        The first pass fills each section's quota; the second tops up from
+        the extras of other sections when a section failed or came up short.
+        The merged set keeps article order.
+        """
+        selected: List[Tuple[int, int, Dict[str, Any]]] = []
+        signatures: List[Signature] = []
+        positions = [0] * len(per_section)
+        counts = [0] * len(per_section)
+
+        def take_next(i: int) -> bool:
+            while positions[i] < len(per_section[i]):
+                position = positions[i]
+                question = per_section[i][position]
+                positions[i] += 1
+                sig = self._question_signature(question)
+                if self._is_near_duplicate(sig, signatures):
+                    continue
+                selected.append((i, position, question))
+                if sig is not None:
+                    signatures.append(sig)
+                counts[i] += 1
+                return True
+            return False
+
+        for use_quota in (True, False):
+            progressed = True
+            while progressed and len(selected) < num_questions:
+                progressed = False
+                for i in range(len(per_section)):
+                    if len(selected) >= num_questions:
+                        break
+                    if use_quota and counts[i] >= quotas[i]:
+                        continue
+                    progressed = take_next(i) or progressed
+
+        return [question for _, _, question in sorted(selected, key=lambda entry: entry[:2])]
+
+    def _validate_question(self, question: Any) -> bool:
+        """Validate one generated question"""
+        if not isinstance(question, dict):
+            return False
+        
+        required_fields = [
+            "question_id", "question", "answer_a", "answer_b", 
+            "answer_c", "answer_d", "correct_answer", "explanation"
+        ]
         
-        # Remove HTML tags
-        clean_text = re.sub(r'<[^>]+>', ' ', text)
-        # Remove extra whitespace and normalize
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        # Remove special characters that might interfere with JSON
-        clean_text = re.sub(r'[^\w\s.,!?;:()\-\'\"]+', ' ', clean_text)
-        # Limit length
-        return clean_text[:max_length]
+        # Check required fields
+        for field in required_fields:
+            if field not in question or not question[field] or not isinstance(question[field], str):
+                return False
+        
+        # Validate correct_answer format
+        correct_answer = question["correct_answer"].lower()
+        if correct_answer not in ["a", "b", "c", "d", "answer_a", "answer_b", "answer_c", "answer_d"]:
+            return False
+        
+        # Check minimum content length
+        if len(question["question"].strip()) < 10:
+            return False
+        
+        if len(question["explanation"].strip()) < 20:
+            return False
+        
+        return True
     
     def _validate_qa_structure(self, qa_data: Dict[str, Any]) -> bool:
         """Validate the structure of generated QA data"""
@@ -156,33 +281,7 @@ class QAGenerationService:
             if not isinstance(questions, list) or len(questions) == 0:
                 return False
             
-            required_fields = [
-                "question_id", "question", "answer_a", "answer_b", 
-                "answer_c", "answer_d", "correct_answer", "explanation"
-            ]
-            
-            for question in questions:
-                if not isinstance(question, dict):
-                    return False
-                
-                # Check required fields
-                for field in required_fields:
-                    if field not in question or not question[field]:
-                        return False
-                
-                # Validate correct_answer format
-                correct_answer = question["correct_answer"].lower()
-                if correct_answer not in ["a", "b", "c", "d", "answer_a", "answer_b", "answer_c", "answer_d"]:
-                    return False
-                
-                # Check minimum content length
-                if len(question["question"].strip()) < 10:
-                    return False
-                
-                if len(question["explanation"].strip()) < 20:
-                    return False
-            
-            return True
+            return all(self._validate_question(question) for question in questions)
             
         except Exception as e:
             print(f"❌ QA Service: Validation error: {e}")
@@ -206,6 +305,21 @@ class QAGenerationService:
         
         return mapping.get(correct_answer, "answer_a")  # Default to answer_a if invalid
     
+    def _enhance_question(self, question: Dict[str, Any]) -> Dict[str, Any]:
+        """Fresh question id, trimmed text and normalized correct_answer"""
+        return {
+            "question_id": str(uuid.uuid4()),  # Generate unique ID for each question
+            "question": question["question"].strip(),
+            "answer_a": question["answer_a"].strip(),
+            "answer_b": question["answer_b"].strip(),
+            "answer_c": question["answer_c"].strip(),
+            "answer_d": question["answer_d"].strip(),
+            "correct_answer": self._normalize_correct_answer(question["correct_answer"]),
+            "explanation": question["explanation"].strip(),
+            "difficulty": question.get("difficulty", "medium"),
+            "question_type": question.get("question_type", "conceptual")
+        }
+    
     def _enhance_qa_data(self, qa_data: Dict[str, Any], article_id: str) -> Dict[str, Any]:
         """Enhance QA data with additional metadata and ensure proper IDs"""
         try:
@@ -217,19 +331,7 @@ class QAGenerationService:
             }
             
             for question in qa_data["questions"]:
-                enhanced_question = {
-                    "question_id": str(uuid.uuid4()),  # Generate unique ID for each question
-                    "question": question["question"].strip(),
-                    "answer_a": question["answer_a"].strip(),
-                    "answer_b": question["answer_b"].strip(),
-                    "answer_c": question["answer_c"].strip(),
-                    "answer_d": question["answer_d"].strip(),
-                    "correct_answer": self._normalize_correct_answer(question["correct_answer"]),
-                    "explanation": question["explanation"].strip(),
-                    "difficulty": question.get("difficulty", "medium"),
-                    "question_type": question.get("question_type", "conceptual")
-                }
-                enhanced_data["questions"].append(enhanced_question)
+                enhanced_data["questions"].append(self._enhance_question(question))
             
             return enhanced_data
             
@@ -285,12 +387,93 @@ class QAGenerationService:
             "questions": fallback_questions[:num_questions]
         }
     
+    async def _call_llm(self, messages: List[Dict[str, str]], model: str) -> Tuple[Dict[str, Any], int]:
+        """One completion, parsed and validated; returns (qa_data, tokens used)"""
+        response = await llm_gateway.complete(
+            messages,
+            prompt=QA_GENERATION_PROMPT,
+            model=model,
+            max_tokens=8000,
+            temperature=0.3
+        )
+        
+        generated_text = response.choices[0].message.content.strip()
+        
+        # Parse JSON response
+        try:
+            qa_data = parse_llm_json(generated_text)
+        except json.JSONDecodeError as e:
+            print(f"⚠️ QA Service: JSON parsing failed: {e}")
+            print(f"Raw response: {generated_text[:500]}...")
+            raise Exception("Failed to parse LLM response as JSON")
+        
+        # Validate structure
+        if not self._validate_qa_structure(qa_data):
+            raise Exception("Generated QA data failed validation")
+        
+        return qa_data, getattr(getattr(response, "usage", None), "total_tokens", 0) or 0
+
+    async def _generate_section(self, clean_title: str, clean_abstract: str, section: str, label: str,
+                                count: int, model: str, bypass_cache: bool) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """Questions for one section; returns (questions, tokens used, cache hit). Failures yield no questions"""
+        # Same key scheme as a whole-article call, so unchanged sections of an edited article are reused
+        cache_key = content_hash(clean_title, clean_abstract, section, count, QA_PROMPT_VERSION, model)
+        if not bypass_cache:
+            cached_qa = await self.cache.get(cache_key)
+            if cached_qa is not None:
+                return cached_qa["questions"], 0, True
+        messages = QA_GENERATION_PROMPT.messages(
+            title=clean_title,
+            abstract=clean_abstract,
+            content=f"({label}) {section}",
+            num_questions=count
+        )
+        try:
+            qa_data, tokens = await self._call_llm(messages, model)
+        except Exception as e:
+            print(f"⚠️ QA Service: {label} failed: {e}")
+            return [], 0, False
+        await self.cache.put(cache_key, qa_data)
+        return qa_data["questions"], tokens, False
+
+    async def _generate_sectioned(self, clean_title: str, clean_abstract: str, clean_content: str,
+                                  num_questions: int, model: str, bypass_cache: bool) -> Tuple[Dict[str, Any], int, bool]:
+        """Map-reduce generation: sections are generated concurrently, then merged"""
+        sections = self._split_sections(clean_content, num_questions) if clean_content else [clean_content]
+        quotas = self._allocate_questions(sections, num_questions) if clean_content else [num_questions]
+        print(f"🧩 QA Service: Generating {num_questions} questions over {len(sections)} sections for '{clean_title[:50]}...'")
+
+        semaphore = asyncio.Semaphore(QA_GENERATION_CONFIG["section_concurrency"])
+
+        async def run(i: int):
+            if quotas[i] == 0:
+                return [], 0, True
+            count = quotas[i] + max(1, math.ceil(quotas[i] * QA_GENERATION_CONFIG["section_extra_ratio"]))
+            async with semaphore:
+                return await self._generate_section(
+                    clean_title, clean_abstract, sections[i], f"Part {i + 1} of {len(sections)}",
+                    count, model, bypass_cache
+                )
+
+        outcomes = await asyncio.gather(*(run(i) for i in range(len(sections))))
+        per_section = [questions for questions, _, _ in outcomes]
+        questions = self._merge_section_questions(per_section, quotas, num_questions)
+        if not questions:
+            raise Exception("All sections failed to generate questions")
+        if len(questions) < num_questions:
+            print(f"⚠️ QA Service: Only {len(questions)} of {num_questions} questions after merging sections")
+        tokens_used = sum(tokens for _, tokens, _ in outcomes)
+        all_cached = all(hit for _, _, hit in outcomes)
+        return {"questions": questions}, tokens_used, all_cached
+
     async def generate_qa_test(self, 
                               article_id: str,
                               title: str = "", 
                               abstract: str = "", 
                               content: str = "",
-                              num_questions: int = 5) -> Dict[str, Any]:
+                              num_questions: int = 5,
+                              bypass_cache: bool = False,
+                              sectioned: Optional[bool] = None) -> Dict[str, Any]:
         """
         Generate QA test for an article
         
@@ -299,13 +482,15 @@ class QAGenerationService:
             title: Article title
             abstract: Article abstract/summary
             content: Full article content
-            num_questions: Number of questions to generate (3-10)
+            num_questions: Number of questions to generate (3-100)
+            bypass_cache: Always call the LLM (the fresh result still refreshes the cache)
+            sectioned: Generate per section and merge (None: only for long content or many questions)
             
         Returns:
             Dict with QA test data ready for storage
         """
         
-        if not self.llm_client:
+        if not llm_gateway.available:
             print("⚠️ QA Service: LLM client not available, using fallback")
             return self._create_fallback_qa(article_id, title, content, min(num_questions, 3))
         
@@ -322,46 +507,65 @@ class QAGenerationService:
         # Clean and prepare content
         clean_title = self._clean_text_for_qa(title, QA_GENERATION_CONFIG["max_title_length"])
         clean_abstract = self._clean_text_for_qa(abstract, QA_GENERATION_CONFIG["max_abstract_length"])
-        clean_content = self._clean_text_for_qa(content, QA_GENERATION_CONFIG["max_content_length"])
+        clean_content = self._clean_text_for_qa(content, QA_GENERATION_CONFIG["max_sectioned_content_length"])
         
         if not clean_title and not clean_content:
             raise ValueError("Insufficient content to generate questions")
         
-        # Create the prompt
-        prompt = QA_GENERATION_PROMPT.format(
+        model = llm_gateway.deployment
+        if self._use_sectioned(clean_content, num_questions, sectioned):
+            try:
+                qa_data, tokens_used, all_cached = await self._generate_sectioned(
+                    clean_title, clean_abstract, clean_content, num_questions, model, bypass_cache
+                )
+                enhanced_qa = self._enhance_qa_data(qa_data, article_id)
+                print(f"✅ QA Service: Successfully generated {len(enhanced_qa['questions'])} questions (sectioned)")
+                return {
+                    "success": True,
+                    "data": enhanced_qa,
+                    "questions_count": len(enhanced_qa['questions']),
+                    "estimated_time_minutes": len(enhanced_qa['questions']) * QA_GENERATION_CONFIG["time_per_question_seconds"] / 60,
+                    "method_used": "cache" if all_cached else "llm_sectioned",
+                    "tokens_used": tokens_used
+                }
+            except Exception as e:
+                return self._fallback_result(article_id, clean_title, clean_content, e)
+        
+        clean_content = truncate_at_sentence(clean_content, QA_GENERATION_CONFIG["max_content_length"])
+        
+        # Static instructions first (cacheable by the provider), the article after them
+        messages = QA_GENERATION_PROMPT.messages(
             title=clean_title,
             abstract=clean_abstract,
             content=clean_content,
             num_questions=num_questions
         )
         
+        cache_key = self._single_call_cache_key(clean_title, clean_abstract, clean_content, num_questions, model)
+        if not bypass_cache:
+            cached_qa = await self.cache.get(cache_key)
+            if cached_qa is not None:
+                # Re-enhance so every generation gets fresh question ids and the caller's article_id
+                enhanced_qa = self._enhance_qa_data(cached_qa, article_id)
+                print(f"♻️ QA Service: Cache hit for article '{clean_title[:50]}...'")
+                return {
+                    "success": True,
+                    "data": enhanced_qa,
+                    "questions_count": len(enhanced_qa['questions']),
+                    "estimated_time_minutes": len(enhanced_qa['questions']) * QA_GENERATION_CONFIG["time_per_question_seconds"] / 60,
+                    "method_used": "cache"
+                }
+        
         try:
             # Call Azure OpenAI
             print(f"🤖 QA Service: Generating {num_questions} questions for article '{clean_title[:50]}...'")
             
-            response = await self.llm_client.chat.completions.create(
-                model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o-mini"),
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=8000,
-                temperature=0.3
-            )
-            
-            generated_text = response.choices[0].message.content.strip()
-            
-            # Parse JSON response
-            try:
-                qa_data = json.loads(generated_text)
-            except json.JSONDecodeError as e:
-                print(f"⚠️ QA Service: JSON parsing failed: {e}")
-                print(f"Raw response: {generated_text[:500]}...")
-                raise Exception("Failed to parse LLM response as JSON")
-            
-            # Validate structure
-            if not self._validate_qa_structure(qa_data):
-                raise Exception("Generated QA data failed validation")
+            qa_data, tokens_used = await self._call_llm(messages, model)
             
             # Enhance and finalize data
             enhanced_qa = self._enhance_qa_data(qa_data, article_id)
+            # Only validated LLM output is cached, never fallback questions
+            await self.cache.put(cache_key, qa_data)
             
             print(f"✅ QA Service: Successfully generated {len(enhanced_qa['questions'])} questions")
             
@@ -370,33 +574,250 @@ class QAGenerationService:
                 "data": enhanced_qa,
                 "questions_count": len(enhanced_qa['questions']),
                 "estimated_time_minutes": len(enhanced_qa['questions']) * QA_GENERATION_CONFIG["time_per_question_seconds"] / 60,
-                "method_used": "llm"
+                "method_used": "llm",
+                "tokens_used": tokens_used
             }
             
         except Exception as e:
-            print(f"❌ QA Service: LLM generation failed: {e}")
+            return self._fallback_result(article_id, clean_title, clean_content, e)
+
+    def _single_call_cache_key(self, clean_title: str, clean_abstract: str, clean_content: str,
+                               num_questions: int, model: str) -> str:
+        return content_hash(clean_title, clean_abstract, clean_content, num_questions, QA_PROMPT_VERSION, model)
+
+    def validate_questions(self, questions: Any) -> List[Dict[str, Any]]:
+        """Valid questions of an LLM answer, enhanced; invalid ones are dropped"""
+        if not isinstance(questions, list):
+            return []
+        # question_id is assigned here, the model does not need to invent one
+        questions = [{**q, "question_id": q.get("question_id") or "generated"} for q in questions if isinstance(q, dict)]
+        return [self._enhance_question(q) for q in questions if self._validate_question(q)]
+
+    async def prime_cache(self, title: str, abstract: str, content: str, num_questions: int,
+                          questions: List[Dict[str, Any]]) -> bool:
+        """
+        Store questions written elsewhere (e.g. at news ingestion) under the key
+        generate_qa_test would use for this article, so a later default
+        generation is a cache hit. Only single-call generations are keyed this way.
+        """
+        clean_title = self._clean_text_for_qa(title, QA_GENERATION_CONFIG["max_title_length"])
+        clean_abstract = self._clean_text_for_qa(abstract, QA_GENERATION_CONFIG["max_abstract_length"])
+        clean_content = self._clean_text_for_qa(content, QA_GENERATION_CONFIG["max_sectioned_content_length"])
+        if not questions or not clean_title or self._use_sectioned(clean_content, num_questions, None):
+            return False
+        model = llm_gateway.deployment
+        cache_key = self._single_call_cache_key(clean_title, clean_abstract, clean_content, num_questions, model)
+        await self.cache.put(cache_key, {"questions": questions})
+        return True
+
+    def _fallback_result(self, article_id: str, clean_title: str, clean_content: str, error: Exception) -> Dict[str, Any]:
+        if isinstance(error, LLMUnavailableError):
+            print(f"⚡ QA Service: {error} - using fallback questions")
+        else:
+            print(f"❌ QA Service: LLM generation failed: {error}")
+        
+        # Fallback to basic questions
+        try:
+            fallback_qa = self._create_fallback_qa(article_id, clean_title, clean_content, 3)
+            
+            return {
+                "success": True,
+                "data": fallback_qa,
+                "questions_count": len(fallback_qa['questions']),
+                "estimated_time_minutes": len(fallback_qa['questions']) * QA_GENERATION_CONFIG["time_per_question_seconds"] / 60,
+                "method_used": "fallback",
+                "warning": "Used fallback questions due to LLM failure"
+            }
             
-            # Fallback to basic questions
+        except Exception as fallback_error:
+            print(f"❌ QA Service: Even fallback failed: {fallback_error}")
+            
+            return {
+                "success": False,
+                "error": f"QA generation failed: {str(error)}",
+                "fallback_error": str(fallback_error)
+            }
+    
+    async def _stream_llm(self, messages: List[Dict[str, str]], model: str, stats: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streamed completion: yields each valid question as soon as its object is closed.
+        stats receives tokens_used, invalid (objects dropped) and complete (response ended cleanly).
+        """
+        parser = JsonArrayStreamParser("questions")
+        stream = llm_gateway.stream(
+            messages,
+            prompt=QA_GENERATION_PROMPT,
+            model=model,
+            max_tokens=8000,
+            temperature=0.3
+        )
+        async for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage:
+                stats["tokens_used"] += usage.total_tokens or 0
+            # Content filter results and the usage chunk carry no choices
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for question in parser.feed(chunk.choices[0].delta.content):
+                if self._validate_question(question):
+                    yield question
+                else:
+                    stats["invalid"] += 1
+        stats["invalid"] += parser.invalid
+        stats["complete"] = parser.complete
+
+    async def stream_qa_test(self,
+                             article_id: str,
+                             title: str = "",
+                             abstract: str = "",
+                             content: str = "",
+                             num_questions: int = 5,
+                             bypass_cache: bool = False,
+                             sectioned: Optional[bool] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streamed variant of generate_qa_test
+
+        Yields {"event": "question", "data": question} for every question as
+        soon as it is generated and validated, then one {"event": "done",
+        "data": summary}. Questions already streamed are kept when the rest of
+        the response is malformed or cut off; only a clean, complete response
+        is cached. In sectioned mode all sections stream concurrently: each
+        question is accepted while its section is under quota and it is not a
+        near-duplicate, extras top up sections that came up short at the end.
+        """
+        if not article_id or not title:
+            raise ValueError("Article ID and title are required")
+        
+        num_questions = max(
+            QA_GENERATION_CONFIG["min_questions_count"],
+            min(num_questions, QA_GENERATION_CONFIG["max_questions_count"])
+        )
+        clean_title = self._clean_text_for_qa(title, QA_GENERATION_CONFIG["max_title_length"])
+        clean_abstract = self._clean_text_for_qa(abstract, QA_GENERATION_CONFIG["max_abstract_length"])
+        clean_content = self._clean_text_for_qa(content, QA_GENERATION_CONFIG["max_sectioned_content_length"])
+        
+        if not clean_title and not clean_content:
+            raise ValueError("Insufficient content to generate questions")
+        
+        model = llm_gateway.deployment
+        is_sectioned = self._use_sectioned(clean_content, num_questions, sectioned)
+        if is_sectioned and clean_content:
+            sections = self._split_sections(clean_content, num_questions)
+            quotas = self._allocate_questions(sections, num_questions)
+            counts = [q + max(1, math.ceil(q * QA_GENERATION_CONFIG["section_extra_ratio"])) if q else 0 for q in quotas]
+            labels = [f"Part {i + 1} of {len(sections)}" for i in range(len(sections))]
+        else:
+            # Same prompt and cache key as the non-streamed single call
+            sections = [truncate_at_sentence(clean_content, QA_GENERATION_CONFIG["max_content_length"])]
+            quotas = counts = [num_questions]
+            labels = [None]
+
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(QA_GENERATION_CONFIG["section_concurrency"])
+
+        async def run(i: int):
+            stats = {"tokens_used": 0, "invalid": 0, "complete": False, "cached": False}
             try:
-                fallback_qa = self._create_fallback_qa(article_id, clean_title, clean_content, 3)
-                
-                return {
-                    "success": True,
-                    "data": fallback_qa,
-                    "questions_count": len(fallback_qa['questions']),
-                    "estimated_time_minutes": len(fallback_qa['questions']) * QA_GENERATION_CONFIG["time_per_question_seconds"] / 60,
-                    "method_used": "fallback",
-                    "warning": "Used fallback questions due to LLM failure"
-                }
-                
-            except Exception as fallback_error:
-                print(f"❌ QA Service: Even fallback failed: {fallback_error}")
-                
-                return {
-                    "success": False,
-                    "error": f"QA generation failed: {str(e)}",
-                    "fallback_error": str(fallback_error)
-                }
+                cache_key = content_hash(clean_title, clean_abstract, sections[i], counts[i], QA_PROMPT_VERSION, model)
+                cached_qa = None if bypass_cache else await self.cache.get(cache_key)
+                if cached_qa is not None:
+                    stats.update(complete=True, cached=True)
+                    for question in cached_qa["questions"]:
+                        await queue.put(("question", i, question))
+                    return
+                messages = QA_GENERATION_PROMPT.messages(
+                    title=clean_title,
+                    abstract=clean_abstract,
+                    content=f"({labels[i]}) {sections[i]}" if labels[i] else sections[i],
+                    num_questions=counts[i]
+                )
+                generated = []
+                async with semaphore:
+                    async for question in self._stream_llm(messages, model, stats):
+                        generated.append(question)
+                        await queue.put(("question", i, question))
+                # Only a clean, complete response is cached
+                if stats["complete"] and generated and not stats["invalid"]:
+                    await self.cache.put(cache_key, {"questions": generated})
+            except Exception as e:
+                print(f"⚠️ QA Service: Streamed generation failed ({labels[i] or 'article'}): {e}")
+                stats["error"] = str(e)
+            finally:
+                await queue.put(("end", i, stats))
+
+        print(f"🌊 QA Service: Streaming {num_questions} questions over {len(sections)} call(s) for '{clean_title[:50]}...'")
+        # Without an LLM client nothing runs and the fallback questions are streamed
+        tasks = [asyncio.create_task(run(i)) for i in range(len(sections)) if quotas[i]] if llm_gateway.available else []
+        selected_signatures: List[Signature] = []
+        accepted = [0] * len(sections)
+        extras: List[List[Dict[str, Any]]] = [[] for _ in sections]
+        outcomes: List[Dict[str, Any]] = []
+        emitted = 0
+        try:
+            pending = len(tasks)
+            while pending:
+                kind, i, value = await queue.get()
+                if kind == "end":
+                    pending -= 1
+                    outcomes.append(value)
+                    continue
+                sig = self._question_signature(value)
+                if emitted >= num_questions or self._is_near_duplicate(sig, selected_signatures):
+                    continue
+                if accepted[i] >= quotas[i]:
+                    extras[i].append(value)
+                    continue
+                accepted[i] += 1
+                if sig is not None:
+                    selected_signatures.append(sig)
+                emitted += 1
+                yield {"event": "question", "data": {"index": emitted - 1, **self._enhance_question(value)}}
+
+            # Top up from other sections' extras when a section failed or came up short
+            for question in (q for round_ in zip_longest(*extras) for q in round_ if q is not None):
+                if emitted >= num_questions:
+                    break
+                sig = self._question_signature(question)
+                if self._is_near_duplicate(sig, selected_signatures):
+                    continue
+                if sig is not None:
+                    selected_signatures.append(sig)
+                emitted += 1
+                yield {"event": "question", "data": {"index": emitted - 1, **self._enhance_question(question)}}
+        except Exception as e:
+            print(f"❌ QA Service: Streamed generation failed: {e}")
+        finally:
+            # Client went away or generation failed: stop the remaining calls
+            for task in tasks:
+                task.cancel()
+
+        method_used = "llm_sectioned" if is_sectioned else "llm"
+        if outcomes and all(o["cached"] for o in outcomes):
+            method_used = "cache"
+        warning = None
+        if emitted == 0:
+            fallback_qa = self._create_fallback_qa(article_id, clean_title, clean_content, 3)
+            for question in fallback_qa["questions"]:
+                yield {"event": "question", "data": {"index": emitted, **question}}
+                emitted += 1
+            method_used = "fallback"
+            warning = "Used fallback questions due to LLM failure"
+        elif emitted < num_questions or not all(o["complete"] for o in outcomes):
+            warning = f"Generated {emitted} of {num_questions} questions; the rest of the response was malformed or incomplete"
+
+        print(f"✅ QA Service: Streamed {emitted} questions ({method_used})")
+        yield {
+            "event": "done",
+            "data": {
+                "article_id": article_id,
+                "questions_count": emitted,
+                "estimated_time_minutes": emitted * QA_GENERATION_CONFIG["time_per_question_seconds"] / 60,
+                "method_used": method_used,
+                "tokens_used": sum(o["tokens_used"] for o in outcomes),
+                "invalid_questions": sum(o["invalid"] for o in outcomes),
+                "warning": warning
+            }
+        }
     
 # Global service instance
 qa_generation_service = QAGenerationService()
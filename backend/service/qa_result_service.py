@@ -1,81 +1,188 @@
+import asyncio
 import uuid
 from datetime import datetime
-from backend.repository import qa_repo
-from backend.repository.qa_repo import find_by_id
-from backend.repository.qa_result_repo import create_qa_result, find_all_qa_results, find_all_qa_results_by_user, find_all_qa_results_by_user_and_qa, find_qa_result_by_id
-from backend.routes import qa
+from typing import List
+from backend.config.settings import SETTINGS
+from backend.repository.base import RESULT_SUMMARY_FIELDS, ResultFilter, ResultPage
+from backend.repository.qa_result_repo import create_qa_result, create_qa_results, find_all_qa_results, find_all_qa_results_by_user, find_all_qa_results_by_user_and_qa, find_qa_result_by_id, find_qa_results_page
+from backend.service.answer_key_service import (
+    CompiledAnswerKey, GradeResult, build_result_rows, compact_result_fields, get_answer_key, grade,
+    hydrate_result_rows, is_compact_result, result_correctness
+)
+from backend.service.leaderboard_service import leaderboard_service
+from backend.service.result_stream_service import enqueue_results, get_buffered_result, get_buffered_results_for_user
 
 
-async def create_qa_result_service(qa_id: str, user_id: str, qa: dict) -> dict:
-    existing_qa = await find_by_id(qa_id)
-    if not existing_qa:
-        return None
-    
-    correct_answers = 0
-    questions=[]
-    for q in existing_qa.get('questions', []):
-        if q.get('correct_answer') == qa.get(q.get('question_id')):
-            correct_answers += 1
-            is_correct = True
-        else:
-            is_correct = False
-        question_result = {
-            "question_id": q.get('question_id'),
-            "question": q.get('question'),
-            "answer_a": q.get('answer_a'),
-            "answer_b": q.get('answer_b'),
-            "answer_c": q.get('answer_c'),
-            "answer_d": q.get('answer_d'),
-            "correct_answer": q.get('correct_answer'),
-            "selected_answer": qa.get(q.get('question_id')),
-            "is_correct": is_correct,
-            "explanation": q.get('explanation', '')
-        }
-        questions.append(question_result)
-    score = correct_answers / len(existing_qa.get('questions', [])) * 100
+def build_result_document(key: CompiledAnswerKey, user_id: str, answers: dict, graded: GradeResult,
+                          created_at: str) -> dict:
     qa_result = {
         "id": str(uuid.uuid4()),
-        "qa_id": qa_id,  # Add qa_id field that was missing
+        "qa_id": key.qa_id,
         "user_id": user_id,
-        "questions": questions,
-        "score": score,
-        "created_at": datetime.utcnow().isoformat()  # Fix datetime call
+        "score": graded.score,
+        "created_at": created_at
     }
-    await create_qa_result(qa_result)
-    return convert_qa_detail_to_dto(qa_result)
+    if SETTINGS.results_compact_schema:
+        qa_result.update(compact_result_fields(key, graded))
+    else:
+        qa_result["questions"] = build_result_rows(key, answers, graded)
+    return qa_result
+
+async def buffer_qa_results(qa_results: List[dict]) -> bool:
+    """Write-behind mode: append results to the Redis stream instead of writing them now.
+
+    Returns False when write-behind is off or Redis fails; the caller then
+    writes directly, so a Redis outage never loses a submission.
+    """
+    if not SETTINGS.results_write_behind:
+        return False
+    try:
+        await enqueue_results(qa_results)
+        return True
+    except Exception as e:
+        print(f"⚠️ Result stream unavailable, writing directly: {e}")
+        return False
+
+async def with_buffered_results(qa_results: List[dict], user_id: str, qa_id: str = None) -> List[dict]:
+    """Merge results still waiting in the write-behind buffer into a user's history (newest first)"""
+    if not SETTINGS.results_write_behind:
+        return qa_results
+    try:
+        buffered = await get_buffered_results_for_user(user_id, qa_id)
+    except Exception as e:
+        print(f"⚠️ Result stream unavailable, history may miss just-submitted results: {e}")
+        return qa_results
+    known = {r.get("id") for r in qa_results}
+    merged = qa_results + [r for r in buffered if r.get("id") not in known]
+    return sorted(merged, key=lambda r: r.get("created_at") or "", reverse=True)
+
+async def create_qa_result_service(qa_id: str, user_id: str, qa: dict) -> dict:
+    answer_key = await get_answer_key(qa_id)
+    if not answer_key:
+        return None
+
+    graded = grade(answer_key, qa)
+    qa_result = build_result_document(answer_key, user_id, qa, graded, datetime.utcnow().isoformat())
+    if not await buffer_qa_results([qa_result]):
+        await create_qa_result(qa_result)
+    await leaderboard_service.record_scores_safely([qa_result])
+    # The grading response always carries the full rows; only the stored document is compact
+    return convert_qa_detail_to_dto({**qa_result, "questions": build_result_rows(answer_key, qa, graded)})
+
+async def create_qa_results_batch_service(attempts: List[dict]) -> List[dict]:
+    """Grade and persist many attempts at once.
+
+    Attempts are grouped by qa_id so each answer key is loaded once, then
+    all result documents are written with bounded-concurrency bulk creates.
+    Returns one outcome per attempt, in input order.
+    """
+    qa_ids = list({attempt["qa_id"] for attempt in attempts})
+    keys = dict(zip(qa_ids, await asyncio.gather(*(get_answer_key(qa_id) for qa_id in qa_ids))))
+
+    outcomes: List[dict] = [None] * len(attempts)
+    pending_indexes = []
+    pending_results = []
+    created_at = datetime.utcnow().isoformat()
+    for index, attempt in enumerate(attempts):
+        answer_key = keys.get(attempt["qa_id"])
+        if not answer_key:
+            outcomes[index] = {"index": index, "success": False, "error": f"QA {attempt['qa_id']} not found"}
+            continue
+        answers = attempt.get("qa") or {}
+        graded = grade(answer_key, answers)
+        pending_indexes.append(index)
+        pending_results.append(build_result_document(answer_key, attempt["user_id"], answers, graded, created_at))
+
+    if pending_results and await buffer_qa_results(pending_results):
+        written = list(pending_results)
+    else:
+        written = await create_qa_results(pending_results, SETTINGS.results_bulk_concurrency) if pending_results else []
+    stored = []
+    for index, qa_result, outcome in zip(pending_indexes, pending_results, written):
+        if isinstance(outcome, Exception):
+            outcomes[index] = {"index": index, "success": False, "error": str(outcome)}
+        else:
+            stored.append(outcome)
+            outcomes[index] = {"index": index, "success": True, "data": convert_to_qa_result_dto(outcome)}
+    if stored:
+        await leaderboard_service.record_scores_safely(stored)
+    return outcomes
 
 async def get_all_qa_results_service() -> list:
     qa_results = await find_all_qa_results()
     return qa_results
 
+async def list_qa_results_service(filters: ResultFilter, limit: int, cursor: str = None,
+                                  compact: bool = False) -> ResultPage:
+    """One newest-first page of results; items are streamed, not loaded into a list.
+
+    With a user filter the first page also leads with that user's results still
+    in the write-behind buffer (on top of `limit`), so a listing right after a
+    submission shows it, like the history endpoints do.
+    """
+    page = await find_qa_results_page(filters, limit, cursor, compact)
+    if cursor is None and filters.user_id is not None:
+        buffered = [r for r in await with_buffered_results([], filters.user_id, filters.qa_id) if filters.matches(r)]
+        if buffered:
+            page.items = _lead_with_buffered(buffered, page.items, compact)
+    return page
+
+async def _lead_with_buffered(buffered: List[dict], stored, compact: bool):
+    for result in buffered:
+        yield {f: result.get(f) for f in RESULT_SUMMARY_FIELDS} if compact else result
+    # A result flushed while this page is read is in both; list it once
+    seen = {result.get("id") for result in buffered}
+    async for result in stored:
+        if result.get("id") not in seen:
+            yield result
+
 async def get_all_qa_results_by_user_service(user_id: str) -> list:
-    qa_results = await find_all_qa_results_by_user(user_id)
+    qa_results = await with_buffered_results(await find_all_qa_results_by_user(user_id), user_id)
     return [convert_to_qa_result_dto(result) for result in qa_results]
 
 async def get_all_qa_results_by_user_and_qa_service(user_id: str, qa_id: str) -> list:
-    qa_results = await find_all_qa_results_by_user_and_qa(user_id, qa_id)
+    qa_results = await with_buffered_results(await find_all_qa_results_by_user_and_qa(user_id, qa_id), user_id, qa_id)
     return [convert_to_qa_result_dto(result) for result in qa_results]
 
-async def get_qa_result_by_id_service(qa_result_id: str) -> dict:
-    qa_result = await find_qa_result_by_id(qa_result_id)
+async def get_qa_result_by_id_service(qa_result_id: str, user_id: str = None, qa_id: str = None) -> dict:
+    qa_result = None
+    if SETTINGS.results_write_behind:
+        # Just-submitted results are served from the buffer until flushed
+        try:
+            qa_result = await get_buffered_result(qa_result_id)
+        except Exception as e:
+            print(f"⚠️ Result stream unavailable: {e}")
+    if qa_result is None:
+        qa_result = await find_qa_result_by_id(qa_result_id, user_id=user_id, qa_id=qa_id)
+    if qa_result and is_compact_result(qa_result):
+        answer_key = await get_answer_key(qa_result.get("qa_id"))
+        qa_result = {
+            **qa_result,
+            "questions": hydrate_result_rows(answer_key, qa_result),
+            # Text shown is the current QA's; flag results graded against an older version
+            "qa_changed": answer_key is None or answer_key.version != qa_result.get("qa_version")
+        }
     return convert_qa_detail_to_dto(qa_result)
 
 def convert_qa_detail_to_dto(qa: dict) -> dict:
     if not qa:
         return None
-    return {
+    detail = {
         "questions": qa.get("questions", []),
         "score": qa.get("score"),
         "created_at": qa.get("created_at")
     }
+    if "qa_changed" in qa:
+        detail["qa_changed"] = qa["qa_changed"]
+    return detail
 def convert_to_qa_result_dto(qa_result: dict) -> dict:
     if not qa_result:
         return None
     
-    # Calculate additional fields from questions array
-    questions = qa_result.get("questions", [])
-    total_questions = len(questions)
-    correct_answers = sum(1 for q in questions if q.get("is_correct", False))
+    # Calculate additional fields from the per-question correctness (either schema)
+    correctness = result_correctness(qa_result)
+    total_questions = len(correctness)
+    correct_answers = sum(1 for _, correct in correctness if correct)
     
     return {
         "id": qa_result.get("id"),
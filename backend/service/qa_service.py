@@ -5,6 +5,9 @@
 from typing import List, Optional
 import uuid
 from backend.repository.qa_repo import create, delete, find_all, find_by_id, get_qa_by_article_id, update
+from backend.config.settings import SETTINGS
+from backend.service.answer_key_service import invalidate_answer_key
+from backend.service.question_similarity import invalidate_article_index, plan_dedupe, screen_new_set
 
     
 async def get_all_qa() -> List[dict]:
@@ -26,8 +29,33 @@ async def create_question(question_data: dict) -> dict:
     current_time = datetime.utcnow().isoformat()
     question_data["created_at"] = current_time
     question_data["updated_at"] = current_time
-    
-    return await create(question_data)
+
+    # Near-duplicates of questions already saved for the article: flag, drop or ignore.
+    # Every set is screened, even with "off", so the article index stays complete
+    mode = SETTINGS.qa_dedupe_mode
+    questions = question_data.get("questions", [])
+    matches = await screen_new_set(question_data)
+    duplicates = [m for m in matches if m]
+    dropped = []
+    if mode == "drop" and duplicates and len(duplicates) < len(questions):
+        dropped = [q["question_id"] for q, m in zip(questions, matches) if m]
+        question_data["questions"] = [q for q, m in zip(questions, matches) if not m]
+    elif mode != "off":
+        # "flag" - or "drop" that would leave an empty set
+        for q, m in zip(questions, matches):
+            if m:
+                q["duplicate_of"] = m
+
+    try:
+        created = await create(question_data)
+    except Exception:
+        # The index already holds this set's questions
+        invalidate_article_index(question_data.get("article_id"))
+        raise
+    if duplicates and mode != "off":
+        print(f"🔁 QA {question_data.get('id')}: {len(duplicates)} near-duplicate question(s) "
+              f"{'dropped' if dropped else 'flagged'}")
+    return {**created, "duplicates": {"mode": mode, "found": len(duplicates), "dropped": dropped}}
 
 async def update_qa(question_id: str, update_data: dict) -> Optional[dict]:
     # Lấy dữ liệu gốc từ database (không qua DTO)
@@ -77,6 +105,8 @@ async def update_qa(question_id: str, update_data: dict) -> Optional[dict]:
     existing_qa["updated_at"] = datetime.utcnow().isoformat()
 
     updated_qa = await update(question_id, existing_qa)
+    await invalidate_answer_key(question_id)
+    invalidate_article_index(existing_qa.get("article_id"))
     
     # Return DTO format for response
     return convert_qa_detail_to_dto(updated_qa) if updated_qa else None
@@ -87,13 +117,44 @@ async def delete_qa(question_id: str) -> bool:
     if not existing_qa:
         return False
 
-    return await delete(question_id)
+    deleted = await delete(question_id)
+    await invalidate_answer_key(question_id)
+    invalidate_article_index(existing_qa.get("article_id"))
+    return deleted
 
 async def get_qa_by_article_id_service(article_id: str) -> List[dict]:
     qas = await get_qa_by_article_id(article_id)
     # Always return a list, empty if no QAs found
     return [convert_qa_detail_to_dto(qa) for qa in qas] if qas else []
 
+async def dedupe_article_qas(article_id: str, dry_run: bool = True) -> dict:
+    # Bỏ các câu hỏi trùng lặp (gần giống) giữa các bộ QA của một bài viết.
+    # Bộ cũ nhất được giữ nguyên, bộ sau bị bỏ câu trùng; không bao giờ làm rỗng một bộ.
+    qas = await get_qa_by_article_id(article_id) or []
+    plan = plan_dedupe(article_id, qas)
+    by_id = {qa["id"]: qa for qa in qas}
+    updated = 0
+    if not dry_run:
+        from datetime import datetime
+        for entry in plan:
+            if not entry["duplicates"] or entry["skipped"]:
+                continue
+            qa = by_id[entry["qa_id"]]
+            qa["questions"] = entry["kept"]
+            qa["updated_at"] = datetime.utcnow().isoformat()
+            await update(qa["id"], qa)
+            await invalidate_answer_key(qa["id"])
+            updated += 1
+        invalidate_article_index(article_id)
+    return {
+        "article_id": article_id,
+        "dry_run": dry_run,
+        "sets": len(plan),
+        "duplicates": sum(len(e["duplicates"]) for e in plan if not e["skipped"]),
+        "updated_sets": updated,
+        "details": [{k: v for k, v in e.items() if k != "kept"} for e in plan],
+    }
+
 # async def grade_qa(question_id: str, qa: dict) -> Optional[dict]:
 #     # Lấy dữ liệu gốc từ database (không qua DTO)
 #     existing_qa = await find_by_id(question_id)
@@ -144,8 +205,9 @@ def convert_qa_detail_to_dto(qa: dict) -> dict:
             "answer_a": q.get("answer_a"),  # Sửa từ question_a thành answer_a
             "answer_b": q.get("answer_b"),  # Sửa từ question_b thành answer_b
             "answer_c": q.get("answer_c"),  # Sửa từ question_c thành answer_c
-            "answer_d": q.get("answer_d")   # Sửa từ question_d thành answer_d
+            "answer_d": q.get("answer_d"),  # Sửa từ question_d thành answer_d
             # Không bao gồm correct_answer để ẩn đáp án đúng
+            **({"duplicate_of": q["duplicate_of"]} if q.get("duplicate_of") else {})
         })
     return {
         "id": qa.get("id"),
@@ -0,0 +1,165 @@
+"""
+Per-QA statistics maintained from the QA results change feed
+
+A single background consumer reads newly written result documents in
+batches, folds them into one aggregate document per QA set (attempts,
+score histogram, per-question correct rate) and then checkpoints the feed
+continuation. `GET /api/qas/{id}/stats` reads that one document instead of
+scanning the results container.
+
+Only one process consumes the feed at a time: the consumer holds a lease
+(owner + expiry) stored next to the aggregates and renews it with every
+checkpoint. Another worker takes over once the lease expires.
+
+Delivery is at-least-once: if the process dies after the aggregates are
+written but before the checkpoint is saved, that batch is read again on
+restart. Each aggregate keeps the ids of the results it counted last (one
+batch worth, the most a replay can repeat), so a replayed result is skipped
+instead of counted twice.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.config.settings import SETTINGS
+from backend.repository.factory import get_qa_result_repository, get_qa_stats_repository
+from backend.service.answer_key_service import result_correctness
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "qa_stats"
+SCORE_BUCKETS = 10  # Scores are 0-100; bucket i covers [10*i, 10*i + 10), 100 falls in the last one
+
+
+def empty_stats(qa_id: str) -> Dict[str, Any]:
+    return {
+        "id": qa_id,
+        "qa_id": qa_id,
+        "attempts": 0,
+        "score_sum": 0.0,
+        "average_score": 0.0,
+        "score_histogram": [0] * SCORE_BUCKETS,
+        "questions": {},
+        "recent_result_ids": [],
+        "updated_at": None,
+    }
+
+
+def apply_result(stats: Dict[str, Any], qa_result: Dict[str, Any]) -> bool:
+    """Fold one result document into the aggregate, in place. False if it was already counted."""
+    recent = stats.setdefault("recent_result_ids", [])
+    if qa_result.get("id") in recent:
+        return False
+    recent.append(qa_result.get("id"))
+    # A replay repeats at most one batch, which were the last results applied to this QA
+    del recent[:-SETTINGS.qa_stats_batch_size]
+
+    score = float(qa_result.get("score") or 0.0)
+    stats["attempts"] += 1
+    stats["score_sum"] += score
+    stats["average_score"] = round(stats["score_sum"] / stats["attempts"], 2)
+    bucket = min(max(int(score // (100 / SCORE_BUCKETS)), 0), SCORE_BUCKETS - 1)
+    stats["score_histogram"][bucket] += 1
+
+    questions = stats["questions"]
+    for question_id, correct in result_correctness(qa_result):
+        if not question_id:
+            continue
+        question = questions.setdefault(question_id, {"attempts": 0, "correct": 0, "correct_rate": 0.0})
+        question["attempts"] += 1
+        if correct:
+            question["correct"] += 1
+        question["correct_rate"] = round(question["correct"] / question["attempts"], 4)
+    return True
+
+
+class QAStatsProcessor:
+    """Background change-feed consumer that keeps the per-QA aggregates up to date"""
+
+    def __init__(self):
+        self.owner = uuid.uuid4().hex[:12]
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def process_once(self) -> int:
+        """Apply one batch of changes. Returns the number of results applied."""
+        stats_repo = get_qa_stats_repository()
+        lease = await stats_repo.acquire_lease(LEASE_NAME, self.owner, SETTINGS.qa_stats_lease_ttl_seconds)
+        if lease is None:
+            return 0
+
+        changes, continuation = await get_qa_result_repository().read_changes(
+            lease.get("continuation"), SETTINGS.qa_stats_batch_size
+        )
+
+        by_qa: Dict[str, List[Dict[str, Any]]] = {}
+        for qa_result in changes:
+            # Results rewritten by a schema migration reappear on the Cosmos change feed
+            if qa_result.get("qa_id") and not qa_result.get("compacted_at"):
+                by_qa.setdefault(qa_result["qa_id"], []).append(qa_result)
+
+        updated_at = datetime.utcnow().isoformat()
+        for qa_id, qa_results in by_qa.items():
+            stats = await stats_repo.get_stats(qa_id) or empty_stats(qa_id)
+            applied = [apply_result(stats, qa_result) for qa_result in qa_results]
+            if not any(applied):
+                continue  # A replayed batch: the stored aggregate already counts these
+            stats["updated_at"] = updated_at
+            await stats_repo.upsert_stats(stats)
+
+        # Checkpoint only after every aggregate in the batch has been written
+        lease["continuation"] = continuation
+        lease["expires_at"] = time.time() + SETTINGS.qa_stats_lease_ttl_seconds
+        if await stats_repo.save_lease(lease) is None:
+            logger.warning("QA stats lease lost before checkpoint; batch will be replayed by the new owner")
+        return len(changes)
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                applied = await self.process_once()
+            except Exception as e:
+                logger.error(f"❌ QA stats processor error: {e}")
+                applied = 0
+            # Keep draining while there is a backlog; otherwise wait for new results
+            if applied < SETTINGS.qa_stats_batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=SETTINGS.qa_stats_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"QA stats processor started (owner {self.owner})")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("QA stats processor stopped")
+
+
+qa_stats_processor = QAStatsProcessor()
+
+
+async def start_qa_stats_processor():
+    if SETTINGS.qa_stats_enabled:
+        qa_stats_processor.start()
+
+
+async def stop_qa_stats_processor():
+    await qa_stats_processor.stop()
+
+
+async def get_qa_stats_service(qa_id: str) -> Dict[str, Any]:
+    """Current aggregate for a QA set; an empty one if no result has been processed yet"""
+    stats = await get_qa_stats_repository().get_stats(qa_id) or empty_stats(qa_id)
+    return {k: v for k, v in stats.items() if not k.startswith("_") and k != "recent_result_ids"}
@@ -0,0 +1,230 @@
+"""
+Near-duplicate questions across the QA sets of an article
+
+Regenerating QA for an article and saving the result again piles up
+paraphrases of the same questions. Each article gets a MinHash / LSH index
+over the questions already saved for it:
+
+- a question is reduced to its text plus the text of its correct answer,
+  lowercased with punctuation dropped, and cut into character 5-gram
+  shingles (robust to small rewordings and Vietnamese word splits)
+- the shingles are summarised by a 64-value MinHash signature (one-permutation
+  hashing: each shingle hash lands in one of 64 bins and each bin keeps its
+  minimum; empty bins borrow from the next filled one). The share of equal
+  values estimates the Jaccard similarity of two questions
+- signatures are split into 16 bands of 4 values and bucketed per band, so an
+  insert only compares against questions sharing a bucket (~0.5 similarity
+  and up are found with high probability) instead of every saved question
+
+Indexes are built lazily from the article's QA sets, cached per process
+(LRU + TTL) and invalidated whenever one of the article's sets changes.
+"""
+
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config.settings import SETTINGS
+from backend.repository.qa_repo import get_qa_by_article_id
+from backend.service.answer_key_service import CHOICE_CODES, CHOICES
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+
+_BIN_BITS = 6  # 2 ** 6 == NUM_PERMUTATIONS
+_BORROW_OFFSET = 1 << (32 - _BIN_BITS)  # Keeps borrowed values apart from real ones
+_NON_WORD = re.compile(r"[\W_]+")
+
+Signature = Tuple[int, ...]
+
+
+def question_text(question: Dict[str, Any]) -> str:
+    """Question plus correct answer text, lowercased, punctuation collapsed to single spaces"""
+    code = CHOICE_CODES.get(str(question.get("correct_answer") or "").strip())
+    correct = question.get(CHOICES[code]) if code is not None else ""
+    return _NON_WORD.sub(" ", f"{question.get('question') or ''} {correct or ''}".lower()).strip()
+
+
+def signature(question: Dict[str, Any]) -> Optional[Signature]:
+    text = question_text(question)
+    if not text:
+        return None
+    # crc32 is stable across processes (unlike hash()), so cached signatures stay comparable
+    bins: List[Optional[int]] = [None] * NUM_PERMUTATIONS
+    for i in range(max(1, len(text) - SHINGLE_SIZE + 1)):
+        h = zlib.crc32(text[i:i + SHINGLE_SIZE].encode())
+        b, value = h & (NUM_PERMUTATIONS - 1), h >> _BIN_BITS
+        if bins[b] is None or value < bins[b]:
+            bins[b] = value
+    # Densify: an empty bin takes the next filled bin's value, offset by the distance
+    result = []
+    for b in range(NUM_PERMUTATIONS):
+        distance = 0
+        while bins[(b + distance) % NUM_PERMUTATIONS] is None:
+            distance += 1
+        result.append(bins[(b + distance) % NUM_PERMUTATIONS] + distance * _BORROW_OFFSET)
+    return tuple(result)
+
+
+def similarity(left: Signature, right: Signature) -> float:
+    return sum(1 for x, y in zip(left, right) if x == y) / NUM_PERMUTATIONS
+
+
+@dataclass
+class _Entry:
+    qa_id: str
+    question_id: Optional[str]
+    signature: Signature
+
+
+@dataclass
+class ArticleQuestionIndex:
+    article_id: str
+    built_at: float = field(default_factory=time.monotonic)
+    entries: List[_Entry] = field(default_factory=list)
+    buckets: List[Dict[Signature, List[int]]] = field(default_factory=lambda: [{} for _ in range(BANDS)])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, qa_id: str, question_id: Optional[str], sig: Signature):
+        position = len(self.entries)
+        self.entries.append(_Entry(qa_id, question_id, sig))
+        for band in range(BANDS):
+            self.buckets[band].setdefault(sig[band * ROWS:(band + 1) * ROWS], []).append(position)
+
+    def find(self, sig: Signature, threshold: float) -> Optional[Dict[str, Any]]:
+        """Most similar indexed question at or above threshold, checking LSH candidates only"""
+        candidates = set()
+        for band in range(BANDS):
+            candidates.update(self.buckets[band].get(sig[band * ROWS:(band + 1) * ROWS], ()))
+        best, best_score = None, threshold
+        for position in candidates:
+            score = similarity(sig, self.entries[position].signature)
+            if score >= best_score:
+                best, best_score = self.entries[position], score
+        if best is None:
+            return None
+        return {"qa_id": best.qa_id, "question_id": best.question_id, "similarity": round(best_score, 3)}
+
+
+def build_index(article_id: str, qa_sets: List[Dict[str, Any]]) -> ArticleQuestionIndex:
+    """Index every question of the given sets, oldest set first"""
+    index = ArticleQuestionIndex(article_id)
+    for qa in sorted(qa_sets, key=lambda qa: qa.get("created_at") or ""):
+        for question in qa.get("questions") or []:
+            sig = signature(question)
+            if sig is not None:
+                index.add(qa["id"], question.get("question_id"), sig)
+    return index
+
+
+class QuestionIndexCache:
+    """Process-local LRU of per-article indexes; TTL bounds staleness across workers"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, ArticleQuestionIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, article_id: str) -> Optional[ArticleQuestionIndex]:
+        index = self._entries.get(article_id)
+        if index is None or time.monotonic() - index.built_at > self.ttl_seconds:
+            return None
+        self._entries.move_to_end(article_id)
+        return index
+
+    def put(self, index: ArticleQuestionIndex):
+        self._entries[index.article_id] = index
+        self._entries.move_to_end(index.article_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, article_id: Optional[str]):
+        if article_id:
+            self._entries.pop(article_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+question_index_cache = QuestionIndexCache(
+    max_entries=SETTINGS.qa_dedupe_index_cache_size,
+    ttl_seconds=SETTINGS.qa_dedupe_index_ttl_seconds,
+)
+
+
+async def get_article_index(article_id: str) -> ArticleQuestionIndex:
+    index = question_index_cache.get(article_id)
+    if index is not None:
+        question_index_cache.hits += 1
+        return index
+    question_index_cache.misses += 1
+    index = build_index(article_id, await get_qa_by_article_id(article_id) or [])
+    question_index_cache.put(index)
+    return index
+
+
+def invalidate_article_index(article_id: Optional[str]):
+    question_index_cache.invalidate(article_id)
+
+
+async def screen_new_set(qa_data: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Match each question of a set about to be saved against the article's
+    saved questions and the earlier questions of the same set. Returns one
+    match (or None) per question; unmatched questions are added to the index.
+    """
+    article_id = qa_data.get("article_id")
+    if not article_id:
+        return [None] * len(qa_data.get("questions") or [])
+    index = await get_article_index(article_id)
+    threshold = SETTINGS.qa_dedupe_similarity
+    matches = []
+    for question in qa_data.get("questions") or []:
+        sig = signature(question)
+        match = index.find(sig, threshold) if sig is not None else None
+        if sig is not None and match is None:
+            index.add(qa_data["id"], question.get("question_id"), sig)
+        matches.append(match)
+    return matches
+
+
+def plan_dedupe(article_id: str, qa_sets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Walk the article's sets oldest first and list, per set, the questions
+    that repeat an earlier one. A set is never emptied: if every question is
+    a duplicate the set is left as is and reported as skipped.
+    """
+    index = ArticleQuestionIndex(article_id)
+    threshold = SETTINGS.qa_dedupe_similarity
+    plan = []
+    for qa in sorted(qa_sets, key=lambda qa: qa.get("created_at") or ""):
+        questions = qa.get("questions") or []
+        kept, duplicates = [], []
+        for question in questions:
+            sig = signature(question)
+            match = index.find(sig, threshold) if sig is not None else None
+            if match is None:
+                kept.append(question)
+                if sig is not None:
+                    index.add(qa["id"], question.get("question_id"), sig)
+            else:
+                duplicates.append({"question_id": question.get("question_id"),
+                                   "question": question.get("question"), "duplicate_of": match})
+        skipped = bool(duplicates) and not kept
+        plan.append({
+            "qa_id": qa["id"],
+            "total_questions": len(questions),
+            "duplicates": duplicates,
+            "kept": [] if skipped else kept,
+            "skipped": skipped,
+        })
+    return plan
@@ -81,6 +81,9 @@ class RedisArticleService:
                     "tags": article_data.get("tags", []),  # Keep as list
                     "image_url": article_data.get("image", ""),
                 }
+                if article_data.get("qa"):
+                    # QA set written together with the translation (NEWS_INGEST_QA)
+                    redis_article["qa"] = article_data["qa"]
                 redis_articles.append(redis_article)
             
             today = datetime.now().strftime("%Y%m%d")  # dạng 20250916
@@ -120,6 +123,12 @@ class RedisArticleService:
             print(f"Error: Error retrieving pending articles: {e}")
             return []
         
+    def get_pending_article(self, article_id: str) -> Optional[Dict[str, Any]]:
+        for article in self.get_pending_articles():
+            if article.get("id") == article_id:
+                return article
+        return None
+
     def delete_one_pending_article(self, article_id: str) -> bool:
         print(f"🗑️ Redis: Attempting to delete article ID: {article_id}")
         if not self.is_connected():
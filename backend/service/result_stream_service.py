@@ -0,0 +1,233 @@
+"""
+Write-behind ingestion of QA results through a Redis stream
+
+With RESULTS_WRITE_BEHIND on, a submission is graded, appended to a Redis
+stream and answered immediately; a consumer group running in every API
+process flushes the stream to the repository in batches.
+
+- Delivery is at-least-once: an entry is acknowledged (and deleted) only
+  after its document has been written. Entries left unacknowledged by a
+  failed write or a dead consumer are re-claimed after
+  RESULTS_STREAM_CLAIM_IDLE_MS.
+- Writes are idempotent: the result id is fixed when the result is graded,
+  so a re-delivered entry whose document already exists counts as flushed.
+- Until flushed, a result is also kept in a hash (plus a per-user id set)
+  so reads of just-submitted results are served from the buffer.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from backend.config.settings import SETTINGS
+from backend.database.redis_async import get_redis
+from backend.repository.base import is_item_exists
+from backend.repository.factory import get_qa_result_repository
+
+logger = logging.getLogger(__name__)
+
+GROUP_NAME = "qa_result_writers"
+
+
+def _pending_key() -> str:
+    return f"{SETTINGS.results_stream_key}:pending"
+
+
+def _user_key(user_id: str) -> str:
+    return f"{SETTINGS.results_stream_key}:pending:user:{user_id}"
+
+
+async def enqueue_results(qa_results: List[Dict[str, Any]]):
+    """Append graded results to the stream and the read buffer in one transaction.
+
+    Raises when Redis is not configured or unavailable; callers then write
+    directly to the repository instead.
+    """
+    client = get_redis()
+    if client is None:
+        raise RuntimeError("REDIS_URL is not configured")
+    pipe = client.pipeline(transaction=True)
+    for qa_result in qa_results:
+        document = json.dumps(qa_result)
+        pipe.xadd(SETTINGS.results_stream_key, {"id": qa_result["id"], "doc": document})
+        pipe.hset(_pending_key(), qa_result["id"], document)
+        pipe.sadd(_user_key(qa_result["user_id"]), qa_result["id"])
+    await pipe.execute()
+    result_stream_consumer.enqueued += len(qa_results)
+
+
+async def get_buffered_result(qa_result_id: str) -> Optional[Dict[str, Any]]:
+    client = get_redis()
+    if client is None:
+        return None
+    document = await client.hget(_pending_key(), qa_result_id)
+    return json.loads(document) if document else None
+
+
+async def get_buffered_results_for_user(user_id: str, qa_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    client = get_redis()
+    if client is None:
+        return []
+    ids = await client.smembers(_user_key(user_id))
+    if not ids:
+        return []
+    documents = [json.loads(d) for d in await client.hmget(_pending_key(), list(ids)) if d]
+    return [d for d in documents if qa_id is None or d.get("qa_id") == qa_id]
+
+
+class ResultStreamConsumer:
+    """Consumer-group member that flushes buffered results to the repository"""
+
+    def __init__(self):
+        self.name = uuid.uuid4().hex[:12]
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._claim_cursor = "0-0"
+        self.enqueued = 0
+        self.flushed = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+
+    async def _ensure_group(self, client):
+        try:
+            await client.xgroup_create(SETTINGS.results_stream_key, GROUP_NAME, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _claim_stale(self, client) -> list:
+        """Take over entries another consumer (or a failed flush) left unacknowledged"""
+        next_cursor, entries, *_ = await client.xautoclaim(
+            SETTINGS.results_stream_key, GROUP_NAME, self.name,
+            min_idle_time=SETTINGS.results_stream_claim_idle_ms,
+            start_id=self._claim_cursor,
+            count=SETTINGS.results_stream_batch_size,
+        )
+        self._claim_cursor = next_cursor
+        return entries
+
+    async def flush(self, client, entries: list) -> int:
+        """Write one batch of stream entries; returns how many were acknowledged"""
+        started = time.perf_counter()
+        done_ids, documents, document_entry_ids = [], [], []
+        for entry_id, fields in entries:
+            try:
+                documents.append(json.loads(fields["doc"]))
+                document_entry_ids.append(entry_id)
+            except (KeyError, TypeError, ValueError):
+                # Unreadable entry: retrying cannot help, drop it
+                logger.error(f"❌ Dropping malformed result stream entry {entry_id}")
+                done_ids.append(entry_id)
+
+        written = await get_qa_result_repository().create_many(documents, SETTINGS.results_bulk_concurrency)
+        done_documents = []
+        for entry_id, document, outcome in zip(document_entry_ids, documents, written):
+            if not isinstance(outcome, Exception):
+                self.flushed += 1
+            elif is_item_exists(outcome):
+                # Re-delivery of an entry whose write already succeeded
+                self.duplicates += 1
+            else:
+                self.failed += 1
+                logger.warning(f"⚠️ Result {document.get('id')} not flushed, will retry: {outcome}")
+                continue
+            done_ids.append(entry_id)
+            done_documents.append(document)
+
+        if done_ids:
+            pipe = client.pipeline(transaction=False)
+            pipe.xack(SETTINGS.results_stream_key, GROUP_NAME, *done_ids)
+            pipe.xdel(SETTINGS.results_stream_key, *done_ids)
+            for document in done_documents:
+                pipe.hdel(_pending_key(), document["id"])
+                pipe.srem(_user_key(document.get("user_id")), document["id"])
+            await pipe.execute()
+
+        self.batches += 1
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return len(done_ids)
+
+    async def _run(self):
+        group_ready = False
+        while not self._stopping.is_set():
+            client = get_redis()
+            try:
+                if not group_ready:
+                    await self._ensure_group(client)
+                    group_ready = True
+                entries = await self._claim_stale(client)
+                if not entries:
+                    response = await client.xreadgroup(
+                        GROUP_NAME, self.name, {SETTINGS.results_stream_key: ">"},
+                        count=SETTINGS.results_stream_batch_size,
+                        block=SETTINGS.results_stream_block_ms,
+                    )
+                    entries = response[0][1] if response else []
+                if entries:
+                    await self.flush(client, entries)
+            except Exception as e:
+                logger.error(f"❌ Result stream consumer error: {e}")
+                group_ready = False
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=1)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if self._task is None and get_redis() is not None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Result stream consumer started ({self.name})")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        logger.info("Result stream consumer stopped")
+
+    async def stats(self) -> Dict[str, Any]:
+        """Consumer counters plus stream lag as reported by Redis"""
+        stats = {
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+        }
+        client = get_redis()
+        if client is None:
+            return stats
+        try:
+            stats["length"] = await client.xlen(SETTINGS.results_stream_key)
+            groups = await client.xinfo_groups(SETTINGS.results_stream_key)
+            group = next((g for g in groups if g["name"] == GROUP_NAME), None)
+            if group:
+                stats["unacknowledged"] = group["pending"]
+                stats["lag"] = group.get("lag")
+            summary = await client.xpending(SETTINGS.results_stream_key, GROUP_NAME)
+            oldest = summary.get("min") if summary else None
+            if oldest:
+                stats["oldest_unacknowledged_age_ms"] = int(time.time() * 1000) - int(oldest.split("-")[0])
+        except Exception as e:
+            stats["error"] = str(e)
+        return stats
+
+
+result_stream_consumer = ResultStreamConsumer()
+
+
+async def start_result_stream_consumer():
+    if SETTINGS.results_write_behind:
+        result_stream_consumer.start()
+
+
+async def stop_result_stream_consumer():
+    await result_stream_consumer.stop()
@@ -0,0 +1,134 @@
+"""
+Text normalization for LLM inputs
+
+One linear pass over HTML (or plain text) with a regex tokenizer:
+- tags are dropped; script / style / noscript contents are skipped
+- entities are decoded (&amp;, &nbsp;, &#8211; ...)
+- whitespace is collapsed; block tags (<p>, <li>, <h3>, <br> ...) and blank
+  lines in plain text become paragraph breaks ("\n\n"), so chunkers can
+  split on them
+- control characters are removed; everything else ($, %, /, math, code,
+  Vietnamese diacritics) is kept
+- with max_length, input is only consumed until the limit is passed and
+  the result is cut back to the last sentence end
+
+Used for every prompt built from article text: QA generation, news
+paraphrasing and article generation.
+"""
+
+import html
+import re
+from typing import List, Optional
+
+PARAGRAPH_BREAK = "\n\n"
+
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption",
+    "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+    "nav", "ol", "p", "pre", "section", "table", "tbody", "td", "th", "thead", "tr", "ul",
+})
+SKIP_TAGS = frozenset({"head", "noscript", "script", "style", "template"})
+
+# One token per match: comment, tag (quoted attribute values may contain ">"), declaration,
+# text run, or a "<" that starts none of these (kept as text, e.g. "a < b")
+_TOKEN = re.compile(
+    r"<!--.*?(?:-->|\Z)"
+    r"|<(/?)([a-zA-Z][a-zA-Z0-9:-]*)(?:[^<>\"']|\"[^\"]*\"|'[^']*')*>"
+    r"|<[!?][^>]*>?"
+    r"|[^<]+"
+    r"|<",
+    re.S,
+)
+# C0/C1 control characters other than whitespace
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0e-\x1f\x7f-\x9f]")
+_SKIP_END = {name: re.compile(rf"</{name}\b", re.I) for name in SKIP_TAGS}
+_BLANK_LINE = re.compile(r"\n[ \t\r\f\v]*\n")
+_SENTENCE_END = re.compile(r"[.!?…][\"')\]]*(?=\s)")
+
+
+class _Collector:
+    """Accumulates whitespace-collapsed text into paragraphs"""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.paragraphs: List[str] = []
+        self.length = 0
+        self._current: List[str] = []
+        self._current_length = 0
+        self._pending_space = False
+
+    @property
+    def full(self) -> bool:
+        return self.limit is not None and self.length + self._current_length > self.limit
+
+    def end_paragraph(self):
+        if self._current:
+            paragraph = "".join(self._current)
+            self.paragraphs.append(paragraph)
+            self.length += len(paragraph) + len(PARAGRAPH_BREAK)
+            self._current = []
+            self._current_length = 0
+        self._pending_space = False
+
+    def add_text(self, data: str):
+        if "&" in data:
+            data = html.unescape(data)
+        data = _CONTROL_CHARS.sub("", data)
+        for i, block in enumerate(_BLANK_LINE.split(data) if "\n" in data else (data,)):
+            if i:
+                self.end_paragraph()
+            words = " ".join(block.split())
+            if not words:
+                self._pending_space = self._pending_space or bool(block)
+                continue
+            if self._current and (self._pending_space or block[0].isspace()):
+                self._current.append(" ")
+                self._current_length += 1
+            self._current.append(words)
+            self._current_length += len(words)
+            self._pending_space = block[-1].isspace()
+
+
+def truncate_at_sentence(text: str, max_length: int) -> str:
+    """Cut to max_length at the last sentence end (or paragraph break, or word) in the second half"""
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length + 1]
+    floor = max_length // 2
+    boundary = max((m.end() for m in _SENTENCE_END.finditer(cut, floor - 1) if m.end() <= max_length), default=-1)
+    if boundary < 0:
+        boundary = cut.rfind(PARAGRAPH_BREAK, floor)
+    if boundary < 0:
+        boundary = cut.rfind(" ", floor)
+    return (cut[:boundary] if boundary > 0 else text[:max_length]).rstrip()
+
+
+def normalize_text(text: Optional[str], max_length: Optional[int] = None, keep_paragraphs: bool = True) -> str:
+    """HTML or plain text -> clean text, paragraphs separated by a blank line"""
+    if not text:
+        return ""
+    collector = _Collector(max_length)
+    position, end = 0, len(text)
+    while position < end and not collector.full:
+        token = _TOKEN.match(text, position)
+        position = token.end()
+        name = token.group(2)
+        if name is None:
+            if token.group(0)[0] != "<" or token.group(0) == "<":
+                collector.add_text(token.group(0))
+            continue
+        name = name.lower()
+        if name in SKIP_TAGS and not token.group(1):
+            # Jump over the element body; an unclosed one runs to the end
+            close = _SKIP_END[name].search(text, position)
+            position = close.start() if close else end
+        elif name in BLOCK_TAGS:
+            collector.end_paragraph()
+    collector.end_paragraph()
+    result = (PARAGRAPH_BREAK if keep_paragraphs else " ").join(collector.paragraphs)
+    return truncate_at_sentence(result, max_length) if max_length is not None else result
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Paragraphs of normalize_text output"""
+    return [p for p in text.split(PARAGRAPH_BREAK) if p]
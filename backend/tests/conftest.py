@@ -0,0 +1,51 @@
+"""
+Test setup: the suite runs offline
+
+Run from the repository root: python -m pytest backend/tests
+Settings are read at import time, so the environment is fixed here before
+any backend module is imported: in-memory repositories, no Redis, no
+generation caches and the fake LLM backend.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+for name, value in {
+    "AZURE_SEARCH_ENDPOINT": "https://search.invalid",
+    "AZURE_SEARCH_KEY": "test",
+    "REPOSITORY_BACKEND": "memory",
+    "REDIS_URL": "",
+    "QA_GENERATION_CACHE": "off",
+    "LLM_BACKEND": "fake",
+}.items():
+    os.environ[name] = value
+
+
+import pytest
+
+
+@pytest.fixture
+def fake_llm():
+    """configure(**settings) applies LLM settings and routes llm_gateway to a fresh FakeLLMBackend"""
+    from backend.config.settings import SETTINGS
+    from backend.service.llm_gateway import FakeLLMBackend, llm_gateway
+
+    saved = {}
+
+    def configure(**values):
+        # Fast retries and a small breaker unless the test says otherwise
+        values = {"llm_max_retries": 2, "llm_retry_base_seconds": 0.01, "llm_retry_max_seconds": 2.0,
+                  "llm_breaker_failures": 3, "llm_breaker_reset_seconds": 0.2, "llm_timeout_seconds": 5.0, **values}
+        for name, value in values.items():
+            saved.setdefault(name, getattr(SETTINGS, name))
+            object.__setattr__(SETTINGS, name, value)  # Settings is a frozen dataclass
+        backend = FakeLLMBackend()
+        llm_gateway.use_backend(backend)
+        return backend
+
+    yield configure
+    for name, value in saved.items():
+        object.__setattr__(SETTINGS, name, value)
+    llm_gateway.use_backend(None)
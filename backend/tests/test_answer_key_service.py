@@ -0,0 +1,88 @@
+import asyncio
+
+from backend.service import answer_key_service
+from backend.service.answer_key_service import AnswerKeyCache, compile_answer_key, get_answer_key, grade, invalidate_answer_key
+
+
+class SharedGenerations:
+    """Stands in for the Redis generation counters every worker reads"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key) or 0) + 1
+        return self.values[key]
+
+
+def _qa(correct: str, etag: str) -> dict:
+    return {
+        "id": "qa1", "_etag": etag,
+        "questions": [{"question_id": "q1", "question": "?", "answer_a": "x", "answer_b": "y",
+                       "answer_c": "z", "answer_d": "w", "correct_answer": correct}],
+    }
+
+
+def test_grading_requires_an_exact_match():
+    key = compile_answer_key(_qa("answer_b", "1"))
+    assert grade(key, {"q1": "answer_b"}).correct_count == 1
+    for alias in ("B", "b", " answer_b", "y"):
+        assert grade(key, {"q1": alias}).correct_count == 0
+
+
+def _use_worker_cache(monkeypatch, redis):
+    monkeypatch.setattr(answer_key_service, "answer_key_cache", AnswerKeyCache(max_entries=10, ttl_seconds=300))
+    monkeypatch.setattr(answer_key_service, "get_redis", lambda: redis)
+
+
+def test_edit_on_another_worker_bumps_the_generation(monkeypatch):
+    stored = {"qa": _qa("answer_a", "1")}
+
+    async def find_by_id(qa_id):
+        return stored["qa"]
+
+    redis = SharedGenerations()
+    monkeypatch.setattr(answer_key_service, "find_by_id", find_by_id)
+    _use_worker_cache(monkeypatch, redis)
+
+    async def scenario():
+        first = await get_answer_key("qa1")
+        assert (await get_answer_key("qa1")) is first
+        # Another worker edits the QA: this worker's local entry is untouched, only Redis changes
+        stored["qa"] = _qa("answer_c", "2")
+        await redis.incr(answer_key_service.generation_key("qa1"))
+        return await get_answer_key("qa1")
+
+    key = asyncio.run(scenario())
+    assert grade(key, {"q1": "answer_c"}).correct_count == 1
+    assert answer_key_service.answer_key_cache.hits == 1
+
+
+def test_without_redis_the_key_follows_the_qa_etag(monkeypatch):
+    stored = {"qa": _qa("answer_a", "1")}
+
+    async def find_by_id(qa_id):
+        return stored["qa"]
+
+    monkeypatch.setattr(answer_key_service, "find_by_id", find_by_id)
+    _use_worker_cache(monkeypatch, None)
+
+    async def scenario():
+        first = await get_answer_key("qa1")
+        assert (await get_answer_key("qa1")) is first
+        stored["qa"] = _qa("answer_d", "2")
+        return await get_answer_key("qa1")
+
+    key = asyncio.run(scenario())
+    assert key.version == "2"
+    assert grade(key, {"q1": "answer_d"}).correct_count == 1
+
+
+def test_invalidate_bumps_the_shared_generation(monkeypatch):
+    redis = SharedGenerations()
+    _use_worker_cache(monkeypatch, redis)
+    asyncio.run(invalidate_answer_key("qa1"))
+    assert redis.values[answer_key_service.generation_key("qa1")] == 1
@@ -0,0 +1,31 @@
+from backend.service.content_processor import ContentProcessor, process_content
+
+CODE_SPAN = "Try `<img src=x onerror=alert(1)>` now"
+FENCE = "```html\n<script>alert(1)</script>\n<img src=x onerror=alert(1)>\n```"
+
+
+def test_code_spans_and_fences_are_escaped_in_html_output():
+    for content in (CODE_SPAN, FENCE, f"<p>{CODE_SPAN}</p>{FENCE}"):
+        processed = process_content(content, "html")
+        assert "<img" not in processed and "<script" not in processed
+        assert "&lt;img src=x onerror=alert(1)&gt;" in processed
+
+
+def test_html_is_the_default_output_format():
+    assert "<script" not in process_content(FENCE)
+
+
+def test_markdown_output_keeps_code_verbatim_for_the_renderer():
+    assert process_content(CODE_SPAN, "markdown") == CODE_SPAN
+    assert process_content(FENCE, "markdown") == FENCE
+
+
+def test_streamed_code_is_escaped_like_the_final_article():
+    processor = ContentProcessor("html")
+    streamed = "".join(processor.feed(FENCE[i:i + 5]) for i in range(0, len(FENCE), 5)) + processor.close()
+    assert streamed == process_content(FENCE, "html")
+    assert "<script" not in streamed
+
+
+def test_tags_outside_code_are_still_sanitized_in_markdown():
+    assert process_content("text <img src=x onerror=alert(1)> `<b>`", "markdown") == 'text <img src="x"> `<b>`'
@@ -0,0 +1,141 @@
+import asyncio
+
+from backend.monitoring.cosmos_metrics import ResponseCost, cosmos_metrics, query_all, track_call
+
+
+class FakeContainer:
+    """Calls response_hook with its own headers; last_response_headers is shared and overwritten"""
+
+    def __init__(self, charge: float, delay: float, client):
+        self.charge, self.delay, self.client_connection = charge, delay, client
+
+    async def create_item(self, body, response_hook=None):
+        await asyncio.sleep(self.delay)
+        headers = {"x-ms-request-charge": str(self.charge), "x-ms-request-duration-ms": "1.5"}
+        self.client_connection.last_response_headers = headers
+        await asyncio.sleep(0)  # Another request may finish here
+        response_hook(headers, body)
+        return body
+
+    def query_items(self, query, response_hook=None):
+        container = self
+
+        class Pager:
+            def by_page(self):
+                async def pages():
+                    for page in ([1, 2], [3]):
+                        response_hook({"x-ms-request-charge": str(container.charge)}, page)
+
+                        async def items(page=page):
+                            for item in page:
+                                yield item
+                        yield items()
+                return pages()
+        return Pager()
+
+
+def test_concurrent_calls_are_charged_their_own_request_charge():
+    cosmos_metrics.reset()
+    client = type("Client", (), {"last_response_headers": {}})()
+    cheap, expensive = FakeContainer(1.0, 0.01, client), FakeContainer(50.0, 0.0, client)
+
+    async def run():
+        await asyncio.gather(*(
+            track_call(op, container.create_item, body={"id": str(i)})
+            for i in range(20)
+            for op, container in (("cheap.create", cheap), ("expensive.create", expensive))
+        ))
+
+    asyncio.run(run())
+    snapshot = cosmos_metrics.snapshot()["operations"]
+    assert snapshot["cheap.create"]["request_charge"]["sum"] == 20.0
+    assert snapshot["expensive.create"]["request_charge"]["sum"] == 1000.0
+
+
+def test_query_pages_record_their_charge():
+    cosmos_metrics.reset()
+    container = FakeContainer(2.5, 0, None)
+    items = asyncio.run(query_all("query", container.query_items, query="SELECT * FROM c"))
+    assert items == [1, 2, 3]
+    stats = cosmos_metrics.snapshot()["operations"]["query"]
+    assert stats["request_charge"]["sum"] == 5.0
+
+
+def test_response_cost_sums_backend_requests_of_a_page():
+    cost = ResponseCost()
+    cost({"x-ms-request-charge": "2", "x-ms-request-duration-ms": "1", "x-ms-activity-id": "a"})
+    cost({"x-ms-request-charge": "3.5", "x-ms-request-duration-ms": "2"})
+    assert (cost.request_charge, cost.server_ms, cost.activity_id) == (5.5, 3.0, "a")
+
+
+def test_metrics_reset_needs_debug_metrics():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from backend.config.settings import SETTINGS
+    from backend.routes.metrics import metrics
+
+    app = FastAPI()
+    app.include_router(metrics)
+    assert not SETTINGS.debug_metrics
+    assert TestClient(app).delete("/metrics").status_code == 404
+
+
+def test_change_feed_continuation_comes_from_the_page_iterator(monkeypatch):
+    from backend.repository import cosmos_backend
+
+    class Pages:
+        """Like AsyncPageIterator: continuation_token follows the last page fetched"""
+
+        def __init__(self):
+            self.remaining = [("token-1", [{"id": "a"}]), ("token-2", [{"id": "b"}])]
+            self.continuation_token = None
+
+        async def __anext__(self):
+            if not self.remaining:
+                raise StopAsyncIteration
+            self.continuation_token, page = self.remaining.pop(0)
+
+            async def items():
+                for item in page:
+                    yield item
+            return items()
+
+    class Container:
+        # Another request's response, which must not leak into this feed's continuation
+        client_connection = type("Client", (), {"last_response_headers": {"etag": "someone-else"}})()
+
+        def query_items_change_feed(self, **kwargs):
+            return type("Feed", (), {"by_page": lambda feed: Pages()})()
+
+    async def get_container():
+        return Container()
+
+    monkeypatch.setattr(cosmos_backend, "get_qas_result_container", get_container)
+    items, continuation = asyncio.run(cosmos_backend.CosmosQAResultRepository().read_changes(None, 10))
+    assert [item["id"] for item in items] == ["a", "b"]
+    assert continuation == "token-2"
+
+
+def test_route_cost_includes_queries_made_while_streaming():
+    from backend.monitoring.cosmos_metrics import begin_request, record_route_when_done
+
+    cosmos_metrics.reset()
+    container = FakeContainer(4.0, 0, None)
+
+    async def run():
+        totals = begin_request()
+
+        async def body():
+            yield "["
+            for item in await query_all("query", container.query_items, query="SELECT * FROM c"):
+                yield str(item)
+            yield "]"
+
+        streamed = record_route_when_done(body(), "GET /api/qas-results/", totals)
+        first = await streamed.__anext__()
+        assert first == "[" and not cosmos_metrics.routes
+        return first + "".join([chunk async for chunk in streamed])
+
+    assert asyncio.run(run()) == "[123]"
+    assert cosmos_metrics.snapshot()["routes"]["GET /api/qas-results/"]["sum"] == 8.0
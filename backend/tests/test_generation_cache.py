@@ -0,0 +1,100 @@
+import asyncio
+import unicodedata
+
+import pytest
+
+from backend.service.article_generation_service import ArticleGenerationService
+from backend.service.generation_cache import DiskGenerationCache, GenerationCache, normalize_query
+
+
+@pytest.fixture
+def articles(tmp_path, fake_llm):
+    """Article service on a disk cache, with the LLM answering through a FakeLLMBackend"""
+    backend = fake_llm()
+    service = ArticleGenerationService()
+    service.generation_cache = DiskGenerationCache(3600, str(tmp_path / "articles"))
+    service.suggestions_cache = DiskGenerationCache(3600, str(tmp_path / "suggestions"))
+    return service, backend
+
+
+def test_normalize_query_keeps_vietnamese_marks_distinct():
+    decomposed = unicodedata.normalize("NFD", "Tr\u00ed tu\u1ec7 nh\u00e2n t\u1ea1o")
+    assert normalize_query(f"  {decomposed.upper()}\n") == normalize_query("tr\u00ed tu\u1ec7 nh\u00e2n t\u1ea1o")
+    assert normalize_query("bán") != normalize_query("ban")
+
+
+def test_same_topic_is_generated_once(articles):
+    service, backend = articles
+
+    async def scenario():
+        first = await service.generate_article("Kubernetes  Autoscaling")
+        second = await service.generate_article("kubernetes autoscaling")
+        other_format = await service.generate_article("kubernetes autoscaling", output_format="html")
+        return first, second, other_format
+
+    first, second, other_format = asyncio.run(scenario())
+    assert first["success"] and not first["cached"]
+    assert second["cached"] and second["content"] == first["content"]
+    assert not other_format["cached"]
+    assert len(backend.requests) == 2
+
+
+def test_concurrent_misses_share_one_call(articles):
+    service, backend = articles
+    backend.latency_seconds = 0.05
+
+    async def scenario():
+        return await asyncio.gather(*(service.generate_article("Edge computing") for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert all(result["success"] for result in results)
+    assert len(backend.requests) == 1 and service.generation_cache.coalesced == 2
+
+
+def test_failures_are_not_cached_and_bypass_refreshes(articles):
+    service, backend = articles
+    backend.fail(3, status=503)
+
+    async def scenario():
+        failed = await service.generate_article("Rust in the kernel")
+        retried = await service.generate_article("Rust in the kernel")
+        bypassed = await service.generate_article("Rust in the kernel", bypass_cache=True)
+        return failed, retried, bypassed
+
+    failed, retried, bypassed = asyncio.run(scenario())
+    assert not failed["success"]
+    assert retried["success"] and not retried["cached"]
+    assert bypassed["success"] and not bypassed["cached"]
+    assert len(backend.requests) == 3 + 2
+
+
+def test_stale_entries_are_served_while_refreshing():
+    cache = GenerationCache(3600)
+    stored = {}
+
+    async def load(key):
+        return stored.get(key)
+
+    async def store(key, value):
+        stored[key] = value
+
+    cache._load, cache._store = load, store
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"success": True, "version": len(calls)}
+
+    async def scenario():
+        first = await cache.get_or_compute("k", compute, fresh_seconds=0)
+        await asyncio.sleep(0.01)
+        stale = await cache.get_or_compute("k", compute, fresh_seconds=0)
+        await asyncio.sleep(0.01)  # Let the background refresh finish
+        fresh = await cache.get_or_compute("k", compute, fresh_seconds=3600)
+        return first, stale, fresh
+
+    first, stale, fresh = asyncio.run(scenario())
+    assert first == ({"success": True, "version": 1}, "computed")
+    assert stale == ({"success": True, "version": 1}, "stale")
+    assert fresh == ({"success": True, "version": 2}, "cache")
+    assert cache.revalidations == 1
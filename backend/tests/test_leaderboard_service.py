@@ -0,0 +1,16 @@
+import asyncio
+
+from backend.service import leaderboard_service as module
+from backend.service.leaderboard_service import LeaderboardService
+
+
+def test_leaderboards_without_redis(monkeypatch):
+    monkeypatch.setattr(module, "get_redis", lambda: None)
+    service = LeaderboardService()
+
+    async def scenario():
+        await service.swap_in("leaderboard:staging", ["qa1"])
+        return await service.get_global_leaderboard(1, 10), await service.get_qa_rank("qa1", "u1")
+
+    top, rank = asyncio.run(scenario())
+    assert top["items"] == [] and rank is None
@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import openai
+import pytest
+
+from backend.service.llm_gateway import CircuitOpenError, DeadlineExceededError, llm_gateway
+from backend.service.qa_generation_service import qa_generation_service
+
+MESSAGES = [{"role": "system", "content": "Answer in JSON"}, {"role": "user", "content": "hello"}]
+CONTENT = " ".join(f"Sentence {i} explains one more part of the new release process." for i in range(40))
+
+
+def complete(**kwargs):
+    return asyncio.run(llm_gateway.complete(MESSAGES, **kwargs))
+
+
+def test_retries_wait_for_retry_after(fake_llm):
+    backend = fake_llm()
+    backend.fail(2, status=429, retry_after=0.2)
+    started = time.perf_counter()
+    response = complete()
+    # Jitter alone would wait at most 0.01 + 0.02s
+    assert time.perf_counter() - started >= 0.4
+    assert response.choices[0].message.content
+    assert len(backend.requests) == 3
+    stats = llm_gateway.stats()
+    assert stats["retries"] == 2 and stats["succeeded"] == 1 and stats["breaker"]["state"] == "closed"
+
+
+def test_retry_after_past_the_deadline_is_not_waited_for(fake_llm):
+    backend = fake_llm()
+    backend.fail(1, status=429, retry_after=1.5)
+    started = time.perf_counter()
+    with pytest.raises(openai.APIStatusError):
+        complete(timeout=0.5)
+    assert time.perf_counter() - started < 0.5
+    assert len(backend.requests) == 1 and llm_gateway.stats()["failed"] == {"429": 1}
+
+
+def test_deadline_covers_a_slow_response(fake_llm):
+    backend = fake_llm()
+    backend.latency_seconds = 0.5
+    with pytest.raises(DeadlineExceededError):
+        complete(timeout=0.1)
+
+
+def test_client_errors_are_not_retried_and_do_not_open_the_circuit(fake_llm):
+    backend = fake_llm(llm_breaker_failures=1)
+    backend.fail(1, status=400)
+    with pytest.raises(openai.BadRequestError):
+        complete()
+    assert len(backend.requests) == 1
+    assert llm_gateway.breaker.state == "closed"
+    complete()
+
+
+def _open_circuit(backend):
+    backend.fail(2, status=503)
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            complete()
+
+
+def test_breaker_opens_after_consecutive_failures(fake_llm):
+    backend = fake_llm(llm_max_retries=0, llm_breaker_failures=2)
+    _open_circuit(backend)
+    with pytest.raises(CircuitOpenError):
+        complete()
+    assert len(backend.requests) == 2
+    stats = llm_gateway.stats()
+    assert stats["breaker"]["state"] == "open" and stats["rejected_circuit_open"] == 1
+    assert not llm_gateway.accepting
+
+
+def test_half_open_lets_one_trial_call_through(fake_llm):
+    backend = fake_llm(llm_max_retries=0, llm_breaker_failures=2, llm_breaker_reset_seconds=0.1)
+    _open_circuit(backend)
+    time.sleep(0.15)
+    backend.latency_seconds = 0.05
+
+    async def two_calls():
+        return await asyncio.gather(llm_gateway.complete(MESSAGES), llm_gateway.complete(MESSAGES),
+                                    return_exceptions=True)
+
+    outcomes = asyncio.run(two_calls())
+    # The trial call succeeds and closes the circuit; the one next to it was rejected
+    assert sum(isinstance(o, CircuitOpenError) for o in outcomes) == 1
+    assert llm_gateway.breaker.state == "closed" and len(backend.requests) == 3
+
+
+def test_failed_trial_call_opens_the_circuit_again(fake_llm):
+    backend = fake_llm(llm_max_retries=0, llm_breaker_failures=2, llm_breaker_reset_seconds=0.1)
+    _open_circuit(backend)
+    time.sleep(0.15)
+    backend.fail(1, status=503)
+    with pytest.raises(openai.InternalServerError):
+        complete()
+    with pytest.raises(CircuitOpenError):
+        complete()
+    assert llm_gateway.breaker.opened == 2
+
+
+def test_qa_generation_falls_back_while_the_endpoint_fails(fake_llm):
+    backend = fake_llm(llm_max_retries=0, llm_breaker_failures=1)
+    backend.fail(1, status=503)
+
+    def generate():
+        return asyncio.run(qa_generation_service.generate_qa_test(
+            article_id="art-1", title="Release process", content=CONTENT, num_questions=5, sectioned=False))
+
+    failed = generate()
+    assert failed["success"] and failed["method_used"] == "fallback"
+    # The circuit is open now: the fallback comes back without another request
+    rejected = generate()
+    assert rejected["method_used"] == "fallback" and len(backend.requests) == 1
+
+    fake_llm(llm_max_retries=0, llm_breaker_failures=1)
+    recovered = generate()
+    assert recovered["method_used"] == "llm" and recovered["questions_count"] == 5
+
+
+def test_cancelled_trial_call_frees_the_half_open_slot(fake_llm):
+    backend = fake_llm(llm_max_retries=0, llm_breaker_failures=2, llm_breaker_reset_seconds=0.1)
+    _open_circuit(backend)
+    time.sleep(0.15)
+    backend.latency_seconds = 0.5
+
+    async def cancel_trial():
+        trial = asyncio.create_task(llm_gateway.complete(MESSAGES))
+        await asyncio.sleep(0.05)  # The trial call is waiting on the endpoint
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancel_trial())
+    backend.latency_seconds = 0
+    assert llm_gateway.accepting
+    complete()
+    assert llm_gateway.breaker.state == "closed"
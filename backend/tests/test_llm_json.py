@@ -0,0 +1,65 @@
+import json
+import random
+
+from backend.service.json_stream import JsonArrayStreamParser, JsonObjectStreamParser
+from backend.service.llm_json import parse_llm_json
+
+ROUND_TRIP_VALUES = [
+    {"content": "line one\nsecond line"},
+    {"content": "first\nnote\ttab then\rreturn, then\ffeed\bback"},
+    {"content": "already escaped LaTeX: $\\frac{1}{2}$, $\\theta$, $\\nabla f$ and $\\times$"},
+    {"content": "a\nnabla \ttheta \rrho \ftext"},
+    {"title": "Quote \"inside\" and a \\ backslash", "tags": ["a", "b\nc"], "count": 3},
+]
+
+
+def _chunks(text: str, rng: random.Random):
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 7)
+        yield text[i:i + size]
+        i += size
+
+
+def test_parse_llm_json_round_trips_json_dumps():
+    for value in ROUND_TRIP_VALUES:
+        for indent in (None, 2):
+            text = json.dumps(value, ensure_ascii=False, indent=indent)
+            assert parse_llm_json(text) == value
+            assert parse_llm_json(f"```json\n{text}\n```") == value
+
+
+def test_array_stream_parser_round_trips_json_dumps():
+    rng = random.Random(7)
+    for indent in (None, 2):
+        text = json.dumps({"questions": ROUND_TRIP_VALUES}, indent=indent)
+        parser, items = JsonArrayStreamParser(), []
+        for chunk in _chunks(text, rng):
+            items.extend(parser.feed(chunk))
+        assert parser.complete and items == ROUND_TRIP_VALUES
+
+
+def test_object_stream_parser_round_trips_json_dumps():
+    rng = random.Random(7)
+    # Word-initial escapes that are not LaTeX command names stay escapes in the streamed strings
+    value = {"title": "line one\nsecond line", "content": "first\nnote\ttab then\rreturn\nend", "tags": ["x\ny"]}
+    text = json.dumps(value, indent=2)
+    parser, fields = JsonObjectStreamParser(), {}
+    for chunk in _chunks(text, rng):
+        for kind, field, decoded in parser.feed(chunk):
+            if kind == "value":
+                fields[field] = decoded
+    assert parser.complete and fields == value
+
+
+def test_repaired_responses_keep_latex_commands():
+    text = '```json\n{"content": "Đạo hàm $\\frac{a}{b}$, $\\alpha \\times \\beta$\nnext line",}\n```'
+    assert parse_llm_json(text) == {"content": "Đạo hàm $\\frac{a}{b}$, $\\alpha \\times \\beta$\nnext line"}
+
+
+def test_fuzz_corpus_decodes_as_intended():
+    from backend.scripts.bench_llm_json import mismatches
+
+    rng = random.Random(42)
+    failed = [mismatches(rng) for _ in range(300)]
+    assert [(text[:200], names) for text, names in failed if names] == []
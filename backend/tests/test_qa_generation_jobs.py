@@ -0,0 +1,43 @@
+import asyncio
+
+from backend.repository.qa_repo import get_qa_by_article_id
+from backend.service import qa_generation_job_service as jobs
+
+
+def _question(text: str) -> dict:
+    return {"question_id": "generated", "question": text, "answer_a": "a", "answer_b": "b",
+            "answer_c": "c", "answer_d": "d", "correct_answer": "answer_a", "explanation": ""}
+
+
+async def _generate_qa_test(article_id, num_questions, **kwargs):
+    if article_id == "art-fallback":
+        return {"success": True, "data": {"article_id": article_id, "questions": [_question("Template?")]},
+                "method_used": "fallback", "warning": "Used fallback questions due to LLM failure"}
+    questions = [_question("What changed in the release?"), _question("Who maintains the project?")]
+    return {"success": True, "data": {"article_id": article_id, "questions": questions},
+            "method_used": "llm", "tokens_used": 120}
+
+
+def test_batch_saves_through_create_question_and_fails_fallback_sets(monkeypatch):
+    monkeypatch.setattr(jobs.qa_generation_service, "generate_qa_test", _generate_qa_test)
+    payload = {"articles": [{"article_id": "art-ok", "title": "t"}, {"article_id": "art-fallback", "title": "t"}],
+               "num_questions": 2, "bypass_cache": True}
+    progress_updates = []
+
+    async def progress(**state):
+        progress_updates.append(state)
+
+    async def scenario():
+        summary = await jobs._run_batch(payload, progress)
+        return summary, await get_qa_by_article_id("art-ok"), await get_qa_by_article_id("art-fallback")
+
+    summary, saved, not_saved = asyncio.run(scenario())
+    assert (summary["done"], summary["failed"]) == (1, 1)
+    assert not not_saved
+    [qa] = saved
+    # create_question stamps fresh question ids and timestamps
+    assert qa["created_at"] and qa["updated_at"]
+    assert all(q["question_id"] != "generated" for q in qa["questions"])
+    items = progress_updates[-1]["items"]
+    assert items[0]["status"] == "done" and items[0]["duplicates"]["found"] == 0
+    assert items[1]["status"] == "failed"
@@ -0,0 +1,31 @@
+import math
+
+from backend.service.qa_generation_service import QA_GENERATION_CONFIG, qa_generation_service
+
+
+def test_long_content_keeps_budget_sized_sections_with_few_questions():
+    budget_chars = QA_GENERATION_CONFIG["section_max_tokens"] * QA_GENERATION_CONFIG["chars_per_token"]
+    content = " ".join(f"Sentence number {i} describes one more detail of the release." for i in range(1200))
+    sections = qa_generation_service._split_sections(content, 3)
+    quotas = qa_generation_service._allocate_questions(sections, 3)
+
+    # As many sections as the token budget needs, not capped at the 3 questions asked for
+    assert len(sections) >= math.ceil(len(content) / budget_chars) > 3
+    assert sum(quotas) == 3 and quotas.count(0) == len(sections) - 3
+
+
+def _generated(question: str, correct: str, answer: str) -> dict:
+    return {"question": question, "answer_a": "x", "answer_b": "y", "answer_c": "z", "answer_d": "w",
+            f"answer_{correct.lower()}": answer, "correct_answer": correct, "explanation": ""}
+
+
+def test_merge_drops_sections_paraphrases_with_the_saved_set_screening():
+    first = [_generated("Which company released the new chip in 2024?", "B", "Nvidia"),
+             _generated("How many cores does the new chip have?", "answer_c", "128 cores")]
+    second = [_generated("Which company released the new chip in 2024 ?", "answer_b", "Nvidia"),
+              _generated("What process node is the chip built on?", "a", "3 nm")]
+    merged = qa_generation_service._merge_section_questions([first, second], [2, 2], 4)
+
+    # The bare-letter and answer_x spellings of the same question collapse into one
+    assert [q["question"] for q in merged] == [first[0]["question"], first[1]["question"], second[1]["question"]]
+    assert "duplicate_similarity" not in QA_GENERATION_CONFIG
@@ -0,0 +1,60 @@
+import asyncio
+
+from backend.config.settings import SETTINGS
+from backend.repository.base import ResultFilter, encode_cursor
+from backend.repository.qa_repo import create
+from backend.repository.qa_result_repo import create_qa_result, find_all_qa_results_by_user
+from backend.service import qa_result_service
+from backend.service.qa_result_service import (
+    create_qa_result_service, get_qa_result_by_id_service, list_qa_results_service
+)
+
+
+def _question(question_id: str, correct: str) -> dict:
+    return {"question_id": question_id, "question": f"Question {question_id}?", "answer_a": "a", "answer_b": "b",
+            "answer_c": "c", "answer_d": "d", "correct_answer": correct, "explanation": ""}
+
+
+def test_read_back_rows_match_the_grading_response():
+    qa = {"id": "qa-roundtrip", "article_id": "art-roundtrip",
+          "questions": [_question("q1", "answer_b"), _question("q2", "answer_c"), _question("q3", "answer_a")]}
+
+    async def scenario():
+        await create(qa)
+        graded = await create_qa_result_service("qa-roundtrip", "user-roundtrip", {"q1": "answer_b", "q2": "answer_d"})
+        [stored] = await find_all_qa_results_by_user("user-roundtrip")
+        return graded, await get_qa_result_by_id_service(stored["id"])
+
+    graded, read = asyncio.run(scenario())
+    assert [row["selected_answer"] for row in graded["questions"]] == ["answer_b", "answer_d", None]
+    assert read["questions"] == graded["questions"]
+    assert read["score"] == graded["score"] and not read["qa_changed"]
+
+
+def test_user_listing_leads_with_write_behind_results(monkeypatch):
+    stored = {"id": "r-stored", "qa_id": "qa-list", "user_id": "user-list", "score": 50, "created_at": "2026-01-01T00:00:00"}
+    buffered = {"id": "r-buffered", "qa_id": "qa-list", "user_id": "user-list", "score": 75,
+                "created_at": "2026-01-02T00:00:00", "selected": "A"}
+
+    async def get_buffered(user_id, qa_id=None):
+        return [buffered] if user_id == "user-list" else []
+
+    async def listing(**kwargs):
+        page = await list_qa_results_service(ResultFilter(user_id="user-list"), **kwargs)
+        return [item async for item in page.items]
+
+    monkeypatch.setattr(qa_result_service, "get_buffered_results_for_user", get_buffered)
+    object.__setattr__(SETTINGS, "results_write_behind", True)
+    try:
+        asyncio.run(create_qa_result(stored))
+        full = asyncio.run(listing(limit=10))
+        compact = asyncio.run(listing(limit=10, compact=True))
+        later = asyncio.run(listing(limit=10, cursor=encode_cursor(["2027-01-01", "z"])))
+    finally:
+        object.__setattr__(SETTINGS, "results_write_behind", False)
+
+    assert [item["id"] for item in full] == ["r-buffered", "r-stored"]
+    assert compact[0] == {"id": "r-buffered", "qa_id": "qa-list", "user_id": "user-list", "score": 75,
+                          "created_at": "2026-01-02T00:00:00"}
+    # Only the first page carries buffered results
+    assert "r-buffered" not in [item["id"] for item in later]
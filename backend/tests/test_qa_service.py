@@ -0,0 +1,28 @@
+import asyncio
+
+from backend.config.settings import SETTINGS
+from backend.service.qa_service import create_question
+
+
+def _qa_set(qa_id: str) -> dict:
+    return {"id": qa_id, "article_id": "art-dedupe", "questions": [{
+        "question": "Which company released the new open model this week?",
+        "answer_a": "Acme", "answer_b": "Globex", "answer_c": "Initech", "answer_d": "Umbrella",
+        "correct_answer": "answer_a", "explanation": "",
+    }]}
+
+
+def test_sets_are_screened_even_with_dedupe_off():
+    previous = SETTINGS.qa_dedupe_mode
+    object.__setattr__(SETTINGS, "qa_dedupe_mode", "off")
+    try:
+        async def scenario():
+            await create_question(_qa_set("qa-first"))
+            return await create_question(_qa_set("qa-second"))
+
+        second = asyncio.run(scenario())
+    finally:
+        object.__setattr__(SETTINGS, "qa_dedupe_mode", previous)
+
+    assert second["duplicates"] == {"mode": "off", "found": 1, "dropped": []}
+    assert "duplicate_of" not in second["questions"][0]
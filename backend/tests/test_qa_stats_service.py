@@ -0,0 +1,28 @@
+import asyncio
+
+from backend.repository.factory import get_qa_stats_repository
+from backend.repository.qa_result_repo import create_qa_result
+from backend.service.qa_stats_service import LEASE_NAME, QAStatsProcessor, get_qa_stats_service
+
+
+def test_replayed_batch_is_not_counted_twice():
+    results = [{"id": f"r-stats-{i}", "qa_id": "qa-stats", "user_id": "u", "score": 100 * (i % 2),
+                "created_at": f"2026-01-0{i + 1}T00:00:00"} for i in range(3)]
+
+    async def scenario():
+        stats_repo = get_qa_stats_repository()
+        for result in results:
+            await create_qa_result(result)
+        processor = QAStatsProcessor()
+        start = (await stats_repo.acquire_lease(LEASE_NAME, processor.owner, 30)).get("continuation")
+        await processor.process_once()
+        # The process died before its checkpoint: the next run reads the same changes
+        lease = await stats_repo.acquire_lease(LEASE_NAME, processor.owner, 30)
+        lease["continuation"] = start
+        await stats_repo.save_lease(lease)
+        await processor.process_once()
+        return await get_qa_stats_service("qa-stats")
+
+    stats = asyncio.run(scenario())
+    assert stats["attempts"] == 3 and stats["average_score"] == 33.33
+    assert "recent_result_ids" not in stats
@@ -0,0 +1,15 @@
+import asyncio
+
+import redis.asyncio as aioredis
+
+from backend.database.redis_async import tls_options
+
+
+def test_tls_urls_skip_certificate_verification():
+    client = aioredis.from_url("rediss://cache.example:6380/0", **tls_options("rediss://cache.example:6380/0"))
+    assert client.connection_pool.connection_kwargs["ssl_cert_reqs"] is None
+    asyncio.run(client.aclose())
+
+
+def test_plain_urls_take_no_ssl_options():
+    assert tls_options("redis://localhost:6379/0") == {}
@@ -0,0 +1,28 @@
+import asyncio
+
+from backend.repository.memory_backend import MemoryQAResultRepository
+from backend.repository.sqlite_backend import SQLiteDatabase, SQLiteQAResultRepository
+
+
+def _result(result_id: str) -> dict:
+    return {"id": result_id, "user_id": "u1", "qa_id": "qa1", "score": 3, "created_at": "2026-01-01T00:00:00"}
+
+
+def test_memory_create_returns_stored_document():
+    repo = MemoryQAResultRepository()
+    stored = asyncio.run(repo.create(_result("r1")))
+    assert stored["_etag"] and "_ts" in stored
+    assert stored == asyncio.run(repo.find_by_id("r1"))
+
+
+def test_sqlite_create_returns_stored_document(tmp_path):
+    repo = SQLiteQAResultRepository(SQLiteDatabase(str(tmp_path / "results.db")))
+
+    async def scenario():
+        single = await repo.create(_result("r1"))
+        many = await repo.create_many([_result("r2"), _result("r3")], 4)
+        return single, many
+
+    single, many = asyncio.run(scenario())
+    assert single["_etag"] and "_ts" in single
+    assert all(document["_etag"] and "_ts" in document for document in many)